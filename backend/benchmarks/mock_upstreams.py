@@ -0,0 +1,203 @@
+"""
+Mock Upstream Services
+Local stand-ins for the Open-Meteo geocoding/forecast APIs and the Roboflow
+detect API, with tunable injected latency, so benchmarks run offline and
+are not skewed by internet variance.
+
+Routes (all on one server):
+    GET  /geocoding/v1/search    Open-Meteo geocoding
+    GET  /forecast/v1/forecast   Open-Meteo current weather and daily forecast
+    POST /roboflow/{model_id}    Roboflow hosted detection
+
+Point the backend at it with:
+    OPEN_METEO_GEOCODING_URL=http://127.0.0.1:9100/geocoding/v1/search
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:9100/forecast/v1/forecast
+    ROBOFLOW_BASE_URL=http://127.0.0.1:9100/roboflow
+
+Usage (standalone):
+    python benchmarks/mock_upstreams.py --port 9100 --latency-ms 80 --jitter-ms 20
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+@dataclass
+class LatencyProfile:
+    """Injected latency for one mocked service"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # Fraction of requests answered with HTTP 503
+
+    async def apply(self) -> bool:
+        """Sleep for the configured latency; returns False if this request should fail"""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return random.random() >= self.error_rate
+
+
+@dataclass
+class MockConfig:
+    """Latency profiles per service plus the size of mocked Roboflow responses"""
+    geocoding: LatencyProfile = field(default_factory=LatencyProfile)
+    forecast: LatencyProfile = field(default_factory=LatencyProfile)
+    roboflow: LatencyProfile = field(default_factory=LatencyProfile)
+    roboflow_detections: int = 200
+
+
+def create_mock_app(config: MockConfig) -> FastAPI:
+    """Build the FastAPI app serving all mocked upstream routes"""
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI(title="Mock Upstreams")
+
+    def unavailable() -> JSONResponse:
+        return JSONResponse(status_code=503, content={"error": "injected failure"})
+
+    @app.get("/geocoding/v1/search")
+    async def geocode(name: str = "", count: int = 1):
+        if not await config.geocoding.apply():
+            return unavailable()
+        # Deterministic coordinates per name so repeated queries agree
+        rng = random.Random(name.lower())
+        return {
+            "results": [{
+                "name": name.title(),
+                "country": "India",
+                "latitude": round(rng.uniform(8, 30), 4),
+                "longitude": round(rng.uniform(70, 90), 4),
+            }][:max(1, count)]
+        }
+
+    @app.get("/forecast/v1/forecast")
+    async def forecast(request: Request):
+        if not await config.forecast.apply():
+            return unavailable()
+
+        params = request.query_params
+        lat = float(params.get("latitude", 0))
+        base_temp = 30 - abs(lat) * 0.4
+        body: Dict = {"timezone": "Asia/Kolkata"}
+
+        if "current" in params:
+            body["current"] = {
+                "time": time.strftime("%Y-%m-%dT%H:%M"),
+                "temperature_2m": round(base_temp + random.uniform(-2, 2), 1),
+                "weather_code": 2,
+                "wind_speed_10m": 8.5,
+                "relative_humidity_2m": 70,
+            }
+
+        if "daily" in params:
+            days = int(params.get("forecast_days", 7))
+            start = date.today()
+            body["daily"] = {
+                "time": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+                "temperature_2m_max": [round(base_temp + 4, 1)] * days,
+                "temperature_2m_min": [round(base_temp - 4, 1)] * days,
+                "temperature_2m_mean": [round(base_temp, 1)] * days,
+                "weather_code": [61] * days,
+                "precipitation_sum": [1.2] * days,
+            }
+        return body
+
+    @app.post("/roboflow/{model_id:path}")
+    async def detect(model_id: str, request: Request):
+        # Drain the upload so request size is part of the measured latency
+        await request.body()
+        if not await config.roboflow.apply():
+            return unavailable()
+
+        rng = random.Random()
+        predictions = [
+            {
+                "x": rng.uniform(0, 1000),
+                "y": rng.uniform(0, 1000),
+                "width": rng.uniform(8, 20),
+                "height": rng.uniform(8, 20),
+                "confidence": rng.uniform(0.05, 0.99),
+                "class": "fry",
+                "class_id": 0,
+            }
+            for _ in range(config.roboflow_detections)
+        ]
+        return {"predictions": predictions}
+
+    return app
+
+
+class MockUpstreamServer:
+    """Runs the mock app with uvicorn on a background thread"""
+
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 9100):
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_mock_app(config), host=host, port=port, log_level="warning")
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def backend_env(self) -> Dict[str, str]:
+        """Environment variables that point the backend at this server"""
+        return {
+            "OPEN_METEO_GEOCODING_URL": f"{self.base_url}/geocoding/v1/search",
+            "OPEN_METEO_FORECAST_URL": f"{self.base_url}/forecast/v1/forecast",
+            "ROBOFLOW_BASE_URL": f"{self.base_url}/roboflow",
+        }
+
+    def start(self, timeout: float = 10.0) -> None:
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.time() + timeout
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Mock upstream server did not start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve mock Open-Meteo and Roboflow APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency for every service")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--roboflow-latency-ms", type=float, help="Override latency for Roboflow")
+    parser.add_argument("--roboflow-detections", type=int, default=200)
+    args = parser.parse_args()
+
+    profile = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    roboflow_profile = dict(profile)
+    if args.roboflow_latency_ms is not None:
+        roboflow_profile["latency_ms"] = args.roboflow_latency_ms
+
+    config = MockConfig(
+        geocoding=LatencyProfile(**profile),
+        forecast=LatencyProfile(**profile),
+        roboflow=LatencyProfile(**roboflow_profile),
+        roboflow_detections=args.roboflow_detections,
+    )
+    uvicorn.run(create_mock_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+API Benchmark Suite
+Drives /predict, /seed-count, /temperature/assess-risk and /weather/location-check
+with synthetic inputs at a configurable concurrency and reports p50/p95/p99
+latency and requests/sec per scenario.
+
+By default it starts local mock servers for Open-Meteo and Roboflow and a
+backend process wired to them, so results are reproducible offline.
+Results can be saved and compared against a previous run to catch regressions.
+
+Usage (from backend/):
+    python benchmarks/run_benchmark.py --concurrency 8 --requests 200
+    python benchmarks/run_benchmark.py --scenarios assess-risk,location-check --mock-latency-ms 120
+    python benchmarks/run_benchmark.py --target http://localhost:8000 --output run.json
+    python benchmarks/run_benchmark.py --baseline run.json --tolerance 10
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from PIL import Image
+
+from mock_upstreams import LatencyProfile, MockConfig, MockUpstreamServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ("predict", "seed-count", "assess-risk", "location-check")
+SPECIES = ("Tilapia", "Catfish", "Carp", "Shrimp", "Salmon", "Trout", "Generic")
+LOCATIONS = ("Bhimavaram", "Nellore", "Kakinada", "Eluru", "Machilipatnam", "Ongole", "16.54,81.52")
+
+
+@dataclass
+class ScenarioResult:
+    """Latency summary for one scenario"""
+    scenario: str
+    requests: int
+    errors: int
+    concurrency: int
+    duration_s: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    status_counts: Dict[str, int]
+
+
+def synthetic_jpeg(width: int, height: int, seed: int) -> bytes:
+    """Deterministic noisy JPEG; noise defeats unrealistically good compression"""
+    rng = random.Random(seed)
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    tint = Image.new("RGB", (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    image = Image.blend(image, tint, 0.5)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_request_factory(scenario: str, images: List[bytes]) -> Callable[[int], Dict[str, Any]]:
+    """Return a function mapping a request index to httpx request arguments"""
+    if scenario == "predict":
+        return lambda i: {
+            "method": "POST", "url": "/predict",
+            "files": {"file": (f"fish_{i}.jpg", images[i % len(images)], "image/jpeg")},
+            "data": {"language": "en"},
+        }
+    if scenario == "seed-count":
+        return lambda i: {
+            "method": "POST", "url": "/seed-count",
+            "files": {"file": (f"tray_{i}.jpg", images[i % len(images)], "image/jpeg")},
+        }
+    if scenario == "assess-risk":
+        def assess(i: int) -> Dict[str, Any]:
+            rng = random.Random(i)
+            return {
+                "method": "POST", "url": "/temperature/assess-risk",
+                "json": {
+                    "temperature": round(rng.uniform(5, 40), 1),
+                    "species": SPECIES[i % len(SPECIES)],
+                    "previous_temperature": round(rng.uniform(5, 40), 1),
+                    "location": "Benchmark",
+                },
+            }
+        return assess
+    if scenario == "location-check":
+        return lambda i: {
+            "method": "POST", "url": "/weather/location-check",
+            "json": {"location": LOCATIONS[i % len(LOCATIONS)], "species": "Tilapia", "include_forecast": True},
+        }
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: str,
+    make_request: Callable[[int], Dict[str, Any]],
+    concurrency: int,
+    total_requests: int,
+    warmup: int
+) -> ScenarioResult:
+    """Issue total_requests with at most `concurrency` in flight"""
+    for i in range(warmup):
+        try:
+            await client.request(**make_request(i))
+        except httpx.HTTPError:
+            pass
+
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < total_requests:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(**make_request(index))
+                status = str(response.status_code)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        scenario=scenario,
+        requests=len(latencies),
+        errors=errors,
+        concurrency=concurrency,
+        duration_s=round(duration, 3),
+        rps=round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        max_ms=round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        status_counts=status_counts,
+    )
+
+
+def start_backend(port: int, env_overrides: Dict[str, str], startup_timeout: float) -> subprocess.Popen:
+    """Launch the API with uvicorn and wait until /health answers"""
+    env = dict(os.environ)
+    env.update(env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy in time")
+
+
+def print_results(results: List[ScenarioResult]) -> None:
+    header = f"{'scenario':<16}{'reqs':>7}{'errs':>6}{'conc':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.scenario:<16}{r.requests:>7}{r.errors:>6}{r.concurrency:>6}{r.rps:>10.1f}"
+            f"{r.p50_ms:>10.1f}{r.p95_ms:>10.1f}{r.p99_ms:>10.1f}{r.max_ms:>10.1f}"
+        )
+        if r.errors:
+            print(f"{'':<16}status counts: {r.status_counts}")
+
+
+def compare_to_baseline(results: List[ScenarioResult], baseline_path: str, tolerance_pct: float) -> List[str]:
+    """List regressions where p95 grew or rps dropped by more than tolerance_pct"""
+    with open(baseline_path) as f:
+        baseline = {entry["scenario"]: entry for entry in json.load(f)["results"]}
+
+    regressions = []
+    factor = tolerance_pct / 100
+    for r in results:
+        base = baseline.get(r.scenario)
+        if not base:
+            continue
+        if base["p95_ms"] > 0 and r.p95_ms > base["p95_ms"] * (1 + factor):
+            regressions.append(f"{r.scenario}: p95 {base['p95_ms']:.1f} -> {r.p95_ms:.1f} ms")
+        if base["rps"] > 0 and r.rps < base["rps"] * (1 - factor):
+            regressions.append(f"{r.scenario}: rps {base['rps']:.1f} -> {r.rps:.1f}")
+    return regressions
+
+
+async def run_all(args: argparse.Namespace, base_url: str) -> List[ScenarioResult]:
+    images = [synthetic_jpeg(args.image_width, args.image_height, seed) for seed in range(args.distinct_images)]
+    results = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for scenario in args.scenarios:
+            result = await run_scenario(
+                client,
+                scenario,
+                build_request_factory(scenario, images),
+                args.concurrency,
+                args.requests,
+                args.warmup,
+            )
+            results.append(result)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Aqua-Sphere API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--image-width", type=int, default=4000)
+    parser.add_argument("--image-height", type=int, default=3000)
+    parser.add_argument("--distinct-images", type=int, default=16,
+                        help="Number of unique images (lower values exercise the prediction cache)")
+    parser.add_argument("--target", help="Benchmark an already running API instead of spawning one")
+    parser.add_argument("--backend-port", type=int, default=8765)
+    parser.add_argument("--backend-startup-timeout", type=float, default=600.0)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-latency-ms", type=float, default=50.0)
+    parser.add_argument("--mock-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--roboflow-latency-ms", type=float, default=300.0)
+    parser.add_argument("--roboflow-detections", type=int, default=500)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    mock: Optional[MockUpstreamServer] = None
+    backend: Optional[subprocess.Popen] = None
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            mock = MockUpstreamServer(
+                MockConfig(
+                    geocoding=LatencyProfile(args.mock_latency_ms, args.mock_jitter_ms),
+                    forecast=LatencyProfile(args.mock_latency_ms, args.mock_jitter_ms),
+                    roboflow=LatencyProfile(args.roboflow_latency_ms, args.mock_jitter_ms),
+                    roboflow_detections=args.roboflow_detections,
+                ),
+                port=args.mock_port,
+            )
+            mock.start()
+            env = mock.backend_env()
+            # Without a local seed model the backend uses the (mocked) Roboflow path
+            env.setdefault("ROBOFLOW_API_KEY", "benchmark")
+            print(f"Mock upstreams on {mock.base_url}; starting backend on port {args.backend_port}...")
+            backend = start_backend(args.backend_port, env, args.backend_startup_timeout)
+            base_url = f"http://127.0.0.1:{args.backend_port}"
+
+        results = asyncio.run(run_all(args, base_url))
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=30)
+        if mock is not None:
+            mock.stop()
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+                "results": [asdict(r) for r in results],
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.tolerance}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
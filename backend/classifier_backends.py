@@ -0,0 +1,273 @@
+"""
+Classifier Inference Backends
+Builds the disease classifier on one of several CPU inference backends:
+eager float32 PyTorch, dynamically int8-quantized PyTorch, or an exported
+ONNX Runtime graph. Optimized backends are validated against the eager model
+for top-1 agreement on a reference image set before they are used.
+
+Usage (offline check):
+    python classifier_backends.py --backend onnx --images ./reference_images
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_MODEL_ID = "Saon110/fish-shrimp-disease-classifier"
+
+EAGER = "eager"
+QUANTIZED = "quantized"
+ONNX = "onnx"
+CLASSIFIER_BACKENDS = (EAGER, QUANTIZED, ONNX)
+
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", EAGER).strip().lower()
+if CLASSIFIER_BACKEND not in CLASSIFIER_BACKENDS:
+    logger.warning(f"Unknown CLASSIFIER_BACKEND '{CLASSIFIER_BACKEND}', using '{EAGER}'")
+    CLASSIFIER_BACKEND = EAGER
+
+# Directory of reference images used to validate optimized backends
+CLASSIFIER_VALIDATION_DIR = os.getenv("CLASSIFIER_VALIDATION_DIR", "").strip() or None
+CLASSIFIER_MIN_AGREEMENT = float(os.getenv("CLASSIFIER_MIN_AGREEMENT", "0.99"))
+# Optimized backends are only used after passing validation unless this is disabled
+CLASSIFIER_REQUIRE_VALIDATION = os.getenv("CLASSIFIER_REQUIRE_VALIDATION", "true").lower() == "true"
+
+# Where the exported ONNX graph is stored and reused across restarts
+CLASSIFIER_ONNX_DIR = os.getenv("CLASSIFIER_ONNX_DIR", "/tmp/onnx_classifier")
+
+VALIDATION_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def _build_eager(hf_token: Optional[str]) -> Callable:
+    import torch
+    from transformers import pipeline
+
+    # Use CPU-only lightweight model loading
+    return pipeline(
+        "image-classification",
+        model=CLASSIFIER_MODEL_ID,
+        token=hf_token,
+        device=-1,  # Force CPU
+        torch_dtype=torch.float32,  # Use float32 for CPU
+        trust_remote_code=True
+    )
+
+
+def _build_quantized(hf_token: Optional[str]) -> Callable:
+    import torch
+
+    classifier = _build_eager(hf_token)
+    # Dynamic int8 quantization of the Linear layers (the bulk of a ViT's weights)
+    classifier.model = torch.ao.quantization.quantize_dynamic(
+        classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return classifier
+
+
+def _build_onnx(hf_token: Optional[str]) -> Callable:
+    try:
+        from optimum.onnxruntime import ORTModelForImageClassification
+    except ImportError:
+        raise RuntimeError(
+            "ONNX backend requires 'optimum[onnxruntime]'. Install it or set CLASSIFIER_BACKEND=eager."
+        )
+    from transformers import AutoImageProcessor, pipeline
+
+    if os.path.exists(os.path.join(CLASSIFIER_ONNX_DIR, "model.onnx")):
+        logger.info(f"Loading exported ONNX classifier from {CLASSIFIER_ONNX_DIR}")
+        model = ORTModelForImageClassification.from_pretrained(CLASSIFIER_ONNX_DIR)
+    else:
+        logger.info("Exporting classifier to ONNX (first run only)...")
+        model = ORTModelForImageClassification.from_pretrained(
+            CLASSIFIER_MODEL_ID, export=True, token=hf_token, trust_remote_code=True
+        )
+        try:
+            model.save_pretrained(CLASSIFIER_ONNX_DIR)
+        except OSError as e:
+            logger.warning(f"Could not save exported ONNX classifier: {e}")
+
+    image_processor = AutoImageProcessor.from_pretrained(CLASSIFIER_MODEL_ID, token=hf_token)
+    return pipeline("image-classification", model=model, image_processor=image_processor)
+
+
+_BUILDERS = {
+    EAGER: _build_eager,
+    QUANTIZED: _build_quantized,
+    ONNX: _build_onnx,
+}
+
+
+def build_classifier(backend: str, hf_token: Optional[str] = None) -> Callable:
+    """
+    Build the image-classification pipeline on the given backend.
+
+    Args:
+        backend: One of "eager", "quantized", "onnx"
+        hf_token: Optional Hugging Face token
+
+    Returns:
+        Pipeline callable accepting a PIL image or a list of images
+    """
+    if backend not in _BUILDERS:
+        raise ValueError(f"Unknown classifier backend '{backend}'. Choose from {CLASSIFIER_BACKENDS}")
+    return _BUILDERS[backend](hf_token)
+
+
+def load_reference_images(directory: str) -> List[Image.Image]:
+    """Load every image in a directory as RGB, sorted by filename"""
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(VALIDATION_IMAGE_EXTENSIONS):
+            continue
+        try:
+            with Image.open(os.path.join(directory, name)) as image:
+                images.append(image.convert("RGB"))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable reference image {name}: {e}")
+    return images
+
+
+def _top1_labels(classifier: Callable, images: List[Image.Image], batch_size: int = 8) -> Tuple[List[str], float]:
+    """Top-1 label per image and mean seconds per image"""
+    labels = []
+    start = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        chunk = images[i:i + batch_size]
+        for preds in classifier(chunk, batch_size=len(chunk)):
+            labels.append(preds[0]["label"] if preds else "")
+    elapsed = time.perf_counter() - start
+    return labels, elapsed / max(1, len(images))
+
+
+def validate_backend(
+    candidate: Callable,
+    reference: Callable,
+    images: List[Image.Image]
+) -> Dict[str, Any]:
+    """
+    Compare a candidate backend against the eager reference.
+
+    Args:
+        candidate: Optimized classifier pipeline
+        reference: Eager float32 classifier pipeline
+        images: Reference image set
+
+    Returns:
+        Dict with top-1 agreement, mismatching indices and per-image latencies
+    """
+    if not images:
+        raise ValueError("Reference image set is empty")
+
+    reference_labels, reference_latency = _top1_labels(reference, images)
+    candidate_labels, candidate_latency = _top1_labels(candidate, images)
+
+    mismatches = [
+        i for i, (expected, actual) in enumerate(zip(reference_labels, candidate_labels))
+        if expected != actual
+    ]
+    return {
+        "images": len(images),
+        "top1_agreement": 1 - len(mismatches) / len(images),
+        "mismatches": mismatches,
+        "reference_ms_per_image": round(reference_latency * 1000, 2),
+        "candidate_ms_per_image": round(candidate_latency * 1000, 2),
+    }
+
+
+def load_validated_classifier(
+    backend: str = CLASSIFIER_BACKEND,
+    hf_token: Optional[str] = None
+) -> Tuple[Callable, str]:
+    """
+    Build the configured backend, falling back to eager unless it passes validation.
+
+    Returns:
+        Tuple of (classifier pipeline, name of the backend actually in use)
+    """
+    if backend == EAGER:
+        return build_classifier(EAGER, hf_token), EAGER
+
+    if not CLASSIFIER_VALIDATION_DIR:
+        if CLASSIFIER_REQUIRE_VALIDATION:
+            logger.warning(
+                f"Classifier backend '{backend}' requested without CLASSIFIER_VALIDATION_DIR; "
+                f"using eager backend"
+            )
+            return build_classifier(EAGER, hf_token), EAGER
+        logger.warning(f"Using unvalidated classifier backend '{backend}'")
+
+    try:
+        candidate = build_classifier(backend, hf_token)
+    except Exception as e:
+        logger.error(f"Failed to build classifier backend '{backend}': {e}; using eager backend")
+        return build_classifier(EAGER, hf_token), EAGER
+
+    if not CLASSIFIER_VALIDATION_DIR:
+        # Validation disabled by CLASSIFIER_REQUIRE_VALIDATION=false
+        return candidate, backend
+
+    reference = build_classifier(EAGER, hf_token)
+    try:
+        report = validate_backend(candidate, reference, load_reference_images(CLASSIFIER_VALIDATION_DIR))
+    except (OSError, ValueError) as e:
+        # Missing or empty reference set: the candidate cannot be checked
+        logger.error(
+            f"Cannot validate classifier backend '{backend}' against '{CLASSIFIER_VALIDATION_DIR}': {e}; "
+            f"using eager backend"
+        )
+        del candidate
+        gc.collect()
+        return reference, EAGER
+    logger.info(f"Classifier backend '{backend}' validation: {report}")
+
+    if report["top1_agreement"] < CLASSIFIER_MIN_AGREEMENT:
+        logger.error(
+            f"Classifier backend '{backend}' top-1 agreement {report['top1_agreement']:.3f} "
+            f"is below {CLASSIFIER_MIN_AGREEMENT}; using eager backend"
+        )
+        del candidate
+        gc.collect()
+        return reference, EAGER
+
+    # Drop the reference model so only the optimized one stays resident
+    del reference
+    gc.collect()
+    return candidate, backend
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate a classifier backend against eager PyTorch")
+    parser.add_argument("--backend", choices=[QUANTIZED, ONNX], required=True)
+    parser.add_argument("--images", required=True, help="Directory of reference images")
+    parser.add_argument("--min-agreement", type=float, default=CLASSIFIER_MIN_AGREEMENT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    hf_token = os.getenv("HF_TOKEN")
+
+    import torch
+    torch.set_grad_enabled(False)
+
+    images = load_reference_images(args.images)
+    report = validate_backend(
+        build_classifier(args.backend, hf_token),
+        build_classifier(EAGER, hf_token),
+        images
+    )
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+    passed = report["top1_agreement"] >= args.min_agreement
+    print("PASS" if passed else "FAIL")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
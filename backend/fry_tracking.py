@@ -0,0 +1,281 @@
+"""
+Fry Stream Counting
+Counts unique fry in a video or a live stream of frames as they pass a camera.
+Frames are thinned by a stride, run through the seed model in batches, and a
+lightweight centroid tracker counts each fry once when it crosses a counting line.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from image_ingest import decode_image
+from inference_executor import inference_executor
+from seed_counting import detect_frames
+
+logger = logging.getLogger(__name__)
+
+# Process every Nth frame; fry move little between consecutive frames
+FRY_STREAM_FRAME_STRIDE = int(os.getenv("FRY_STREAM_FRAME_STRIDE", "2"))
+# Frames per forward pass
+FRY_STREAM_BATCH_SIZE = int(os.getenv("FRY_STREAM_BATCH_SIZE", "8"))
+# Model input size for stream frames
+FRY_STREAM_IMGSZ = int(os.getenv("FRY_STREAM_IMGSZ", "640"))
+# Live streams keep at most this many unprocessed frames, dropping the oldest
+FRY_STREAM_MAX_PENDING = int(os.getenv("FRY_STREAM_MAX_PENDING", "32"))
+# Higher than the still-image default: spurious boxes become spurious tracks
+FRY_STREAM_CONFIDENCE = float(os.getenv("FRY_STREAM_CONFIDENCE", "0.25"))
+
+# Counting line as a fraction of the frame; "y" = horizontal line, fry moving up/down
+FRY_COUNT_LINE_POSITION = float(os.getenv("FRY_COUNT_LINE_POSITION", "0.5"))
+FRY_COUNT_LINE_AXIS = os.getenv("FRY_COUNT_LINE_AXIS", "y").strip().lower()
+# Maximum centroid movement between processed frames, as a fraction of the frame diagonal
+FRY_TRACK_MAX_DISTANCE = float(os.getenv("FRY_TRACK_MAX_DISTANCE", "0.05"))
+# Processed frames a track survives without a matching detection
+FRY_TRACK_MAX_MISSED = int(os.getenv("FRY_TRACK_MAX_MISSED", "3"))
+
+
+@dataclass
+class _Track:
+    track_id: int
+    x: float
+    y: float
+    side: int
+    missed: int = 0
+    counted: bool = False
+
+
+class LineCrossingTracker:
+    """
+    Greedy nearest-centroid tracker that counts tracks crossing a line.
+
+    Coordinates are normalized to the frame, so frames of any resolution can be mixed.
+    Each track is counted at most once, in either direction.
+    """
+
+    def __init__(
+        self,
+        line_position: float = FRY_COUNT_LINE_POSITION,
+        axis: str = FRY_COUNT_LINE_AXIS,
+        max_distance: float = FRY_TRACK_MAX_DISTANCE,
+        max_missed: int = FRY_TRACK_MAX_MISSED
+    ):
+        if axis not in ("x", "y"):
+            raise ValueError("axis must be 'x' or 'y'")
+        self.line_position = line_position
+        self.axis = axis
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.total = 0
+        self._tracks: List[_Track] = []
+        self._next_id = 0
+
+    @property
+    def active_tracks(self) -> int:
+        return len(self._tracks)
+
+    def _side(self, x: float, y: float) -> int:
+        position = y if self.axis == "y" else x
+        return 1 if position >= self.line_position else -1
+
+    def update(self, boxes: np.ndarray, frame_size: Tuple[int, int]) -> int:
+        """
+        Advance the tracker by one processed frame.
+
+        Args:
+            boxes: (N, >=4) array of x1, y1, x2, y2 in pixels
+            frame_size: (width, height) of the frame the boxes refer to
+
+        Returns:
+            Number of new line crossings in this frame
+        """
+        width, height = frame_size
+        total_before = self.total
+        if len(boxes):
+            centroids = np.column_stack([
+                (boxes[:, 0] + boxes[:, 2]) / (2 * width),
+                (boxes[:, 1] + boxes[:, 3]) / (2 * height),
+            ])
+        else:
+            centroids = np.empty((0, 2))
+
+        # Match on aspect-corrected distance so max_distance is a fraction of the diagonal
+        diagonal = np.hypot(width, height)
+        weights = np.array([width / diagonal, height / diagonal])
+
+        matched_tracks = set()
+        matched_detections = set()
+        if self._tracks and len(centroids):
+            positions = np.array([(t.x, t.y) for t in self._tracks])
+            distances = np.linalg.norm(
+                (positions[:, None, :] - centroids[None, :, :]) * weights, axis=2
+            )
+            for flat in np.argsort(distances, axis=None):
+                track_index, detection_index = (int(i) for i in np.unravel_index(flat, distances.shape))
+                if distances[track_index, detection_index] > self.max_distance:
+                    break
+                if track_index in matched_tracks or detection_index in matched_detections:
+                    continue
+                matched_tracks.add(track_index)
+                matched_detections.add(detection_index)
+
+                track = self._tracks[track_index]
+                track.x, track.y = centroids[detection_index]
+                track.missed = 0
+                side = self._side(track.x, track.y)
+                if side != track.side and not track.counted:
+                    track.counted = True
+                    self.total += 1
+                track.side = side
+
+        survivors = []
+        for index, track in enumerate(self._tracks):
+            if index not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+
+        for index in range(len(centroids)):
+            if index in matched_detections:
+                continue
+            x, y = centroids[index]
+            survivors.append(_Track(self._next_id, float(x), float(y), self._side(x, y)))
+            self._next_id += 1
+
+        self._tracks = survivors
+        return self.total - total_before
+
+
+def _frame_size(frame: Any) -> Tuple[int, int]:
+    """(width, height) of a PIL image or an HxWxC array"""
+    if isinstance(frame, Image.Image):
+        return frame.size
+    return frame.shape[1], frame.shape[0]
+
+
+def _decode_frames(frames: List[Any]) -> List[Optional[Any]]:
+    """
+    Decode encoded (JPEG/PNG) frames, already downscaled to the model input size.
+    Frames that cannot be decoded come back as None instead of failing the batch.
+    """
+    decoded = []
+    for frame in frames:
+        if isinstance(frame, bytes):
+            try:
+                frame = decode_image(frame, max_side=FRY_STREAM_IMGSZ)[0]
+            except Exception as e:
+                logger.warning(f"Skipping undecodable stream frame: {e}")
+                frame = None
+        decoded.append(frame)
+    return decoded
+
+
+class FryStreamCounter:
+    """
+    Counting session for one video or live stream.
+
+    Frames are submitted as they arrive (encoded bytes, PIL images or BGR
+    arrays); every frame_stride-th frame is queued and processed in batches
+    of batch_size on the seed inference executor. With max_pending set, the
+    oldest queued frames are dropped when inference falls behind, so a live
+    stream stays real-time at the cost of skipped frames.
+    """
+
+    def __init__(
+        self,
+        confidence: Optional[float] = None,
+        frame_stride: int = FRY_STREAM_FRAME_STRIDE,
+        batch_size: int = FRY_STREAM_BATCH_SIZE,
+        max_pending: Optional[int] = FRY_STREAM_MAX_PENDING,
+        tracker: Optional[LineCrossingTracker] = None
+    ):
+        self.confidence = FRY_STREAM_CONFIDENCE if confidence is None else max(0.001, min(0.999, confidence))
+        self.frame_stride = max(1, frame_stride)
+        self.batch_size = max(1, batch_size)
+        self.tracker = tracker or LineCrossingTracker()
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.frames_invalid = 0
+        self._pending: Deque[Tuple[int, Any]] = deque(maxlen=max_pending)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, frame: Any) -> None:
+        """Queue a frame unless the stride skips it"""
+        index = self.frames_received
+        self.frames_received += 1
+        if index % self.frame_stride:
+            return
+        if self._pending.maxlen is not None and len(self._pending) == self._pending.maxlen:
+            self.frames_dropped += 1
+        self._pending.append((index, frame))
+
+    async def process_pending(self) -> Optional[Dict[str, Any]]:
+        """
+        Run one batch of queued frames through the model and the tracker.
+
+        Returns:
+            Running summary, or None if nothing was queued
+        """
+        if not self._pending:
+            return None
+
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        decoded = await asyncio.to_thread(_decode_frames, [frame for _, frame in batch])
+        frames = [frame for frame in decoded if frame is not None]
+        self.frames_invalid += len(decoded) - len(frames)
+
+        if frames:
+            boxes = await inference_executor.run("seed", detect_frames, frames, self.confidence, FRY_STREAM_IMGSZ)
+            for frame, frame_boxes in zip(frames, boxes):
+                self.tracker.update(frame_boxes, _frame_size(frame))
+        self.frames_processed += len(frames)
+        return self.summary(last_frame=batch[-1][0])
+
+    def summary(self, last_frame: Optional[int] = None) -> Dict[str, Any]:
+        result = {
+            "count": self.tracker.total,
+            "active_tracks": self.tracker.active_tracks,
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "frames_invalid": self.frames_invalid,
+        }
+        if last_frame is not None:
+            result["frame"] = last_frame
+        return result
+
+
+def read_video_frames(capture, counter: FryStreamCounter, max_frames: int) -> bool:
+    """
+    Submit up to max_frames decoded frames from an OpenCV capture (blocking).
+
+    Frames skipped by the stride are grabbed but not converted.
+
+    Returns:
+        False once the video is exhausted
+    """
+    submitted = 0
+    while submitted < max_frames:
+        if counter.frames_received % counter.frame_stride:
+            if not capture.grab():
+                return False
+            counter.frames_received += 1
+            continue
+
+        ok, frame = capture.read()
+        if not ok:
+            return False
+        counter.submit(frame)
+        submitted += 1
+    return True
@@ -0,0 +1,285 @@
+"""
+Geocoding Cache and Offline Gazetteer
+Place names for weather checks are resolved locally before calling the
+geocoding API: first from an optional gazetteer CSV (name, state, country,
+latitude, longitude) held as a sorted key list for exact and prefix lookups
+by bisection, then from earlier API answers keyed by the normalized name.
+The answer cache is bounded by entry count (LRU) and age (TTL), is saved to
+a JSON file so it survives restarts, and serves expired answers when the API
+cannot be reached.
+"""
+
+import asyncio
+import bisect
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory for local state (shared with the temperature store); unset = nothing saved by default
+AQUA_DATA_DIR = os.getenv("AQUA_DATA_DIR", "").strip() or None
+# JSON file the answer cache is saved to (empty = keep it in memory only)
+GEOCODE_CACHE_PATH = os.getenv(
+    "GEOCODE_CACHE_PATH", os.path.join(AQUA_DATA_DIR, "geocode_cache.json") if AQUA_DATA_DIR else ""
+).strip() or None
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "5000"))
+GEOCODE_CACHE_TTL_DAYS = float(os.getenv("GEOCODE_CACHE_TTL_DAYS", "30"))
+# Names the API did not find are remembered this long (0 = ask again every time)
+GEOCODE_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL_SECONDS", "3600"))
+# While answers change, the file is rewritten at most this often (and at shutdown)
+GEOCODE_CACHE_SAVE_SECONDS = float(os.getenv("GEOCODE_CACHE_SAVE_SECONDS", "60"))
+
+# Gazetteer CSV consulted before the API (empty = disabled); defaults to the bundled one
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+).strip() or None
+
+# (latitude, longitude, display name), as returned by LocationService.resolve_location
+Place = Tuple[float, float, str]
+
+
+def normalize_place_name(name: str) -> str:
+    """Case-, accent-, punctuation- and whitespace-insensitive key for a place name"""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return " ".join(re.sub(r"[\W_]+", " ", text).split())
+
+
+class Gazetteer:
+    """
+    Offline place index loaded from CSV.
+
+    Each place is indexed under its name alone and combined with its state
+    and/or country ("Bhimavaram", "Bhimavaram, Andhra Pradesh", ...). Keys
+    are kept sorted, so exact lookups and prefix searches are a bisection.
+    When names repeat, the first row wins.
+    """
+
+    def __init__(self, path: Optional[str] = GAZETTEER_PATH):
+        self.path = path
+        self._keys: List[str] = []
+        self._places: List[Place] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self.load()
+        return len(set(self._places))
+
+    def load(self) -> None:
+        """Read the CSV once (blocking); later calls are no-ops"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+
+            index: Dict[str, Place] = {}
+            try:
+                with open(self.path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        name = (row.get("name") or "").strip()
+                        try:
+                            latitude, longitude = float(row["latitude"]), float(row["longitude"])
+                        except (KeyError, TypeError, ValueError):
+                            continue
+                        if not name:
+                            continue
+                        state = (row.get("state") or "").strip()
+                        country = (row.get("country") or "").strip()
+                        # Same display format as the geocoding API answers
+                        place = (latitude, longitude, f"{name}, {country}" if country else name)
+                        for alias in (name, f"{name} {state}", f"{name} {country}", f"{name} {state} {country}"):
+                            index.setdefault(normalize_place_name(alias), place)
+            except OSError as e:
+                logger.warning(f"Could not read gazetteer '{self.path}': {e}")
+                return
+
+            self._keys = sorted(index)
+            self._places = [index[key] for key in self._keys]
+            logger.info(f"Loaded gazetteer '{self.path}' ({len(set(self._places))} places)")
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """Place whose name (optionally with state / country) matches exactly"""
+        self.load()
+        key = normalize_place_name(name)
+        i = bisect.bisect_left(self._keys, key)
+        if key and i < len(self._keys) and self._keys[i] == key:
+            return self._places[i]
+        return None
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Places with a name starting with prefix, in key order"""
+        self.load()
+        key = normalize_place_name(prefix)
+        if not key:
+            return []
+        results = []
+        seen = set()
+        for i in range(bisect.bisect_left(self._keys, key), len(self._keys)):
+            if len(results) >= limit or not self._keys[i].startswith(key):
+                break
+            place = self._places[i]
+            if place in seen:
+                continue
+            seen.add(place)
+            results.append({"name": place[2], "latitude": place[0], "longitude": place[1]})
+        return results
+
+
+class GeocodeCache:
+    """
+    Geocoding API answers keyed by normalized place name.
+
+    "Not found" answers are cached too, for a shorter time. Expired entries
+    stay until evicted, so they can still answer while the API is down.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = GEOCODE_CACHE_PATH,
+        max_entries: int = GEOCODE_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = GEOCODE_CACHE_TTL_DAYS * 86400,
+        negative_ttl_seconds: float = GEOCODE_CACHE_NEGATIVE_TTL_SECONDS,
+        save_seconds: float = GEOCODE_CACHE_SAVE_SECONDS
+    ):
+        """
+        Args:
+            path: JSON file the cache is loaded from and saved to, or None
+            max_entries: Names kept; the least recently used are dropped first
+            ttl_seconds: How long a found place is trusted
+            negative_ttl_seconds: How long a "not found" answer is trusted
+            save_seconds: Minimum time between saves while entries change
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.save_seconds = save_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        # Name -> (stored at, place or None if not found)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Place]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Read the saved cache once (blocking); later calls are no-ops"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    rows = json.load(f).get("entries", [])
+                for key, stored_at, place in rows[-self.max_entries:]:
+                    self._entries[key] = (stored_at, tuple(place) if place else None)
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                logger.warning(f"Ignoring unreadable geocode cache '{self.path}': {e}")
+                self._entries.clear()
+                return
+        logger.info(f"Loaded {len(self._entries)} cached geocoding answers from '{self.path}'")
+
+    def get(self, key: str, allow_stale: bool = False) -> Tuple[bool, Optional[Place]]:
+        """
+        Look up a normalized name.
+
+        Args:
+            key: Name from normalize_place_name()
+            allow_stale: Also return expired places (when the API is unreachable)
+
+        Returns:
+            Tuple of (whether the cache has an answer, place or None if not found)
+        """
+        self.load()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, place = entry
+                ttl = self.ttl_seconds if place is not None else self.negative_ttl_seconds
+                if time.time() - stored_at < ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, place
+                if allow_stale and place is not None:
+                    self.stale_hits += 1
+                    return True, place
+            if not allow_stale:
+                self.misses += 1
+        return False, None
+
+    def put(self, key: str, place: Optional[Place]) -> None:
+        """Remember the API's answer for a normalized name (None = not found)"""
+        if not key or (place is None and self.negative_ttl_seconds <= 0):
+            return
+        self.load()
+        with self._lock:
+            self._entries[key] = (time.time(), place)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> bool:
+        """Write the cache to its file (blocking) if it changed; returns whether it was written"""
+        if not self.path or not self._dirty:
+            return False
+        with self._save_lock:
+            with self._lock:
+                rows = [[key, stored_at, place] for key, (stored_at, place) in self._entries.items()]
+                self._dirty = False
+            self._last_save = time.time()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"entries": rows}, f)
+                # Atomic rename so a crash (or another worker) never leaves a partial file
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save geocode cache '{self.path}': {e}")
+                self._dirty = True
+                return False
+        return True
+
+    async def save_if_due(self) -> None:
+        """Save in a worker thread when entries changed and the save interval has passed"""
+        if self._dirty and self.path and time.time() - self._last_save >= self.save_seconds:
+            await asyncio.to_thread(self.save)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "path": self.path,
+        }
+
+
+# Shared by all requests in this process
+gazetteer = Gazetteer()
+geocode_cache = GeocodeCache()
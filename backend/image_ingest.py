@@ -0,0 +1,122 @@
+"""
+Image Ingestion
+Decodes uploaded photos straight to the resolution each model needs.
+JPEGs are decoded at a reduced DCT scale (draft mode) instead of full size,
+EXIF orientation is applied once, and the result is downscaled early, so
+12-50 MP phone photos never materialize at full resolution.
+"""
+
+import io
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+# Classifier: keep the shorter side at least this large (the model resizes to ~224)
+CLASSIFIER_DECODE_MIN_SIDE = int(os.getenv("CLASSIFIER_DECODE_MIN_SIDE", "448"))
+
+# Seed counter: cap the longer side (0 = keep full resolution)
+SEED_DECODE_MAX_SIDE = int(os.getenv("SEED_DECODE_MAX_SIDE", "1280"))
+
+# Tiled seed counting works near full resolution; this cap bounds the tile count (0 = no cap)
+SEED_TILED_DECODE_MAX_SIDE = int(os.getenv("SEED_TILED_DECODE_MAX_SIDE", "4096"))
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+def _target_scale(width: int, height: int, min_side: Optional[int], max_side: Optional[int]) -> float:
+    """Downscale factor (<= 1) satisfying the size policy"""
+    scale = 1.0
+    if min_side:
+        scale = min(scale, min_side / min(width, height))
+    if max_side:
+        scale = min(scale, max_side / max(width, height))
+    return scale
+
+
+def decode_image(
+    contents: bytes,
+    min_side: Optional[int] = None,
+    max_side: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> Tuple[Image.Image, float]:
+    """
+    Decode image bytes into an upright RGB image no larger than the policy needs.
+
+    Exactly one of min_side / max_side is normally given:
+    min_side shrinks until the shorter side reaches it (classification),
+    max_side shrinks until the longer side fits (detection). Images are never upscaled.
+
+    Args:
+        contents: Raw uploaded bytes
+        min_side: Target for the shorter side
+        max_side: Limit for the longer side
+        timings: Optional dict that receives "decode" and "preprocessing" seconds
+
+    Returns:
+        Tuple of (RGB image, scale) where scale maps coordinates in the
+        upright full-resolution photo to the returned image
+    """
+    start = time.perf_counter()
+    image = Image.open(io.BytesIO(contents))
+
+    # Size of the photo as displayed (after EXIF rotation)
+    orientation = image.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+    width, height = image.size
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+
+    scale = _target_scale(width, height, min_side, max_side)
+
+    if scale < 1 and image.format == "JPEG":
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale while staying >= the target
+        raw_w, raw_h = image.size
+        image.draft("RGB", (max(1, int(raw_w * scale)), max(1, int(raw_h * scale))))
+    image.load()
+    decoded = time.perf_counter()
+
+    # Apply EXIF orientation once; downstream code sees an upright image
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    if scale < 1:
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if image.size != target:
+            image = image.resize(target, Image.BILINEAR, reducing_gap=2.0)
+
+    if timings is not None:
+        timings["decode"] = decoded - start
+        timings["preprocessing"] = time.perf_counter() - decoded
+    return image, image.width / width
+
+
+def decode_for_classifier(contents: bytes, timings: Optional[Dict[str, float]] = None) -> Image.Image:
+    """Decode an upload for the disease classifier"""
+    image, _ = decode_image(contents, min_side=CLASSIFIER_DECODE_MIN_SIDE, timings=timings)
+    return image
+
+
+def decode_for_seed_counter(
+    contents: bytes,
+    timings: Optional[Dict[str, float]] = None,
+    tiled: bool = False
+) -> Tuple[Image.Image, float]:
+    """
+    Decode an upload for the seed counter.
+
+    Args:
+        contents: Raw uploaded bytes
+        timings: Optional dict that receives "decode" and "preprocessing" seconds
+        tiled: Decode for tiled counting, which keeps (near) full resolution
+
+    Returns:
+        Tuple of (RGB image, scale); divide detection coordinates by scale
+        to map them back onto the original photo
+    """
+    max_side = SEED_TILED_DECODE_MAX_SIDE if tiled else SEED_DECODE_MAX_SIDE
+    return decode_image(contents, max_side=max_side or None, timings=timings)
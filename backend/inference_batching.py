@@ -0,0 +1,199 @@
+"""
+Dynamic Micro-Batching for Model Inference
+Collects concurrent inference requests that arrive within a short window and
+runs them through the model as a single batched forward pass.
+Each caller awaits its own result, so handlers keep their one-image-per-request shape.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import BATCH_SIZE, INFERENCE_LATENCY, QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# Batching window for the disease classifier
+CLASSIFIER_MAX_BATCH_SIZE = int(os.getenv("CLASSIFIER_MAX_BATCH_SIZE", "8"))
+CLASSIFIER_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_MAX_WAIT_MS", "15"))
+
+
+class MicroBatcher:
+    """
+    Groups individual requests into batches for a batched inference function.
+
+    A batch is dispatched as soon as it reaches ``max_batch_size`` or once
+    ``max_wait_ms`` has elapsed since its first request arrived, whichever
+    comes first. At most ``max_concurrent_batches`` batches run at once;
+    while they run, new requests keep queueing, so batches naturally grow
+    under load while latency stays bounded when idle.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = CLASSIFIER_MAX_BATCH_SIZE,
+        max_wait_ms: float = CLASSIFIER_MAX_WAIT_MS,
+        max_concurrent_batches: int = 1,
+        name: str = "classifier"
+    ):
+        """
+        Args:
+            run_batch: Coroutine function taking a list of inputs and
+                returning a list of outputs in the same order
+            max_batch_size: Maximum number of requests per forward pass
+            max_wait_ms: Maximum time to hold the first request of a batch
+            max_concurrent_batches: Number of batches allowed in flight
+            name: Identifier used in log messages
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Requests taken off the queue for the batch being formed, and dispatched batches by task
+        self._collecting: List[Tuple[Any, asyncio.Future, float]] = []
+        self._batches: Dict[asyncio.Task, List[Tuple[Any, asyncio.Future, float]]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be batched"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the background batching loop on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = asyncio.get_running_loop().create_task(self._batch_loop())
+        logger.info(
+            f"Started {self.name} batcher (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.0f})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the batching loop and fail any requests still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # A cancelled batch may not have started, so its own handlers never run
+        abandoned = self._collecting
+        self._collecting = []
+        for task, batch in list(self._batches.items()):
+            task.cancel()
+            abandoned.extend(batch)
+        self._batches.clear()
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                abandoned.append(self._queue.get_nowait())
+        for _, future, _ in abandoned:
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue a single input and wait for its result.
+
+        Args:
+            item: One model input (e.g. a PIL image)
+
+        Returns:
+            The model output for this input
+        """
+        if not self.running:
+            raise RuntimeError(f"{self.name} batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        """Wait for the first request, then gather more until full or timed out"""
+        loop = asyncio.get_running_loop()
+        # Kept on self so stop() can fail requests already taken off the queue
+        batch = self._collecting = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        self._collecting = []
+        return batch
+
+    async def _batch_loop(self) -> None:
+        while True:
+            # Only form the next batch once a slot is free, so requests that
+            # arrive meanwhile join it instead of waiting behind it
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._batches[task] = batch
+            task.add_done_callback(lambda done: self._batches.pop(done, None))
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        try:
+            # Skip callers that gave up (e.g. client disconnected)
+            dispatched_at = time.perf_counter()
+            live = []
+            for item, future, enqueued_at in batch:
+                if not future.done():
+                    live.append((item, future))
+                    QUEUE_WAIT.observe(dispatched_at - enqueued_at, model=self.name)
+            batch = live
+            if not batch:
+                return
+
+            items = [item for item, _ in batch]
+            BATCH_SIZE.observe(len(items), model=self.name)
+            try:
+                with INFERENCE_LATENCY.time(model=self.name):
+                    outputs = await self.run_batch(items)
+                if len(outputs) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} returned {len(outputs)} results for {len(items)} inputs"
+                    )
+            except Exception as e:
+                logger.error(f"Batched {self.name} inference failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            logger.debug(f"{self.name} batch of {len(items)} completed")
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        finally:
+            self._slots.release()
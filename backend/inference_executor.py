@@ -0,0 +1,250 @@
+"""
+Managed Inference Executor
+Runs blocking, CPU-bound model inference off the asyncio event loop.
+Owns the disease classifier and the seed-count model, and limits how many
+inference calls per model may run at once so lightweight routes stay responsive.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from classifier_backends import CLASSIFIER_BACKEND, load_validated_classifier
+
+logger = logging.getLogger(__name__)
+
+# "thread" shares models with the API process; "process" loads them in worker processes
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").strip().lower()
+
+# Maximum concurrent inference calls per model
+CLASSIFIER_MAX_CONCURRENCY = int(os.getenv("CLASSIFIER_MAX_CONCURRENCY", "1"))
+SEED_MODEL_MAX_CONCURRENCY = int(os.getenv("SEED_MODEL_MAX_CONCURRENCY", "1"))
+
+# Pool size defaults to enough workers for every model to run at its limit
+INFERENCE_WORKERS = int(
+    os.getenv("INFERENCE_WORKERS", str(CLASSIFIER_MAX_CONCURRENCY + SEED_MODEL_MAX_CONCURRENCY))
+)
+
+# Optional cap on PyTorch intra-op threads per worker (0 = library default)
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", "0"))
+
+# Smoothing factor for the per-model service time average
+SERVICE_TIME_EWMA_ALPHA = 0.2
+
+# Process-local classifier pipeline (one per worker process in "process" mode)
+_classifier = None
+_classifier_backend: Optional[str] = None
+
+
+def load_classifier() -> Optional[str]:
+    """
+    Load the image-classification pipeline into this process.
+
+    Returns:
+        Name of the classifier backend in use, or None if loading failed
+    """
+    global _classifier, _classifier_backend
+    if _classifier is not None:
+        return _classifier_backend
+
+    try:
+        logger.info("Loading model with memory optimization...")
+        import torch
+
+        # Read Hugging Face token (optional)
+        hf_token = os.getenv('HF_TOKEN')
+        if not hf_token:
+            logger.warning("No HF_TOKEN found in environment variables, proceeding without authentication")
+
+        # Set environment variables for memory optimization
+        os.environ['TRANSFORMERS_CACHE'] = '/tmp/transformers_cache'
+        os.environ['HF_HOME'] = '/tmp/hf_home'
+
+        # Disable gradients globally to save memory
+        torch.set_grad_enabled(False)
+        if INFERENCE_TORCH_THREADS > 0:
+            torch.set_num_threads(INFERENCE_TORCH_THREADS)
+
+        _classifier, _classifier_backend = load_validated_classifier(CLASSIFIER_BACKEND, hf_token)
+
+        # Free up any unused memory
+        import gc
+        gc.collect()
+
+        logger.info(f"Model loaded successfully ({_classifier_backend} backend)")
+        return _classifier_backend
+    except Exception as e:
+        logger.error(f"Failed to load model: {str(e)}")
+        logger.error(traceback.format_exc())
+        return None
+
+
+def classify_batch(images: List[Any]) -> List[List[dict]]:
+    """
+    Run the classifier on a list of images in a single forward pass.
+
+    Args:
+        images: List of RGB PIL images
+
+    Returns:
+        One list of {"label", "score"} predictions per image
+    """
+    if _classifier is None and load_classifier() is None:
+        raise RuntimeError("Classifier model is not loaded")
+    return _classifier(images, batch_size=len(images))
+
+
+def _init_worker() -> None:
+    """Process-pool initializer: load models once per worker process"""
+    logging.basicConfig(level=logging.INFO)
+    load_classifier()
+
+    from seed_model_registry import seed_model_registry
+    if os.path.exists(seed_model_registry.path):
+        try:
+            seed_model_registry.load()
+        except Exception as e:
+            logger.error(f"Failed to load seed model in worker: {e}")
+
+
+class InferenceExecutor:
+    """
+    Thread or process pool that executes model inference with per-model limits.
+
+    Handlers await ``run`` instead of calling models directly. Each model has
+    its own semaphore, so a burst of seed-count requests cannot starve the
+    classifier (and vice versa), and the event loop never blocks on inference.
+    """
+
+    def __init__(
+        self,
+        kind: str = INFERENCE_EXECUTOR,
+        workers: int = INFERENCE_WORKERS,
+        limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            kind: "thread" or "process"
+            workers: Number of pool workers
+            limits: Maximum concurrent calls per model name
+        """
+        if kind not in ("thread", "process"):
+            logger.warning(f"Unknown INFERENCE_EXECUTOR '{kind}', using 'thread'")
+            kind = "thread"
+
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.limits = limits or {
+            "classifier": CLASSIFIER_MAX_CONCURRENCY,
+            "seed": SEED_MODEL_MAX_CONCURRENCY,
+        }
+        self.in_flight: Dict[str, int] = {name: 0 for name in self.limits}
+        self.waiting: Dict[str, int] = {name: 0 for name in self.limits}
+        # Exponentially weighted average execution time per model, excluding queueing
+        self.service_time: Dict[str, Optional[float]] = {name: None for name in self.limits}
+        self.classifier_loaded = False
+        self.classifier_backend: Optional[str] = None
+        self._pool: Optional[Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def start(self) -> None:
+        """Create the worker pool"""
+        if self._pool is not None:
+            return
+
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference"
+            )
+
+        self._semaphores = {
+            name: asyncio.Semaphore(max(1, limit)) for name, limit in self.limits.items()
+        }
+        logger.info(f"Started {self.kind} inference executor with {self.workers} workers, limits={self.limits}")
+
+    async def load_models(self) -> bool:
+        """Load the classifier in the pool (in every worker for process pools)"""
+        try:
+            self.classifier_backend = await self.run("classifier", load_classifier)
+        except Exception as e:
+            logger.error(f"Failed to load models in inference executor: {e}")
+            self.classifier_backend = None
+        self.classifier_loaded = self.classifier_backend is not None
+        return self.classifier_loaded
+
+    async def run(self, model: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Execute a blocking inference function in the pool.
+
+        Args:
+            model: Model name used for concurrency limiting ("classifier" or "seed")
+            fn: Module-level function to call (must be picklable for process pools)
+            *args: Positional arguments for fn
+
+        Returns:
+            The return value of fn
+        """
+        if self._pool is None:
+            raise RuntimeError("Inference executor is not running")
+
+        loop = asyncio.get_running_loop()
+        self.waiting[model] += 1
+        try:
+            await self._semaphores[model].acquire()
+        finally:
+            self.waiting[model] -= 1
+
+        semaphore = self._semaphores[model]
+        self.in_flight[model] += 1
+        start = time.perf_counter()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._finish(model, semaphore, start)
+            raise
+
+        # The permit follows the work, not this caller: a cancelled caller leaves
+        # the call running in the pool, and it keeps its permit until it returns
+        def done(_):
+            try:
+                loop.call_soon_threadsafe(self._finish, model, semaphore, start)
+            except RuntimeError:
+                # Event loop already closed (shutdown)
+                pass
+
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, model: str, semaphore: asyncio.Semaphore, start: float) -> None:
+        self.in_flight[model] -= 1
+        semaphore.release()
+        self._observe_service_time(model, time.perf_counter() - start)
+
+    def _observe_service_time(self, model: str, seconds: float) -> None:
+        previous = self.service_time[model]
+        if previous is None:
+            self.service_time[model] = seconds
+        else:
+            self.service_time[model] = previous + SERVICE_TIME_EWMA_ALPHA * (seconds - previous)
+
+    def shutdown(self) -> None:
+        """Stop the pool, abandoning queued work"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Application-wide executor, started and stopped by the API lifecycle hooks
+inference_executor = InferenceExecutor()
@@ -4,19 +4,69 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from transformers import pipeline
-from PIL import Image
+from starlette.background import BackgroundTask
+from starlette.routing import Match
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from PIL import Image, UnidentifiedImageError
 import io
+import json
+import math
+import time
+import tempfile
+import threading
+import asyncio
 import logging
+import zipfile
+import hmac
 import traceback
+import numpy as np
 from disease_knowledge import get_disease_info
-from temperature_monitoring import TemperatureRiskAssessor, create_assessment_response
-from seed_counting import predict_seed_count
-from weather_service import WeatherService, LocationService
-from typing import Optional, List
+from temperature_monitoring import (
+    TemperatureRiskAssessor,
+    create_assessment_response,
+    create_assessment_response_json,
+    create_batch_assessment_response,
+)
+from seed_counting import (
+    DETECTION_COLUMNS,
+    SEED_TILED_DEFAULT,
+    detections_to_bytes,
+    detections_to_columns,
+    detections_to_objects,
+    local_model_available,
+    predict_seed_count,
+    seed_router,
+    sweep_seed_count,
+)
+from temperature_history import temperature_history, to_epoch_seconds
+from temperature_store import temperature_store
+from temperature_stream import temperature_stream_monitor
+from fry_tracking import FryStreamCounter, read_video_frames
+from roboflow_client import roboflow_client
+from seed_model_registry import seed_model_registry
+from weather_service import WeatherService, LocationService, weather_http_client
+from geocoding import gazetteer, geocode_cache
+from inference_batching import MicroBatcher
+from image_ingest import decode_for_classifier, decode_for_seed_counter
+from prediction_cache import classifier_cache, content_key, seed_cache
+from metrics import (
+    INFERENCE_IN_FLIGHT,
+    PROMETHEUS_CONTENT_TYPE,
+    QUEUE_DEPTH,
+    STAGE_LATENCY,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    render_metrics,
+    stage_timer,
+)
+from inference_executor import (
+    CLASSIFIER_MAX_CONCURRENCY,
+    classify_batch,
+    inference_executor,
+)
+from typing import Dict, Optional, List, Tuple, Union
 from pydantic import BaseModel
 
 # Configure logging
@@ -40,48 +90,126 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variable for model
-classifier = None
 
-@app.on_event("startup")
-async def load_model():
-    """Load model on startup with aggressive memory optimization"""
-    global classifier
+def _route_template(request: Request) -> str:
+    """Route path template for metric labels (keeps label cardinality bounded)"""
+    for route in app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "other")
+    return "other"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record latency and in-flight count per route template"""
+    route = _route_template(request)
+    REQUESTS_IN_FLIGHT.inc(route=route)
+    start = time.perf_counter()
+    status = "500"
     try:
-        logger.info("Loading model with memory optimization...")
-        import torch
-        import os
-        
-        # Read Hugging Face token (optional)
-        hf_token = os.getenv('HF_TOKEN')
-        if not hf_token:
-            logger.warning("No HF_TOKEN found in environment variables, proceeding without authentication")
-        
-        # Set environment variables for memory optimization
-        os.environ['TRANSFORMERS_CACHE'] = '/tmp/transformers_cache'
-        os.environ['HF_HOME'] = '/tmp/hf_home'
-        
-        # Disable gradients globally to save memory
-        torch.set_grad_enabled(False)
-        
-        # Use CPU-only lightweight model loading
-        classifier = pipeline(
-            "image-classification",
-            model="Saon110/fish-shrimp-disease-classifier",
-            token=hf_token,
-            device=-1,  # Force CPU
-            torch_dtype=torch.float32,  # Use float32 for CPU
-            trust_remote_code=True
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec(route=route)
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start, method=request.method, route=route, status=status
         )
-        
-        # Free up any unused memory
-        import gc
-        gc.collect()
-        
-        logger.info("Model loaded successfully")
-    except Exception as e:
-        logger.error(f"Failed to load model: {str(e)}")
-        logger.error(traceback.format_exc())
+
+
+async def _classify_batch(images: List[Image.Image]) -> List[List[dict]]:
+    """Run a batch of images through the classifier on the inference executor"""
+    return await inference_executor.run("classifier", classify_batch, images)
+
+
+# Groups concurrent /predict requests into batched forward passes
+classifier_batcher = MicroBatcher(
+    _classify_batch,
+    max_concurrent_batches=CLASSIFIER_MAX_CONCURRENCY,
+    name="classifier"
+)
+
+@app.on_event("startup")
+async def load_model():
+    """Start the inference executor and load the classifier into it"""
+    inference_executor.start()
+    await inference_executor.load_models()
+
+
+@app.on_event("startup")
+async def load_seed_model():
+    """Load and warm up the seed model in the background so the first request is not cold"""
+    if inference_executor.kind == "thread" and local_model_available():
+        seed_model_registry.load_in_background()
+        seed_model_registry.watch()
+
+
+@app.on_event("startup")
+async def start_batcher():
+    """Start the classifier micro-batching loop"""
+    classifier_batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    """Stop the classifier micro-batching loop"""
+    await classifier_batcher.stop()
+
+
+@app.on_event("shutdown")
+async def stop_inference_executor():
+    """Release inference workers"""
+    inference_executor.shutdown()
+
+
+@app.on_event("shutdown")
+async def stop_seed_model_watcher():
+    """Stop polling the seed model file"""
+    seed_model_registry.stop_watching()
+
+
+@app.on_event("shutdown")
+async def close_roboflow_client():
+    """Close pooled connections to Roboflow"""
+    await roboflow_client.aclose()
+
+
+@app.on_event("startup")
+async def start_weather_client():
+    """Open the pooled client shared by weather and geocoding lookups"""
+    weather_http_client.start()
+
+
+@app.on_event("shutdown")
+async def close_weather_client():
+    """Close pooled connections to the weather APIs"""
+    await weather_http_client.aclose()
+
+
+@app.on_event("startup")
+async def load_geocoding_data():
+    """Load the offline gazetteer and saved geocoding answers"""
+    await asyncio.to_thread(gazetteer.load)
+    await asyncio.to_thread(geocode_cache.load)
+
+
+@app.on_event("shutdown")
+async def save_geocode_cache():
+    """Save geocoding answers learned since the last save"""
+    await asyncio.to_thread(geocode_cache.save)
+
+
+@app.on_event("startup")
+async def start_temperature_store():
+    """Write buffered sensor readings to the time-series store in the background"""
+    temperature_store.start()
+
+
+@app.on_event("shutdown")
+async def close_temperature_store():
+    """Flush buffered sensor readings and close the time-series store"""
+    await asyncio.to_thread(temperature_store.close)
 
 @app.get("/")
 async def root():
@@ -90,7 +218,7 @@ async def root():
         content={
             "status": "online",
             "message": "Fish Disease Classifier API is running",
-            "model_loaded": classifier is not None
+            "model_loaded": inference_executor.classifier_loaded
         },
         headers={
             "Access-Control-Allow-Origin": "*",
@@ -102,14 +230,92 @@ async def health_check():
     """Detailed health check"""
     return JSONResponse(
         content={
-            "status": "healthy" if classifier else "model_not_loaded",
-            "model_loaded": classifier is not None
+            "status": "healthy" if inference_executor.classifier_loaded else "model_not_loaded",
+            "model_loaded": inference_executor.classifier_loaded,
+            "inference": {
+                "executor": inference_executor.kind,
+                "classifier_backend": inference_executor.classifier_backend,
+                "in_flight": inference_executor.in_flight,
+                "queued": classifier_batcher.queue_depth
+            },
+            "seed_model": seed_model_registry.stats(),
+            "seed_routing": seed_router.stats(),
+            "cache": {
+                "classifier": classifier_cache.stats(),
+                "seed": seed_cache.stats()
+            }
         },
         headers={
             "Access-Control-Allow-Origin": "*",
         }
     )
 
+def _observe_timings(endpoint: str, timings: Dict[str, float]) -> None:
+    """Record stage durations measured off the event loop"""
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.observe(seconds, endpoint=endpoint, stage=stage)
+
+
+async def _classify_contents(contents: bytes, endpoint: str = "predict") -> List[dict]:
+    """
+    Classify uploaded image bytes, reusing cached predictions for identical uploads.
+    
+    Args:
+        contents: Raw uploaded bytes
+        endpoint: Endpoint name used to label stage metrics
+        
+    Returns:
+        Raw classifier predictions; language enrichment is applied by the caller
+    """
+    # Backends may differ slightly in scores, so cache entries are per backend
+    cache_key = f"{inference_executor.classifier_backend}-{content_key(contents)}"
+    preds = await classifier_cache.aget(cache_key)
+    if preds is not None:
+        logger.info("Prediction cache hit")
+        return preds
+    
+    # Decode in a worker thread so concurrent uploads decode in parallel
+    timings: Dict[str, float] = {}
+    image = await asyncio.to_thread(decode_for_classifier, contents, timings)
+    _observe_timings(endpoint, timings)
+    
+    # Run the model (includes time queued for a batch)
+    logger.info("Running prediction...")
+    with stage_timer(endpoint, "inference"):
+        preds = await classifier_batcher.submit(image)
+    await classifier_cache.aset(cache_key, preds)
+    return preds
+
+
+def _disease_info_from_preds(preds: List[dict], language: str) -> Optional[dict]:
+    """
+    Pick the top prediction (preferring fish labels) and enrich it.
+    
+    Returns:
+        Disease info dict, or None if the model returned no predictions
+    """
+    fish_preds = [
+        pred for pred in preds
+        if pred["label"].startswith("Fish_")
+    ]
+    
+    if not fish_preds:
+        # If no fish predictions, use top prediction anyway
+        top_prediction = preds[0] if preds else None
+        if not top_prediction:
+            return None
+        
+        # Get enriched disease information even for non-fish predictions
+        return get_disease_info(top_prediction["label"], float(top_prediction["score"]), language)
+    
+    top_fish = fish_preds[0]
+    
+    # Log the prediction details
+    logger.info(f"Top prediction - Label: {top_fish['label']}, Score: {top_fish['score']}, Language: {language}")
+    
+    return get_disease_info(top_fish["label"], float(top_fish["score"]), language)
+
+
 @app.post("/predict")
 async def predict_image(file: UploadFile = File(...), language: Optional[str] = Form("en")):
     """
@@ -127,7 +333,7 @@ async def predict_image(file: UploadFile = File(...), language: Optional[str] =
         logger.info(f"Processing image: {file.filename}, language: {language}")
         
         # Check if model is loaded
-        if classifier is None:
+        if not inference_executor.classifier_loaded:
             raise HTTPException(
                 status_code=503,
                 detail="Model not loaded yet. Please wait and try again."
@@ -143,36 +349,24 @@ async def predict_image(file: UploadFile = File(...), language: Optional[str] =
         logger.info(f"Processing image: {file.filename}")
         
         # Read uploaded file
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        # Convert to RGB if needed
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Run the model
-        logger.info("Running prediction...")
-        preds = classifier(image)
+        with stage_timer("predict", "upload_read"):
+            contents = await file.read()
+        preds = await _classify_contents(contents)
         logger.info(f"Predictions: {preds}")
         
-        # Prepare results
-        fish_preds = [
-            pred for pred in preds
-            if pred["label"].startswith("Fish_")
-        ]
+        # Get enriched disease information with language support
+        with stage_timer("predict", "enrichment"):
+            disease_info = _disease_info_from_preds(preds, language)
+        if disease_info is None:
+            raise HTTPException(
+                status_code=500,
+                detail="No predictions returned from model"
+            )
         
-        if not fish_preds:
-            # If no fish predictions, return top prediction anyway
-            top_prediction = preds[0] if preds else None
-            if not top_prediction:
-                raise HTTPException(
-                    status_code=500,
-                    detail="No predictions returned from model"
-                )
-            
-            # Get enriched disease information even for non-fish predictions
-            disease_info = get_disease_info(top_prediction["label"], float(top_prediction["score"]), language)
-            
+        # Log the returned disease info
+        logger.info(f"Disease info returned: {disease_info}")
+        
+        with stage_timer("predict", "serialization"):
             return JSONResponse(
                 content=disease_info,
                 headers={
@@ -180,19 +374,142 @@ async def predict_image(file: UploadFile = File(...), language: Optional[str] =
                 }
             )
         
-        top_fish = fish_preds[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing image: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing image: {str(e)}"
+        )
+
+
+# Upload limits for the multi-image endpoint
+BATCH_MAX_IMAGES = int(os.getenv("BATCH_MAX_IMAGES", "50"))
+BATCH_MAX_ZIP_BYTES = int(os.getenv("BATCH_MAX_ZIP_BYTES", str(200 * 1024 * 1024)))
+
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+ZIP_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp")
+
+
+def _is_zip_upload(file: UploadFile) -> bool:
+    return file.content_type in ZIP_CONTENT_TYPES or (file.filename or "").lower().endswith(".zip")
+
+
+def _extract_zip_images(contents: bytes) -> List[Tuple[str, bytes]]:
+    """Extract image entries from a zip archive, in archive order"""
+    entries = []
+    total_size = 0
+    with zipfile.ZipFile(io.BytesIO(contents)) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or not name.lower().endswith(ZIP_IMAGE_EXTENSIONS):
+                continue
+            # Skip macOS resource forks and hidden files
+            if name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                continue
+            total_size += info.file_size
+            if total_size > BATCH_MAX_ZIP_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Zip contents exceed {BATCH_MAX_ZIP_BYTES // (1024 * 1024)} MB"
+                )
+            entries.append((name, archive.read(info)))
+    return entries
+
+
+@app.post("/predict/batch")
+async def predict_batch(files: List[UploadFile] = File(...), language: Optional[str] = Form("en")):
+    """
+    Predict fish disease for many images in one request.
+    
+    Args:
+        files: Image files, or a single zip archive of images
+        language: Language code (en=English, te=Telugu). Default: en
         
-        # Log the prediction details
-        logger.info(f"Top prediction - Label: {top_fish['label']}, Score: {top_fish['score']}, Language: {language}")
+    Returns:
+        Ordered list of per-image results; failed images carry an error instead
+    """
+    try:
+        # Validate language
+        if language not in ["en", "te"]:
+            language = "en"
         
-        # Get enriched disease information with language support
-        disease_info = get_disease_info(top_fish["label"], float(top_fish["score"]), language)
+        if not inference_executor.classifier_loaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Model not loaded yet. Please wait and try again."
+            )
         
-        # Log the returned disease info
-        logger.info(f"Disease info returned: {disease_info}")
+        # Collect (filename, bytes) for every image in the upload
+        uploads: List[Tuple[str, Optional[bytes]]] = []
+        errors: Dict[int, str] = {}
+        for file in files:
+            contents = await file.read()
+            if _is_zip_upload(file):
+                try:
+                    uploads.extend(await asyncio.to_thread(_extract_zip_images, contents))
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"'{file.filename}' is not a valid zip file")
+            else:
+                if not (file.content_type or "").startswith("image/"):
+                    errors[len(uploads)] = "File must be an image"
+                uploads.append((file.filename, contents))
+        
+        if not uploads:
+            raise HTTPException(status_code=400, detail="No images found in upload")
+        if len(uploads) > BATCH_MAX_IMAGES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many images ({len(uploads)}). Maximum is {BATCH_MAX_IMAGES} per request."
+            )
+        
+        logger.info(f"Processing batch of {len(uploads)} images, language: {language}")
+        
+        async def classify(index: int, contents: bytes) -> dict:
+            if index in errors:
+                raise ValueError(errors[index])
+            # Submitted together, these coalesce into full classifier batches
+            try:
+                preds = await _classify_contents(contents, endpoint="predict_batch")
+            except (UnidentifiedImageError, OSError):
+                raise ValueError("Could not decode image")
+            disease_info = _disease_info_from_preds(preds, language)
+            if disease_info is None:
+                raise ValueError("No predictions returned from model")
+            return disease_info
+        
+        outcomes = await asyncio.gather(
+            *(classify(i, contents) for i, (_, contents) in enumerate(uploads)),
+            return_exceptions=True
+        )
+        
+        results = []
+        for index, ((filename, _), outcome) in enumerate(zip(uploads, outcomes)):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Batch image {index} ({filename}) failed: {outcome}")
+                results.append({
+                    "index": index,
+                    "filename": filename,
+                    "status": "error",
+                    "error": str(outcome) or type(outcome).__name__
+                })
+            else:
+                results.append({
+                    "index": index,
+                    "filename": filename,
+                    "status": "ok",
+                    "result": outcome
+                })
         
         return JSONResponse(
-            content=disease_info,
+            content={
+                "total": len(results),
+                "succeeded": sum(1 for r in results if r["status"] == "ok"),
+                "failed": sum(1 for r in results if r["status"] == "error"),
+                "results": results
+            },
             headers={
                 "Access-Control-Allow-Origin": "*",
             }
@@ -201,11 +518,11 @@ async def predict_image(file: UploadFile = File(...), language: Optional[str] =
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing image: {str(e)}")
+        logger.error(f"Error processing image batch: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=500,
-            detail=f"Error processing image: {str(e)}"
+            detail=f"Error processing image batch: {str(e)}"
         )
 
 
@@ -213,10 +530,58 @@ async def predict_image(file: UploadFile = File(...), language: Optional[str] =
 # FISH SEED COUNTING ENDPOINT
 # ============================================================================
 
+def _seed_image_loader(contents: bytes, tiled: bool, endpoint: str):
+    """Deferred decode for the seed counter; skipped when stored detections can be reused"""
+    async def load():
+        timings: Dict[str, float] = {}
+        image, scale = await asyncio.to_thread(decode_for_seed_counter, contents, timings, tiled)
+        _observe_timings(endpoint, timings)
+        return image, scale
+    return load
+
+
+SEED_COUNT_FORMATS = ("objects", "columnar", "count", "binary")
+
+
+def _seed_count_response(result: Dict, format: str) -> Response:
+    """Encode a seed count result in the requested detection format"""
+    boxes = result["boxes"]
+    if format == "binary":
+        return Response(
+            content=detections_to_bytes(boxes),
+            media_type="application/octet-stream",
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Expose-Headers": "X-Seed-Count, X-Confidence-Threshold, X-Detection-Columns",
+                "X-Seed-Count": str(result["count"]),
+                "X-Confidence-Threshold": str(result["confidence_threshold"]),
+                "X-Detection-Columns": ",".join(DETECTION_COLUMNS),
+            }
+        )
+
+    content = {
+        "count": result["count"],
+        "confidence_threshold": result["confidence_threshold"],
+    }
+    if format == "objects":
+        content["detections"] = detections_to_objects(boxes)
+    elif format == "columnar":
+        content["detections"] = detections_to_columns(boxes)
+
+    return JSONResponse(
+        content=content,
+        headers={
+            "Access-Control-Allow-Origin": "*",
+        }
+    )
+
+
 @app.post("/seed-count")
 async def count_fish_seeds(
     file: UploadFile = File(...),
     confidence: Optional[float] = Form(None),
+    tiled: Optional[bool] = Form(None),
+    format: str = Form("objects"),
 ):
     """
     Count fish seeds (fry) from uploaded image using a YOLO detection model.
@@ -224,29 +589,106 @@ async def count_fish_seeds(
     Args:
         file: Image file
         confidence: Optional confidence threshold (0.0 - 1.0). Default: 0.05
+        tiled: Count on overlapping full-resolution tiles (better for large, dense trays).
+               Default: SEED_TILED
+        format: Detection encoding:
+            "objects"  - list of {"bbox", "confidence", "class_id"} (default)
+            "columnar" - parallel arrays x1, y1, x2, y2, confidence, class_id
+            "count"    - count only, no detections
+            "binary"   - application/octet-stream of little-endian float32 rows
+                         (x1, y1, x2, y2, confidence, class_id); count in X-Seed-Count
     """
     try:
         # Validate file type
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(
+                status_code=400,
+                detail="File must be an image"
+            )
+        if format not in SEED_COUNT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"format must be one of: {', '.join(SEED_COUNT_FORMATS)}"
+            )
+
+        with stage_timer("seed_count", "upload_read"):
+            contents = await file.read()
+        if tiled is None:
+            tiled = SEED_TILED_DEFAULT
+
+        with stage_timer("seed_count", "inference"):
+            result = await predict_seed_count(
+                confidence=confidence,
+                cache_key=content_key(contents),
+                tiled=tiled,
+                load_image=_seed_image_loader(contents, tiled, "seed_count")
+            )
+
+        with stage_timer("seed_count", "serialization"):
+            return _seed_count_response(result, format)
+
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error counting fish seeds: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail="Error counting fish seeds"
+        )
+
+
+@app.post("/seed-count/sweep")
+async def sweep_fish_seed_count(
+    file: UploadFile = File(...),
+    thresholds: Optional[str] = Form(None),
+    tiled: Optional[bool] = Form(None),
+):
+    """
+    Fish seed counts at many confidence thresholds from a single inference.
+
+    Args:
+        file: Image file
+        thresholds: Optional comma-separated thresholds, e.g. "0.1,0.2,0.3".
+                    Default: SEED_SWEEP_THRESHOLDS
+        tiled: Count on overlapping full-resolution tiles. Default: SEED_TILED
+    """
+    try:
         if not file.content_type.startswith("image/"):
             raise HTTPException(
                 status_code=400,
                 detail="File must be an image"
             )
 
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
+        threshold_values = None
+        if thresholds:
+            try:
+                threshold_values = [float(t) for t in thresholds.split(",") if t.strip()]
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="thresholds must be comma-separated numbers"
+                )
 
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+        with stage_timer("seed_count_sweep", "upload_read"):
+            contents = await file.read()
+        if tiled is None:
+            tiled = SEED_TILED_DEFAULT
 
-        result = await predict_seed_count(image=image, confidence=confidence)
+        with stage_timer("seed_count_sweep", "inference"):
+            result = await sweep_seed_count(
+                thresholds=threshold_values,
+                cache_key=content_key(contents),
+                tiled=tiled,
+                load_image=_seed_image_loader(contents, tiled, "seed_count_sweep")
+            )
 
         return JSONResponse(
-            content={
-                "count": result["count"],
-                "confidence_threshold": result["confidence_threshold"],
-                "detections": result["detections"],
-            },
+            content=result,
             headers={
                 "Access-Control-Allow-Origin": "*",
             }
@@ -259,13 +701,249 @@ async def count_fish_seeds(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error counting fish seeds: {str(e)}")
+        logger.error(f"Error sweeping fish seed counts: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=500,
-            detail="Error counting fish seeds"
+            detail="Error sweeping fish seed counts"
+        )
+
+
+# The reload endpoint is disabled (404) unless a token is configured
+SEED_MODEL_ADMIN_TOKEN = os.getenv("SEED_MODEL_ADMIN_TOKEN", "").strip()
+# Reloads may only load weights from inside this directory
+SEED_MODEL_DIR = os.getenv(
+    "SEED_MODEL_DIR", os.path.dirname(seed_model_registry.path) or "."
+).strip() or "."
+
+
+def _resolve_seed_model_path(path: str) -> Optional[str]:
+    """Absolute path of a requested weights file, or None if it is outside SEED_MODEL_DIR"""
+    root = os.path.realpath(SEED_MODEL_DIR)
+    target = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, target]) != root:
+        return None
+    return target
+
+
+@app.post("/seed-count/model/reload")
+async def reload_seed_model(
+    request: Request,
+    path: Optional[str] = Form(None),
+):
+    """
+    Load a seed model in the background and swap it in once warmed up.
+
+    In-flight requests finish on the previous model. Applies to this process
+    only; with several workers, prefer SEED_MODEL_WATCH_INTERVAL.
+    Only available when SEED_MODEL_ADMIN_TOKEN is set; requires it in the
+    X-Admin-Token header.
+
+    Args:
+        path: Optional new weights file inside SEED_MODEL_DIR (absolute or
+            relative to it). Default: the current model path
+    """
+    if not SEED_MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), SEED_MODEL_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if inference_executor.kind != "thread":
+        raise HTTPException(
+            status_code=409,
+            detail="Hot reload requires INFERENCE_EXECUTOR=thread"
         )
 
+    target = seed_model_registry.path
+    if path:
+        # Weights files are pickles: never load one from outside the models directory
+        target = _resolve_seed_model_path(path)
+        if target is None:
+            raise HTTPException(status_code=400, detail="Seed model path must be inside SEED_MODEL_DIR")
+    if not os.path.exists(target):
+        raise HTTPException(status_code=404, detail=f"Seed model not found at '{target}'")
+
+    started = seed_model_registry.load_in_background(target, force=True)
+    if not started:
+        raise HTTPException(status_code=409, detail="A seed model load is already in progress")
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "loading",
+            "path": target,
+            "active": seed_model_registry.stats()["version"],
+        },
+        headers={
+            "Access-Control-Allow-Origin": "*",
+        }
+    )
+
+
+# ============================================================================
+# FRY STREAM COUNTING ENDPOINTS
+# ============================================================================
+
+@app.websocket("/seed-count/stream")
+async def stream_fry_count(websocket: WebSocket, confidence: Optional[float] = None):
+    """
+    Count unique fry crossing the counting line in a live stream of frames.
+
+    The client sends each frame as a binary message (JPEG or PNG) and the text
+    message "end" when done. After every processed batch the server replies with
+    a running summary; a final summary with "final": true precedes the close.
+    When inference falls behind, the oldest queued frames are dropped. Frames
+    that cannot be decoded are skipped and reported as "frames_invalid".
+    """
+    await websocket.accept()
+    if not local_model_available():
+        await websocket.close(code=1011, reason="Stream counting requires the local seed model")
+        return
+
+    counter = FryStreamCounter(confidence=confidence)
+    frame_ready = asyncio.Event()
+    receiving = True
+    disconnected = False
+
+    async def receive_frames():
+        nonlocal receiving, disconnected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    counter.submit(message["bytes"])
+                    frame_ready.set()
+                elif message.get("text") == "end":
+                    break
+        finally:
+            receiving = False
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while (receiving or counter.pending) and not disconnected:
+            if not counter.pending:
+                await frame_ready.wait()
+                frame_ready.clear()
+                continue
+            summary = await counter.process_pending()
+            await websocket.send_json(summary)
+
+        if not disconnected:
+            await websocket.send_json({**counter.summary(), "final": True})
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in fry stream counting: {str(e)}")
+        logger.error(traceback.format_exc())
+        await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
+
+
+@app.post("/seed-count/video")
+async def count_fry_in_video(
+    file: UploadFile = File(...),
+    confidence: Optional[float] = Form(None),
+):
+    """
+    Count unique fry crossing the counting line in an uploaded video.
+
+    Responds with newline-delimited JSON: a running summary after every
+    processed batch, then a final summary with "final": true.
+
+    Args:
+        file: Video file (any format OpenCV can read)
+        confidence: Optional detection threshold. Default: FRY_STREAM_CONFIDENCE
+    """
+    if not (file.content_type or "").startswith(("video/", "application/octet-stream")):
+        raise HTTPException(status_code=400, detail="File must be a video")
+    if not local_model_available():
+        raise HTTPException(status_code=503, detail="Video counting requires the local seed model")
+    try:
+        import cv2
+    except ImportError:
+        raise HTTPException(status_code=503, detail="OpenCV is not installed")
+
+    # OpenCV reads from a path; spool the upload to disk in chunks
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    capture = None
+    # Held while a worker thread reads frames, so the capture is never released mid-read
+    capture_lock = threading.Lock()
+
+    def cleanup():
+        nonlocal capture
+        with capture_lock:
+            if capture is not None:
+                capture.release()
+                capture = None
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    # Once the response streams, generate() owns the file; until then every exit removes it
+    streaming = False
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(1024 * 1024)
+                if not chunk:
+                    break
+                out.write(chunk)
+
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            raise HTTPException(status_code=400, detail="Could not decode video")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+
+        counter = FryStreamCounter(confidence=confidence, max_pending=None)
+
+        def read_batch() -> bool:
+            with capture_lock:
+                if capture is None:
+                    return False
+                return read_video_frames(capture, counter, counter.batch_size)
+
+        async def generate():
+            try:
+                more = True
+                while more:
+                    more = await asyncio.to_thread(read_batch)
+                    while counter.pending:
+                        summary = await counter.process_pending()
+                        if fps:
+                            summary["video_time"] = round(summary["frame"] / fps, 2)
+                        yield json.dumps(summary) + "\n"
+                yield json.dumps({**counter.summary(), "final": True}) + "\n"
+            except Exception as e:
+                logger.error(f"Error counting fry in video: {str(e)}")
+                logger.error(traceback.format_exc())
+                yield json.dumps({"error": "Error counting fry in video", "final": True}) + "\n"
+            finally:
+                # After a disconnect a read may still be running in its thread; release
+                # once it finishes, without blocking the event loop
+                asyncio.get_running_loop().run_in_executor(None, cleanup)
+
+        response = StreamingResponse(
+            generate(),
+            media_type="application/x-ndjson",
+            headers={
+                "Access-Control-Allow-Origin": "*",
+            },
+            # Also runs if the client leaves before the generator starts
+            background=BackgroundTask(cleanup)
+        )
+        streaming = True
+        return response
+    finally:
+        if not streaming:
+            cleanup()
+
 
 # ============================================================================
 # TEMPERATURE MONITORING ENDPOINTS
@@ -278,6 +956,21 @@ class TemperatureCheckRequest(BaseModel):
     species: Optional[str] = "Generic"
     previous_temperature: Optional[float] = None
     location: Optional[str] = "Unknown"
+    pond_id: Optional[str] = None
+    timestamp: Optional[Union[float, str]] = None
+
+
+class TemperatureBatchRequest(BaseModel):
+    """Request model for bulk temperature risk assessment"""
+    temperatures: List[float]
+    species: Union[str, List[str]] = "Generic"
+    previous_temperatures: Optional[List[Optional[float]]] = None
+    pond_ids: Optional[List[Optional[str]]] = None
+    timestamps: Optional[List[Optional[Union[float, str]]]] = None
+
+
+# Largest number of readings accepted by /temperature/assess-risk/batch
+TEMPERATURE_BATCH_MAX_READINGS = int(os.getenv("TEMPERATURE_BATCH_MAX_READINGS", "10000"))
 
 
 class LocationWeatherRequest(BaseModel):
@@ -297,6 +990,9 @@ async def assess_temperature_risk(request: TemperatureCheckRequest):
         species: Type of fish/shrimp (Tilapia, Catfish, Carp, Shrimp, etc.)
         previous_temperature: Previous reading for trend analysis
         location: Location identifier
+        pond_id: Pond identifier; the reading is added to the pond's history and
+            its rate of change per hour is used for trend analysis
+        timestamp: Reading time (epoch seconds or ISO 8601), defaults to now
         
     Returns:
         Risk assessment with issues, actions, and disease risks
@@ -312,30 +1008,278 @@ async def assess_temperature_risk(request: TemperatureCheckRequest):
         logger.info(f"Assessing temperature: {request.temperature}°C, species: {request.species}")
         
         # Get risk assessment
-        assessment = TemperatureRiskAssessor.classify_risk(
-            current_temp=request.temperature,
-            species=request.species,
-            previous_temp=request.previous_temperature,
-            location=request.location
+        await temperature_history.apreload([request.pond_id])
+        try:
+            assessment = TemperatureRiskAssessor.classify_risk(
+                current_temp=request.temperature,
+                species=request.species,
+                previous_temp=request.previous_temperature,
+                location=request.location,
+                pond_id=request.pond_id,
+                timestamp=request.timestamp
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid timestamp: {str(e)}")
+        
+        # Static fields come pre-serialized; only the numbers are encoded here
+        extra = None
+        if request.pond_id is not None:
+            extra = {"history": temperature_history.stats(request.pond_id)}
+        
+        return Response(
+            content=create_assessment_response_json(assessment, extra),
+            media_type="application/json",
+            headers={"Access-Control-Allow-Origin": "*"}
         )
         
-        response = create_assessment_response(assessment)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error assessing temperature risk: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error assessing risk: {str(e)}"
+        )
+
+
+@app.post("/temperature/assess-risk/batch")
+async def assess_temperature_risk_batch(request: TemperatureBatchRequest):
+    """
+    Assess temperature risk for many sensor readings in one call.
+    
+    Args:
+        temperatures: Current water temperatures in Celsius
+        species: One species for all readings, or a list with one per reading
+        previous_temperatures: Previous reading per entry (null where unknown)
+        pond_ids: Pond per entry (null to skip); recorded in order into each pond's history
+        timestamps: Reading time per entry (epoch seconds or ISO 8601), defaults to now
+        
+    Returns:
+        One result per reading, plus the issues, actions and disease risks of each
+        condition that occurs (shared by all results in that condition)
+    """
+    try:
+        count = len(request.temperatures)
+        if count > TEMPERATURE_BATCH_MAX_READINGS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {TEMPERATURE_BATCH_MAX_READINGS} readings per request"
+            )
+        
+        temperatures = np.asarray(request.temperatures, dtype=np.float64)
+        invalid = np.flatnonzero(~((temperatures >= -50) & (temperatures <= 60)))
+        if len(invalid):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Temperature must be between -50°C and 60°C (first invalid index: {int(invalid[0])})"
+            )
+        
+        await temperature_history.apreload(request.pond_ids or [])
+        try:
+            batch = TemperatureRiskAssessor.classify_batch(
+                temperatures,
+                species=request.species,
+                previous_temperatures=request.previous_temperatures,
+                pond_ids=request.pond_ids,
+                timestamps=request.timestamps
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return JSONResponse(
-            content=response,
+            content=create_batch_assessment_response(batch),
             headers={"Access-Control-Allow-Origin": "*"}
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error assessing temperature risk: {str(e)}")
+        logger.error(f"Error assessing temperature risk batch: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Error assessing risk: {str(e)}"
         )
 
 
+@app.get("/temperature/ponds/{pond_id}")
+async def get_pond_temperature_stats(pond_id: str):
+    """
+    Rolling statistics of a pond's recent readings.
+    
+    Returns:
+        Reading count, latest reading, window min/max/mean and rate of change per hour
+    """
+    stats = temperature_history.stats(pond_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No readings recorded for pond '{pond_id}'")
+    return JSONResponse(
+        content=stats,
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+
+
+def _query_epoch_seconds(value: Optional[str]) -> float:
+    """Epoch seconds from a query parameter holding epoch seconds or ISO 8601 (None = now)"""
+    if not value:
+        return to_epoch_seconds(None)
+    try:
+        seconds = float(value)
+    except ValueError:
+        return to_epoch_seconds(value)
+    if not math.isfinite(seconds):
+        raise ValueError("timestamp must be epoch seconds or an ISO 8601 string")
+    return seconds
+
+
+@app.get("/temperature/history/{pond_id}")
+async def get_pond_temperature_history(
+    pond_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resolution: Optional[str] = None,
+):
+    """
+    Stored temperature history of a pond for charts.
+    
+    Args:
+        start: Range start, epoch seconds or ISO 8601. Default: 24 hours before end
+        end: Range end, epoch seconds or ISO 8601. Default: now
+        resolution: "raw", "1m", "1h" or "1d". Default: finest resolution that
+            keeps the response within TEMPERATURE_HISTORY_MAX_POINTS points,
+            so long ranges are served from rollups
+        
+    Returns:
+        Points with timestamp, min, max, mean and count per bucket
+    """
+    if not temperature_store.enabled:
+        raise HTTPException(status_code=503, detail="Temperature store is disabled (TEMPERATURE_DB_PATH)")
+    try:
+        end_seconds = _query_epoch_seconds(end)
+        start_seconds = _query_epoch_seconds(start) if start else end_seconds - 86400
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid start or end: {str(e)}")
+    if start_seconds > end_seconds:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    try:
+        history = await asyncio.to_thread(
+            temperature_store.query, pond_id, start_seconds, end_seconds, resolution
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(
+        content=history,
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+
+
+def _stream_pond_ids(message) -> List[str]:
+    """Pond ids named by a decoded stream message, for preloading their history"""
+    readings = message if isinstance(message, list) else [message]
+    return [
+        reading["pond_id"] for reading in readings
+        if isinstance(reading, dict) and isinstance(reading.get("pond_id"), str)
+    ]
+
+
+def _ingest_stream_message(message) -> List[Dict]:
+    """Evaluate one decoded stream message (a reading or a list of readings) into events"""
+    events = []
+    for reading in message if isinstance(message, list) else [message]:
+        try:
+            event = temperature_stream_monitor.ingest_message(reading)
+        except ValueError as e:
+            event = {"event": "error", "detail": str(e)}
+        if event is not None:
+            events.append(event)
+    return events
+
+
+@app.websocket("/temperature/stream")
+async def stream_temperature_readings(websocket: WebSocket):
+    """
+    Continuous sensor ingestion with transition-only alerts.
+
+    The client sends text messages, each a JSON reading
+    {"pond_id", "temperature", "species"?, "timestamp"?} or a list of them.
+    The server sends nothing back for readings that leave a pond's risk level
+    unchanged; it sends a "risk_change" event when the level changes (with
+    hysteresis), and an "error" event for malformed readings.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                await websocket.send_json({"event": "error", "detail": "Message is not valid JSON"})
+                continue
+            await temperature_history.apreload(_stream_pond_ids(message))
+            for event in _ingest_stream_message(message):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in temperature stream: {str(e)}")
+        logger.error(traceback.format_exc())
+        await websocket.close(code=1011)
+
+
+@app.post("/temperature/stream")
+async def ingest_temperature_ndjson(request: Request):
+    """
+    Ingest newline-delimited JSON readings over one long-lived request.
+
+    The body is read incrementally, one reading per line (same fields as the
+    WebSocket stream). The response is NDJSON holding only the "risk_change"
+    and "error" events the readings produced, followed by a summary line.
+    Use the WebSocket stream to receive events while readings are still arriving.
+    """
+    readings = 0
+    events = []
+    buffer = b""
+
+    async def ingest_line(line: bytes, line_number: int):
+        nonlocal readings
+        line = line.strip()
+        if not line:
+            return
+        readings += 1
+        try:
+            message = json.loads(line)
+        except ValueError:
+            events.append({"event": "error", "line": line_number, "detail": "Line is not valid JSON"})
+            return
+        await temperature_history.apreload(_stream_pond_ids(message))
+        for event in _ingest_stream_message(message):
+            if event["event"] == "error":
+                event["line"] = line_number
+            events.append(event)
+
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            await ingest_line(line, line_number)
+    if buffer:
+        await ingest_line(buffer, line_number + 1)
+
+    summary = {
+        "event": "summary",
+        "readings": readings,
+        "risk_changes": sum(1 for event in events if event["event"] == "risk_change"),
+        "errors": sum(1 for event in events if event["event"] == "error"),
+    }
+    return Response(
+        content="".join(json.dumps(event) + "\n" for event in events + [summary]),
+        media_type="application/x-ndjson",
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+
+
 @app.post("/weather/location-check")
 async def check_location_weather(request: LocationWeatherRequest):
     """
@@ -406,28 +1350,29 @@ async def check_location_weather(request: LocationWeatherRequest):
                         "urgency_score": day_risk.urgency_score
                     })
         
-        return JSONResponse(
-            content={
-                "location": {
-                    "name": location_name,
-                    "latitude": lat,
-                    "longitude": lon,
-                    "timezone": weather.get("timezone", "Unknown")
-                },
-                "current_weather": {
-                    "temperature": current_temp,
-                    "conditions": weather.get("weather_description"),
-                    "humidity_percent": weather.get("humidity"),
-                    "wind_speed_kmh": weather.get("wind_speed"),
-                    "timestamp": weather.get("timestamp")
+        with stage_timer("location_check", "serialization"):
+            return JSONResponse(
+                content={
+                    "location": {
+                        "name": location_name,
+                        "latitude": lat,
+                        "longitude": lon,
+                        "timezone": weather.get("timezone", "Unknown")
+                    },
+                    "current_weather": {
+                        "temperature": current_temp,
+                        "conditions": weather.get("weather_description"),
+                        "humidity_percent": weather.get("humidity"),
+                        "wind_speed_kmh": weather.get("wind_speed"),
+                        "timestamp": weather.get("timestamp")
+                    },
+                    "risk_assessment": risk_response,
+                    "forecast_3day": forecast_data,
+                    "species": request.species,
+                    "api_used": "Open-Meteo (free, no API key)"
                 },
-                "risk_assessment": risk_response,
-                "forecast_3day": forecast_data,
-                "species": request.species,
-                "api_used": "Open-Meteo (free, no API key)"
-            },
-            headers={"Access-Control-Allow-Origin": "*"}
-        )
+                headers={"Access-Control-Allow-Origin": "*"}
+            )
         
     except HTTPException:
         raise
@@ -462,6 +1407,29 @@ async def get_species_list():
     )
 
 
+@app.get("/weather/locations/search")
+async def search_locations(q: str, limit: int = 10):
+    """
+    Prefix search over the offline gazetteer, e.g. for location autocomplete.
+    
+    Args:
+        q: Beginning of a place name (case and punctuation are ignored)
+        limit: Maximum number of places returned (1-50)
+        
+    Returns:
+        Matching places with display name and coordinates
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    if not 1 <= limit <= 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    
+    return JSONResponse(
+        content={"query": q, "results": gazetteer.search(q, limit)},
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+
+
 @app.get("/weather/health")
 async def weather_service_health():
     """Check if weather API is available"""
@@ -475,7 +1443,27 @@ async def weather_service_health():
         content={
             "status": status,
             "services": health,
-            "open_meteo": "Open-Meteo (primary service)"
+            "open_meteo": "Open-Meteo (primary service)",
+            "geocoding": {"gazetteer_places": len(gazetteer), "cache": geocode_cache.stats()}
         },
         headers={"Access-Control-Allow-Origin": "*"}
     )
+
+
+# ============================================================================
+# METRICS ENDPOINT
+# ============================================================================
+
+QUEUE_DEPTH.set_function(
+    lambda: classifier_batcher.queue_depth + inference_executor.waiting["classifier"],
+    model="classifier"
+)
+QUEUE_DEPTH.set_function(lambda: inference_executor.waiting["seed"], model="seed")
+INFERENCE_IN_FLIGHT.set_function(lambda: inference_executor.in_flight["classifier"], model="classifier")
+INFERENCE_IN_FLIGHT.set_function(lambda: inference_executor.in_flight["seed"], model="seed")
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus-style latency histograms, queue depths and in-flight counts"""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
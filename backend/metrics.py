@@ -0,0 +1,319 @@
+"""
+Runtime Metrics
+Lightweight in-process counters, gauges and latency histograms rendered in
+the Prometheus text exposition format on /metrics.
+Metrics are per process; in pre-fork mode each worker reports its own.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans cache hits (~µs) up to slow CPU inference and upstream timeouts
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class: a named metric family with fixed label names"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Report function() as the value for these labels on every scrape"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================================
+# APPLICATION METRICS
+# ============================================================================
+
+REQUEST_LATENCY = Histogram(
+    "aqua_http_request_duration_seconds",
+    "Total HTTP request latency by route",
+    ("method", "route", "status")
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "aqua_http_requests_in_flight",
+    "HTTP requests currently being handled by route",
+    ("route",)
+)
+
+STAGE_LATENCY = Histogram(
+    "aqua_stage_duration_seconds",
+    "Latency of individual request stages (upload_read, decode, preprocessing, inference, enrichment, serialization)",
+    ("endpoint", "stage")
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "aqua_upstream_request_duration_seconds",
+    "Latency of outbound HTTP calls by service and call",
+    ("service", "call", "outcome")
+)
+
+BATCH_SIZE = Histogram(
+    "aqua_inference_batch_size",
+    "Number of inputs per batched forward pass",
+    ("model",),
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+QUEUE_WAIT = Histogram(
+    "aqua_inference_queue_wait_seconds",
+    "Time a request waits in the batching queue before its batch is dispatched",
+    ("model",)
+)
+
+QUEUE_DEPTH = Gauge(
+    "aqua_inference_queue_depth",
+    "Requests waiting for inference by model",
+    ("model",)
+)
+
+INFERENCE_LATENCY = Histogram(
+    "aqua_inference_duration_seconds",
+    "Execution time of one (batched) inference call by model",
+    ("model",)
+)
+
+INFERENCE_IN_FLIGHT = Gauge(
+    "aqua_inference_in_flight",
+    "Inference calls currently executing by model",
+    ("model",)
+)
+
+SEED_ROUTING_DECISIONS = Counter(
+    "aqua_seed_routing_decisions_total",
+    "Seed-count backend routing decisions by chosen backend and reason",
+    ("backend", "reason")
+)
+
+
+GEOCODE_LOOKUPS = Counter(
+    "aqua_geocode_lookups_total",
+    "Place-name lookups by where they were answered (gazetteer, cache, api, stale, failed)",
+    ("source",)
+)
+
+
+@contextmanager
+def stage_timer(endpoint: str, stage: str) -> Iterator[None]:
+    """Time one stage of a request, e.g. ``with stage_timer("predict", "decode"):``"""
+    with STAGE_LATENCY.time(endpoint=endpoint, stage=stage):
+        yield
+
+
+@contextmanager
+def upstream_timer(service: str, call: str) -> Iterator[Dict[str, str]]:
+    """
+    Time an outbound HTTP call.
+
+    Yields a dict whose "outcome" the caller may overwrite (e.g. with the
+    HTTP status); exceptions are recorded as "error".
+    """
+    start = time.perf_counter()
+    state = {"outcome": "ok"}
+    try:
+        yield state
+    except BaseException:
+        state["outcome"] = "error"
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(
+            time.perf_counter() - start, service=service, call=call, outcome=state["outcome"]
+        )
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every registered metric"""
+    return REGISTRY.render()
@@ -0,0 +1,220 @@
+"""
+Content-Addressed Prediction Cache
+Caches raw model output keyed by a hash of the uploaded image bytes, so
+re-uploads of the same photo (retries, language switches) skip inference.
+In-memory LRU tier with a TTL, plus an optional disk tier that survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "1024"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "86400"))
+
+# Disk tier is disabled unless a directory is configured
+PREDICTION_CACHE_DIR = os.getenv("PREDICTION_CACHE_DIR", "").strip() or None
+PREDICTION_CACHE_DISK_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_DISK_MAX_ENTRIES", "10000"))
+
+# How many disk writes between size checks of the disk tier
+_DISK_PRUNE_INTERVAL = 100
+
+
+def content_key(contents: bytes) -> str:
+    """Hash uploaded bytes into a cache key"""
+    return hashlib.sha256(contents).hexdigest()
+
+
+class PredictionCache:
+    """
+    Two-tier LRU cache for JSON-serializable model output.
+
+    The memory tier is bounded by ``max_entries`` and evicts least recently
+    used entries. The optional disk tier stores one JSON file per entry under
+    ``disk_dir/<name>/`` and is pruned by modification time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = PREDICTION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+        disk_dir: Optional[str] = PREDICTION_CACHE_DIR,
+        disk_max_entries: int = PREDICTION_CACHE_DISK_MAX_ENTRIES
+    ):
+        """
+        Args:
+            name: Cache namespace (also the disk subdirectory)
+            max_entries: Maximum entries held in memory
+            ttl_seconds: Lifetime of an entry in both tiers
+            disk_dir: Root directory for the disk tier, or None to disable it
+            disk_max_entries: Maximum entries kept on disk
+        """
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self.disk_path = os.path.join(disk_dir, name) if disk_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+
+        if self.disk_path:
+            try:
+                os.makedirs(self.disk_path, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Disabling disk tier for {name} cache: {e}")
+                self.disk_path = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        if entry is not None:
+            # Promote to memory for subsequent lookups
+            self._store_memory(key, entry[1], entry[0])
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key in every enabled tier"""
+        expires_at = time.time() + self.ttl_seconds
+        self._store_memory(key, value, expires_at)
+        self._write_disk(key, value, expires_at)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async get; disk reads run in a worker thread"""
+        if self.disk_path is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """Async set; disk writes run in a worker thread"""
+        if self.disk_path is None:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for health reporting"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk": self.disk_path is not None,
+        }
+
+    def _store_memory(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if self.disk_path is None:
+            return None
+
+        path = self._disk_file(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable {self.name} cache entry {key}: {e}")
+            self._remove_disk(path)
+            return None
+
+        expires_at = data.get("expires_at", 0)
+        if expires_at <= now:
+            self._remove_disk(path)
+            return None
+        return expires_at, data.get("value")
+
+    def _write_disk(self, key: str, value: Any, expires_at: float) -> None:
+        if self.disk_path is None:
+            return
+
+        path = self._disk_file(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f)
+            # Atomic rename so concurrent readers never see partial files
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write {self.name} cache entry {key}: {e}")
+            self._remove_disk(tmp_path)
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % _DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Drop the oldest files once the disk tier exceeds its bound"""
+        entries = []
+        try:
+            for entry in os.scandir(self.disk_path):
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Failed to scan {self.name} cache directory: {e}")
+            return
+
+        excess = len(entries) - self.disk_max_entries
+        if excess <= 0:
+            return
+
+        entries.sort()
+        for _, path in entries[:excess]:
+            self._remove_disk(path)
+        logger.info(f"Pruned {excess} entries from {self.name} disk cache")
+
+    @staticmethod
+    def _remove_disk(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Raw classifier output (list of {"label", "score"}) per image
+classifier_cache = PredictionCache("classifier")
+
+# Seed-count detections down to the confidence floor, keyed by image, counting
+# mode, backend and model identity; thresholds are applied after the lookup
+seed_cache = PredictionCache("seed")
@@ -0,0 +1,212 @@
+"""
+Roboflow Client
+Long-lived, pooled HTTP client for the hosted Roboflow detection API used as
+the remote seed-count backend. Uploads are downscaled and JPEG-encoded
+(bboxes are mapped back to the input image), calls are capped in concurrency
+and retried with exponential backoff on transient failures.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+from metrics import upstream_timer
+
+logger = logging.getLogger(__name__)
+
+ROBOFLOW_MODEL_ID_DEFAULT = "fish-fry-detection-for-counting/1"
+ROBOFLOW_BASE_URL_DEFAULT = "https://detect.roboflow.com"
+
+# Longer side of the uploaded image (0 = upload at input resolution)
+ROBOFLOW_UPLOAD_MAX_SIDE = int(os.getenv("ROBOFLOW_UPLOAD_MAX_SIDE", "1024"))
+ROBOFLOW_UPLOAD_JPEG_QUALITY = int(os.getenv("ROBOFLOW_UPLOAD_JPEG_QUALITY", "85"))
+
+ROBOFLOW_TIMEOUT_SECONDS = float(os.getenv("ROBOFLOW_TIMEOUT_SECONDS", "60"))
+ROBOFLOW_MAX_CONCURRENCY = int(os.getenv("ROBOFLOW_MAX_CONCURRENCY", "4"))
+# Retries after the first attempt, for connection errors, timeouts, 429 and 5xx
+ROBOFLOW_MAX_RETRIES = int(os.getenv("ROBOFLOW_MAX_RETRIES", "2"))
+ROBOFLOW_RETRY_BACKOFF_SECONDS = float(os.getenv("ROBOFLOW_RETRY_BACKOFF_SECONDS", "0.5"))
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Lowest (highest) confidence the API accepts; requests are clamped into this range
+ROBOFLOW_MIN_CONFIDENCE = 0.01
+ROBOFLOW_MAX_CONFIDENCE = 0.99
+
+
+def get_roboflow_config() -> Tuple[str, str, str]:
+    api_key = os.getenv("ROBOFLOW_API_KEY", "").strip()
+    model_id = os.getenv("ROBOFLOW_MODEL_ID", ROBOFLOW_MODEL_ID_DEFAULT).strip()
+    base_url = os.getenv("ROBOFLOW_BASE_URL", ROBOFLOW_BASE_URL_DEFAULT).strip()
+    return api_key, model_id, base_url
+
+
+def roboflow_configured() -> bool:
+    return bool(get_roboflow_config()[0])
+
+
+def encode_upload(image: Image.Image) -> Tuple[bytes, float]:
+    """
+    Downscale and JPEG-encode an image for upload (blocking).
+
+    Returns:
+        Tuple of (JPEG bytes, scale of the upload relative to the input image)
+    """
+    image = image.convert("RGB")
+    width = image.width
+    longest = max(image.size)
+    if ROBOFLOW_UPLOAD_MAX_SIDE and longest > ROBOFLOW_UPLOAD_MAX_SIDE:
+        factor = ROBOFLOW_UPLOAD_MAX_SIDE / longest
+        size = (max(1, round(image.width * factor)), max(1, round(image.height * factor)))
+        image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=ROBOFLOW_UPLOAD_JPEG_QUALITY)
+    return buffer.getvalue(), image.width / width
+
+
+def _parse_predictions(predictions: List[Dict[str, Any]], scale: float) -> np.ndarray:
+    """
+    Convert Roboflow center/size boxes to an (N, 6) array of
+    x1, y1, x2, y2, confidence, class_id in input-image coordinates.
+    """
+    if not predictions:
+        return np.empty((0, 6), dtype=np.float32)
+
+    # class_id is numeric like the local model's; "class" holds the class name
+    raw = np.array(
+        [
+            (p.get("x", 0), p.get("y", 0), p.get("width", 0), p.get("height", 0),
+             p.get("confidence", 0), p.get("class_id", 0))
+            for p in predictions
+        ],
+        dtype=np.float64,
+    )
+    centers, sizes = raw[:, :2] / scale, raw[:, 2:4] / scale
+    return np.column_stack([centers - sizes / 2, centers + sizes / 2, raw[:, 4:6]]).astype(np.float32)
+
+
+class RoboflowClient:
+    """
+    Pooled client for Roboflow hosted detection.
+
+    The underlying httpx client is created on first use, so it binds to the
+    serving event loop, and is kept alive until aclose() at shutdown.
+    """
+
+    def __init__(
+        self,
+        timeout: float = ROBOFLOW_TIMEOUT_SECONDS,
+        max_concurrency: int = ROBOFLOW_MAX_CONCURRENCY,
+        max_retries: int = ROBOFLOW_MAX_RETRIES,
+        backoff: float = ROBOFLOW_RETRY_BACKOFF_SECONDS
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._slots = None
+
+    async def _post_with_retries(self, url: str, params: Dict[str, Any], jpeg: bytes) -> httpx.Response:
+        client = self._ensure_client()
+        attempt = 0
+        while True:
+            try:
+                with upstream_timer("roboflow", "detect") as call:
+                    response = await client.post(
+                        url,
+                        params=params,
+                        files={"file": ("image.jpg", jpeg, "image/jpeg")},
+                    )
+                    call["outcome"] = str(response.status_code)
+                if response.status_code not in _RETRYABLE_STATUS or attempt >= self.max_retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+
+            # Exponential backoff with jitter so concurrent retries spread out
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            attempt += 1
+            logger.warning(f"Roboflow request failed ({reason}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def detect(self, image: Image.Image, confidence: float) -> Dict[str, Any]:
+        """
+        Run hosted detection on an image.
+
+        Args:
+            image: Input image
+            confidence: Threshold as a fraction (0-1) or percentage
+
+        Returns:
+            Dict with count, confidence_threshold and boxes, an (N, 6) detection array
+            in input-image coordinates
+        """
+        api_key, model_id, base_url = get_roboflow_config()
+        if not api_key:
+            raise RuntimeError(
+                "Roboflow API key is not configured. Set ROBOFLOW_API_KEY or provide a local model path."
+            )
+
+        # Roboflow expects confidence as percentage (0-100)
+        conf_percent = confidence * 100 if confidence <= 1 else confidence
+        conf_percent = max(ROBOFLOW_MIN_CONFIDENCE * 100, min(ROBOFLOW_MAX_CONFIDENCE * 100, conf_percent))
+
+        url = f"{base_url.rstrip('/')}/{model_id}"
+        params = {
+            "api_key": api_key,
+            "confidence": conf_percent,
+        }
+
+        jpeg, scale = await asyncio.to_thread(encode_upload, image)
+
+        self._ensure_client()
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                response = await self._post_with_retries(url, params, jpeg)
+            finally:
+                self.in_flight -= 1
+        response.raise_for_status()
+        data = response.json()
+
+        boxes = _parse_predictions(data.get("predictions", []), scale)
+        return {
+            "count": len(boxes),
+            "confidence_threshold": conf_percent / 100,
+            "boxes": boxes,
+        }
+
+
+# Shared by all requests in this process
+roboflow_client = RoboflowClient()
@@ -1,140 +1,422 @@
 import os
-import base64
-import io
-from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+import numpy as np
 from PIL import Image
-import httpx
 
-try:
-    from ultralytics import YOLO
-except Exception:  # pragma: no cover - handled at runtime
-    YOLO = None
+from inference_executor import inference_executor
+from prediction_cache import content_key, seed_cache
+from seed_model_registry import DEFAULT_MODEL_PATH, YOLO, seed_model_registry
+from roboflow_client import ROBOFLOW_MIN_CONFIDENCE, get_roboflow_config
+from seed_routing import REMOTE, SeedBackendRouter
 
-MODEL_ENV_KEY = "FISH_SEED_MODEL_PATH"
-DEFAULT_MODEL_PATH = os.getenv(MODEL_ENV_KEY, "models/fish_seed_count.pt")
 DEFAULT_CONFIDENCE = float(os.getenv("FISH_SEED_CONFIDENCE", "0.05"))
 
-ROBOFLOW_MODEL_ID_DEFAULT = "fish-fry-detection-for-counting/1"
-ROBOFLOW_BASE_URL_DEFAULT = "https://detect.roboflow.com"
+# Tiled counting: overlapping SEED_TILE_SIZE crops at full resolution, merged across seams
+SEED_TILED_DEFAULT = os.getenv("SEED_TILED", "false").strip().lower() == "true"
+SEED_TILE_SIZE = int(os.getenv("SEED_TILE_SIZE", "640"))
+SEED_TILE_OVERLAP = float(os.getenv("SEED_TILE_OVERLAP", "0.2"))
+# Tiles per forward pass; batches run concurrently up to SEED_MODEL_MAX_CONCURRENCY
+SEED_TILE_BATCH_SIZE = int(os.getenv("SEED_TILE_BATCH_SIZE", "8"))
+# Boxes overlapping by more than this fraction of the smaller box are the same fry
+SEED_TILE_MERGE_THRESHOLD = float(os.getenv("SEED_TILE_MERGE_THRESHOLD", "0.5"))
 
-_yolo_model = None
+# Column order of detection arrays and of the columnar / binary response formats
+DETECTION_COLUMNS = ("x1", "y1", "x2", "y2", "confidence", "class_id")
 
+# Inference always runs down to this threshold; higher thresholds filter the stored detections
+SEED_CONFIDENCE_FLOOR = float(os.getenv("SEED_CONFIDENCE_FLOOR", "0.01"))
+# Default thresholds for /seed-count/sweep
+SEED_SWEEP_THRESHOLDS = [
+    float(t) for t in os.getenv(
+        "SEED_SWEEP_THRESHOLDS", "0.05,0.1,0.15,0.2,0.25,0.3,0.35,0.4,0.45,0.5,0.6,0.7,0.8,0.9"
+    ).split(",") if t.strip()
+]
 
-def _ensure_ultralytics_available() -> None:
-    if YOLO is None:
-        raise RuntimeError(
-            "Ultralytics is not installed. Please add 'ultralytics' to backend requirements."
-        )
+def get_seed_model():
+    """The active seed-count model (see SeedModelRegistry.get)"""
+    return seed_model_registry.get()
 
 
-def get_seed_model():
-    global _yolo_model
-    _ensure_ultralytics_available()
+def _boxes_to_array(result) -> np.ndarray:
+    """(N, 6) array of x1, y1, x2, y2, confidence, class_id from one YOLO result"""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 6), dtype=np.float32)
 
-    if _yolo_model is None:
-        if not os.path.exists(DEFAULT_MODEL_PATH):
-            raise FileNotFoundError(
-                f"Seed count model not found at '{DEFAULT_MODEL_PATH}'. "
-                f"Set {MODEL_ENV_KEY} to the correct .pt file."
-            )
-        _yolo_model = YOLO(DEFAULT_MODEL_PATH)
+    # One device-to-host copy per tensor instead of several per box
+    return np.concatenate(
+        [
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy()[:, None],
+            boxes.cls.cpu().numpy()[:, None],
+        ],
+        axis=1,
+    ).astype(np.float32)
 
-    return _yolo_model
 
+def detections_to_objects(boxes: np.ndarray) -> List[Dict[str, Any]]:
+    """Convert an (N, 6) detection array to {"bbox", "confidence", "class_id"} dicts"""
+    bboxes = np.round(boxes[:, :4].astype(np.float64), 2).tolist()
+    confidences = np.round(boxes[:, 4].astype(np.float64), 4).tolist()
+    class_ids = boxes[:, 5].astype(int).tolist()
+    return [
+        {"bbox": bbox, "confidence": conf, "class_id": cls}
+        for bbox, conf, cls in zip(bboxes, confidences, class_ids)
+    ]
 
-def _get_roboflow_config() -> Tuple[str, str, str]:
-    api_key = os.getenv("ROBOFLOW_API_KEY", "").strip()
-    model_id = os.getenv("ROBOFLOW_MODEL_ID", ROBOFLOW_MODEL_ID_DEFAULT).strip()
-    base_url = os.getenv("ROBOFLOW_BASE_URL", ROBOFLOW_BASE_URL_DEFAULT).strip()
-    return api_key, model_id, base_url
 
+def detections_to_columns(boxes: np.ndarray) -> Dict[str, List[float]]:
+    """Convert an (N, 6) detection array to parallel per-column lists"""
+    columns = {
+        name: np.round(boxes[:, i].astype(np.float64), 2).tolist()
+        for i, name in enumerate(DETECTION_COLUMNS[:4])
+    }
+    columns["confidence"] = np.round(boxes[:, 4].astype(np.float64), 4).tolist()
+    columns["class_id"] = boxes[:, 5].astype(int).tolist()
+    return columns
 
-async def _predict_with_roboflow(image: Image.Image, confidence: float) -> Dict[str, Any]:
-    api_key, model_id, base_url = _get_roboflow_config()
-    if not api_key:
-        raise RuntimeError(
-            "Roboflow API key is not configured. Set ROBOFLOW_API_KEY or provide a local model path."
-        )
 
-    buffered = image.convert("RGB")
-    async with httpx.AsyncClient(timeout=60) as client:
-        png_buffer = io.BytesIO()
-        buffered.save(png_buffer, format="PNG")
-        png_bytes = png_buffer.getvalue()
-
-        # Roboflow expects confidence as percentage (0-100)
-        conf_percent = confidence * 100 if confidence <= 1 else confidence
-        conf_percent = max(1, min(99, conf_percent))
-
-        url = f"{base_url.rstrip('/')}/{model_id}"
-        params = {
-            "api_key": api_key,
-            "confidence": conf_percent,
-        }
-
-        files = {"file": ("image.png", png_bytes, "image/png")}
-        response = await client.post(url, params=params, files=files)
-        response.raise_for_status()
-        data = response.json()
-
-    predictions = data.get("predictions", [])
-    detections = []
-    for pred in predictions:
-        x = float(pred.get("x", 0))
-        y = float(pred.get("y", 0))
-        w = float(pred.get("width", 0))
-        h = float(pred.get("height", 0))
-        conf = float(pred.get("confidence", 0))
-        class_id = pred.get("class", 0)
-        detections.append(
-            {
-                "bbox": [round(x - w / 2, 2), round(y - h / 2, 2), round(x + w / 2, 2), round(y + h / 2, 2)],
-                "confidence": round(conf, 4),
-                "class_id": class_id,
-            }
+def detections_to_bytes(boxes: np.ndarray) -> bytes:
+    """Row-major little-endian float32 encoding of an (N, 6) detection array"""
+    return np.ascontiguousarray(boxes, dtype="<f4").tobytes()
+
+
+def _run_local_model(image: Image.Image, conf_threshold: float) -> np.ndarray:
+    """Run the local YOLO model on one image (blocking; called on the inference executor)"""
+    model = get_seed_model()
+    results = model.predict(source=image, conf=conf_threshold, verbose=False)
+    if not results:
+        return np.empty((0, 6), dtype=np.float32)
+    return _boxes_to_array(results[0])
+
+
+def detect_frames(frames: List[Any], conf_threshold: float, imgsz: int) -> List[np.ndarray]:
+    """
+    Run a batch of video frames through the local YOLO model in one forward pass
+    (blocking; called on the inference executor).
+
+    Returns:
+        One (N, 6) detection array per frame, in that frame's pixel coordinates
+    """
+    model = get_seed_model()
+    results = model.predict(source=frames, conf=conf_threshold, imgsz=imgsz, verbose=False)
+    return [_boxes_to_array(result) for result in results]
+
+
+def local_model_available() -> bool:
+    return YOLO is not None and os.path.exists(seed_model_registry.path)
+
+
+def local_model_ready() -> bool:
+    # Process-pool workers load their own copy; this process's registry stays empty
+    return inference_executor.kind == "process" or seed_model_registry.active is not None
+
+
+def _tile_origins(length: int, tile: int, stride: int) -> List[int]:
+    """Start offsets along one axis; the last tile is aligned to the far edge"""
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile, stride))
+    origins.append(length - tile)
+    return origins
+
+
+def _tile_image(image: Image.Image) -> Tuple[List[Image.Image], List[Tuple[int, int]]]:
+    """Split an image into overlapping tiles and their (left, top) offsets"""
+    stride = max(1, int(SEED_TILE_SIZE * (1 - SEED_TILE_OVERLAP)))
+    width, height = image.size
+
+    tiles = []
+    offsets = []
+    for top in _tile_origins(height, SEED_TILE_SIZE, stride):
+        for left in _tile_origins(width, SEED_TILE_SIZE, stride):
+            right = min(left + SEED_TILE_SIZE, width)
+            bottom = min(top + SEED_TILE_SIZE, height)
+            tiles.append(image.crop((left, top, right, bottom)))
+            offsets.append((left, top))
+    return tiles, offsets
+
+
+def _run_local_model_tiles(
+    tiles: List[Image.Image],
+    offsets: List[Tuple[int, int]],
+    conf_threshold: float
+) -> np.ndarray:
+    """
+    Run a batch of tiles through the local YOLO model in one forward pass
+    (blocking; called on the inference executor).
+
+    Returns:
+        (N, 6) detection array in full-image coordinates
+    """
+    model = get_seed_model()
+    results = model.predict(source=tiles, conf=conf_threshold, imgsz=SEED_TILE_SIZE, verbose=False)
+
+    arrays = []
+    for result, (left, top) in zip(results, offsets):
+        boxes = _boxes_to_array(result)
+        boxes[:, [0, 2]] += left
+        boxes[:, [1, 3]] += top
+        arrays.append(boxes)
+
+    if not arrays:
+        return np.empty((0, 6), dtype=np.float32)
+    return np.concatenate(arrays)
+
+
+def _merge_tile_detections(detections: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Greedy NMS over detections from all tiles.
+
+    Overlap is measured against the smaller box rather than the union: a fry
+    cut by a tile edge gives a partial box lying inside the full box from the
+    neighbouring tile, and plain IoU would keep both.
+    """
+    if len(detections) < 2:
+        return detections
+
+    x1, y1, x2, y2 = (detections[:, i] for i in range(4))
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-detections[:, 4], kind="stable")
+
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        smaller = np.maximum(np.minimum(areas[best], areas[rest]), 1e-6)
+        duplicate = (inter_w * inter_h / smaller > threshold) & (detections[rest, 5] == detections[best, 5])
+        order = rest[~duplicate]
+
+    return detections[keep]
+
+
+async def _run_local_model_tiled(image: Image.Image, conf_threshold: float) -> Tuple[np.ndarray, int]:
+    """
+    Count on overlapping full-resolution tiles.
+
+    Returns:
+        Tuple of (merged detections, number of tiles)
+    """
+    tiles, offsets = await asyncio.to_thread(_tile_image, image)
+
+    batch_size = max(1, SEED_TILE_BATCH_SIZE)
+    batches = [
+        inference_executor.run(
+            "seed",
+            _run_local_model_tiles,
+            tiles[start:start + batch_size],
+            offsets[start:start + batch_size],
+            conf_threshold,
         )
+        for start in range(0, len(tiles), batch_size)
+    ]
+    arrays = await asyncio.gather(*batches)
 
-    return {
-        "count": len(detections),
-        "confidence_threshold": conf_percent / 100,
-        "detections": detections,
+    merged = await asyncio.to_thread(
+        _merge_tile_detections, np.concatenate(arrays), SEED_TILE_MERGE_THRESHOLD
+    )
+    return merged, len(tiles)
+
+
+def _prepare_for_storage(boxes: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Map boxes onto the original photo, round them, and sort by descending confidence.
+
+    With confidences sorted, the detections above any threshold are a prefix
+    found by binary search.
+    """
+    boxes = boxes.astype(np.float64)
+    if scale != 1:
+        boxes[:, :4] /= scale
+    boxes[:, :4] = np.round(boxes[:, :4], 2)
+    boxes[:, 4] = np.round(boxes[:, 4], 4)
+    return boxes[np.argsort(-boxes[:, 4], kind="stable")]
+
+
+def _stored_boxes(stored: Dict[str, Any]) -> np.ndarray:
+    return np.asarray(stored["boxes"], dtype=np.float64).reshape(-1, 6)
+
+
+def _count_at_or_above(sorted_desc_confidences: np.ndarray, thresholds: Any) -> Any:
+    """Number of detections with confidence >= each threshold"""
+    return np.searchsorted(-sorted_desc_confidences, -np.asarray(thresholds), side="right")
+
+
+def _clamp_confidence(confidence: float) -> float:
+    return max(0.001, min(0.999, confidence))
+
+
+async def _detect_local(image: Image.Image, confidence: float, tiled: bool) -> Dict[str, Any]:
+    """Local YOLO detections in input-image coordinates"""
+    if tiled:
+        boxes, tile_count = await _run_local_model_tiled(image, confidence)
+        return {"boxes": boxes, "tiles": tile_count}
+    boxes = await inference_executor.run("seed", _run_local_model, image, confidence)
+    return {"boxes": boxes}
+
+
+# Picks the local model or Roboflow per request based on availability and load
+seed_router = SeedBackendRouter(_detect_local, local_model_available, local_model_ready)
+
+
+ImageLoader = Callable[[], Awaitable[Tuple[Image.Image, float]]]
+
+
+def _backend_floor(backend: str, floor: float) -> float:
+    """Confidence floor a backend actually applies when asked for floor"""
+    return max(floor, ROBOFLOW_MIN_CONFIDENCE) if backend == REMOTE else floor
+
+
+def _model_identity(backend: str) -> str:
+    """Which model a backend currently runs, so a hot-swap does not serve stale detections"""
+    if backend == REMOTE:
+        return get_roboflow_config()[1]
+    active = seed_model_registry.active
+    if active is not None:
+        return f"{active.version}-{active.format}"
+    # Process-pool workers load their own copy of the file and never swap it
+    try:
+        return f"{seed_model_registry.path}@{os.path.getmtime(seed_model_registry.path)}"
+    except OSError:
+        return seed_model_registry.path
+
+
+def _detections_key(cache_key: str, mode: str, backend: str) -> str:
+    # Hashed: model ids contain "/" and keys double as disk cache file names
+    model = content_key(_model_identity(backend).encode("utf-8"))[:12]
+    return f"{cache_key}-{mode}-{backend}-{model}-boxes"
+
+
+async def _detect_all(
+    image: Optional[Image.Image],
+    min_confidence: float,
+    cache_key: Optional[str],
+    input_scale: float,
+    tiled: bool,
+    load_image: Optional[ImageLoader] = None
+) -> Dict[str, Any]:
+    """
+    Detections down to the confidence floor, computed once per image.
+
+    Inference runs at min(SEED_CONFIDENCE_FLOOR, min_confidence) (Roboflow
+    raises it to ROBOFLOW_MIN_CONFIDENCE) so that any higher threshold can
+    later be answered by filtering the stored result.
+    If image is None, load_image is awaited for (image, input_scale) on a cache miss,
+    so threshold changes skip decoding as well as inference.
+
+    Returns:
+        Dict with floor, backend, boxes and optionally tiles; boxes are
+        [x1, y1, x2, y2, confidence, class_id] rows in original-photo
+        coordinates, sorted by descending confidence
+    """
+    # Stored per image + mode + backend + model, independent of the requested threshold.
+    # The backend is the router's current pick; results are stored under the one that actually ran.
+    mode = "tiled" if tiled else "full"
+    backend, _ = seed_router.choose(tiled)
+    floor = _backend_floor(backend, min(SEED_CONFIDENCE_FLOOR, min_confidence))
+    detections_key = _detections_key(cache_key, mode, backend) if cache_key else None
+    if detections_key:
+        cached = await seed_cache.aget(detections_key)
+        if cached is not None and cached["floor"] <= floor:
+            return cached
+
+    if image is None:
+        image, input_scale = await load_image()
+
+    stored = await seed_router.detect(image, floor, tiled)
+    stored.setdefault("floor", floor)
+    # Plain lists keep the entry JSON-serializable for the disk cache
+    stored["boxes"] = _prepare_for_storage(stored["boxes"], input_scale).tolist()
+
+    if detections_key:
+        # Keyed by the model identity from before inference, in case of a swap meanwhile
+        if stored["backend"] != backend:
+            detections_key = _detections_key(cache_key, mode, stored["backend"])
+        await seed_cache.aset(detections_key, stored)
+    return stored
+
+
+async def predict_seed_count(
+    image: Optional[Image.Image] = None,
+    confidence: Optional[float] = None,
+    cache_key: Optional[str] = None,
+    input_scale: float = 1.0,
+    tiled: Optional[bool] = None,
+    load_image: Optional[ImageLoader] = None
+) -> Dict[str, Any]:
+    """
+    Count fish seeds in an image with the local model, or Roboflow if no model is present.
+
+    Detections are computed once per image at the confidence floor, so
+    repeated requests with a different threshold only filter stored results.
+
+    Args:
+        image: RGB image, or None to use load_image
+        confidence: Detection threshold (defaults to FISH_SEED_CONFIDENCE)
+        cache_key: Content hash of the upload, enables result caching
+        input_scale: Scale of image relative to the original photo
+        tiled: Count on overlapping tiles (local model only; defaults to SEED_TILED)
+        load_image: Coroutine function returning (image, input_scale), awaited only on a cache miss
+
+    Returns:
+        Dict with count, confidence_threshold and boxes, an (N, 6) array of
+        DETECTION_COLUMNS in original-photo coordinates (see detections_to_objects)
+    """
+    conf_threshold = _clamp_confidence(DEFAULT_CONFIDENCE if confidence is None else confidence)
+    tiled = SEED_TILED_DEFAULT if tiled is None else tiled
+
+    stored = await _detect_all(image, conf_threshold, cache_key, input_scale, tiled, load_image)
+    # Below the backend's floor, the count is the count at the floor; report that threshold
+    conf_threshold = max(conf_threshold, stored["floor"])
+    boxes = _stored_boxes(stored)
+    count = int(_count_at_or_above(boxes[:, 4], conf_threshold))
+
+    result = {
+        "count": count,
+        "confidence_threshold": conf_threshold,
+        "boxes": boxes[:count],
     }
+    if "tiles" in stored:
+        result["tiles"] = stored["tiles"]
+    return result
+
+
+async def sweep_seed_count(
+    image: Optional[Image.Image] = None,
+    thresholds: Optional[List[float]] = None,
+    cache_key: Optional[str] = None,
+    input_scale: float = 1.0,
+    tiled: Optional[bool] = None,
+    load_image: Optional[ImageLoader] = None
+) -> Dict[str, Any]:
+    """
+    Seed counts at many confidence thresholds from a single inference.
+
+    Args:
+        image: RGB image, or None to use load_image
+        thresholds: Thresholds to evaluate (defaults to SEED_SWEEP_THRESHOLDS)
+        cache_key: Content hash of the upload, enables result caching
+        input_scale: Scale of image relative to the original photo
+        tiled: Count on overlapping tiles (local model only; defaults to SEED_TILED)
+        load_image: Coroutine function returning (image, input_scale), awaited only on a cache miss
 
+    Returns:
+        Dict with ascending thresholds and the count at each
+    """
+    thresholds = sorted({_clamp_confidence(t) for t in (thresholds or SEED_SWEEP_THRESHOLDS)})
+    tiled = SEED_TILED_DEFAULT if tiled is None else tiled
 
-async def predict_seed_count(image: Image.Image, confidence: Optional[float] = None) -> Dict[str, Any]:
-    conf_threshold = DEFAULT_CONFIDENCE if confidence is None else confidence
-    conf_threshold = max(0.001, min(0.999, conf_threshold))
-
-    if os.path.exists(DEFAULT_MODEL_PATH):
-        model = get_seed_model()
-        results = model.predict(source=image, conf=conf_threshold, verbose=False)
-        if not results:
-            return {
-                "count": 0,
-                "confidence_threshold": conf_threshold,
-                "detections": [],
-            }
-
-        result = results[0]
-        detections: List[Dict[str, Any]] = []
-
-        if result.boxes is not None:
-            for box in result.boxes:
-                xyxy = box.xyxy[0].tolist()
-                conf = float(box.conf[0]) if box.conf is not None else 0.0
-                cls = int(box.cls[0]) if box.cls is not None else 0
-                detections.append(
-                    {
-                        "bbox": [round(v, 2) for v in xyxy],
-                        "confidence": round(conf, 4),
-                        "class_id": cls,
-                    }
-                )
-
-        return {
-            "count": len(detections),
-            "confidence_threshold": conf_threshold,
-            "detections": detections,
-        }
-
-    return await _predict_with_roboflow(image=image, confidence=conf_threshold)
+    stored = await _detect_all(image, thresholds[0], cache_key, input_scale, tiled, load_image)
+
+    counts = _count_at_or_above(_stored_boxes(stored)[:, 4], thresholds)
+
+    return {
+        "thresholds": thresholds,
+        "counts": counts.tolist(),
+        "floor": stored["floor"],
+    }
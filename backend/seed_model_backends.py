@@ -0,0 +1,304 @@
+"""
+Seed Model Inference Backends
+Serves the YOLO seed counter from the PyTorch checkpoint or from an exported
+CPU-optimized artifact of the same model: ONNX Runtime, OpenVINO, or their
+int8 variants. Exports are created next to the checkpoint on first use and
+reused afterwards. Optimized formats are checked for count parity against
+the .pt reference on a set of tray images before they are served.
+
+Usage (offline check):
+    python seed_model_backends.py --format openvino --images ./reference_trays
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PYTORCH = "pytorch"
+ONNX = "onnx"
+ONNX_INT8 = "onnx_int8"
+OPENVINO = "openvino"
+OPENVINO_INT8 = "openvino_int8"
+SEED_MODEL_FORMATS = (PYTORCH, ONNX, ONNX_INT8, OPENVINO, OPENVINO_INT8)
+
+SEED_MODEL_FORMAT = os.getenv("SEED_MODEL_FORMAT", PYTORCH).strip().lower()
+
+# Where exported artifacts are written (default: next to the checkpoint)
+SEED_MODEL_EXPORT_DIR = os.getenv("SEED_MODEL_EXPORT_DIR", "").strip() or None
+SEED_MODEL_EXPORT_IMGSZ = int(os.getenv("SEED_MODEL_EXPORT_IMGSZ", "640"))
+# Dataset YAML used to calibrate OpenVINO int8 quantization
+SEED_MODEL_INT8_DATA = os.getenv("SEED_MODEL_INT8_DATA", "").strip() or None
+
+# Directory of tray images used for the count parity check
+SEED_MODEL_VALIDATION_DIR = os.getenv("SEED_MODEL_VALIDATION_DIR", "").strip() or None
+# Largest tolerated relative count difference on any validation image
+SEED_MODEL_MAX_COUNT_DEVIATION = float(os.getenv("SEED_MODEL_MAX_COUNT_DEVIATION", "0.02"))
+SEED_MODEL_PARITY_CONFIDENCE = float(os.getenv("SEED_MODEL_PARITY_CONFIDENCE", "0.25"))
+# Optimized formats are only served after passing the parity check unless this is disabled
+SEED_MODEL_REQUIRE_VALIDATION = os.getenv("SEED_MODEL_REQUIRE_VALIDATION", "true").lower() == "true"
+
+VALIDATION_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def _artifact_path(checkpoint: str, model_format: str) -> str:
+    """Where the export of a checkpoint in a given format lives"""
+    directory = SEED_MODEL_EXPORT_DIR or os.path.dirname(os.path.abspath(checkpoint))
+    stem = os.path.splitext(os.path.basename(checkpoint))[0]
+    names = {
+        ONNX: f"{stem}.onnx",
+        ONNX_INT8: f"{stem}_int8.onnx",
+        OPENVINO: f"{stem}_openvino_model",
+        OPENVINO_INT8: f"{stem}_int8_openvino_model",
+    }
+    return os.path.join(directory, names[model_format])
+
+
+def _is_fresh(artifact: str, checkpoint: str) -> bool:
+    return os.path.exists(artifact) and os.path.getmtime(artifact) >= os.path.getmtime(checkpoint)
+
+
+def _move(source: str, destination: str) -> str:
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return destination
+    import shutil
+    if os.path.isdir(destination):
+        shutil.rmtree(destination)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.move(source, destination)
+    return destination
+
+
+def _quantize_onnx(source: str, destination: str) -> str:
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError:
+        raise RuntimeError("onnx_int8 requires 'onnxruntime'. Install it or set SEED_MODEL_FORMAT=onnx.")
+    quantize_dynamic(source, destination, weight_type=QuantType.QUInt8)
+    return destination
+
+
+def export_seed_model(checkpoint: str, model_format: str) -> str:
+    """
+    Export a .pt checkpoint to an optimized format, reusing an up-to-date export.
+
+    Args:
+        checkpoint: Path to the YOLO .pt file
+        model_format: One of SEED_MODEL_FORMATS other than "pytorch"
+
+    Returns:
+        Path of the artifact (a file for ONNX, a directory for OpenVINO)
+    """
+    if model_format not in SEED_MODEL_FORMATS or model_format == PYTORCH:
+        raise ValueError(f"Cannot export seed model to '{model_format}'. Choose from {SEED_MODEL_FORMATS[1:]}")
+
+    destination = _artifact_path(checkpoint, model_format)
+    if _is_fresh(destination, checkpoint):
+        return destination
+
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting seed model '{checkpoint}' to {model_format} (first run only)...")
+    if model_format == ONNX_INT8:
+        return _quantize_onnx(export_seed_model(checkpoint, ONNX), destination)
+
+    if model_format == OPENVINO_INT8 and not SEED_MODEL_INT8_DATA:
+        raise RuntimeError("openvino_int8 needs SEED_MODEL_INT8_DATA (dataset YAML) for calibration")
+
+    # Dynamic shapes let one artifact serve full images, tile batches and frame batches
+    options: Dict[str, Any] = {"imgsz": SEED_MODEL_EXPORT_IMGSZ, "dynamic": True}
+    if model_format == ONNX:
+        options.update(format="onnx", simplify=True)
+    else:
+        options.update(format="openvino")
+        if model_format == OPENVINO_INT8:
+            options.update(int8=True, data=SEED_MODEL_INT8_DATA)
+
+    exported = YOLO(checkpoint).export(**options)
+    return _move(str(exported), destination)
+
+
+def build_seed_model(checkpoint: str, model_format: str = PYTORCH):
+    """
+    Load the seed model from its checkpoint in the requested format.
+
+    Args:
+        checkpoint: Path to the YOLO .pt file (or an already exported artifact)
+        model_format: One of SEED_MODEL_FORMATS
+
+    Returns:
+        Ultralytics YOLO model exposing predict()
+    """
+    from ultralytics import YOLO
+
+    if model_format == PYTORCH or not checkpoint.endswith(".pt"):
+        return YOLO(checkpoint, task="detect")
+    return YOLO(export_seed_model(checkpoint, model_format), task="detect")
+
+
+def load_reference_images(directory: str) -> List[Image.Image]:
+    """Load every image in a directory as RGB, sorted by filename"""
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(VALIDATION_IMAGE_EXTENSIONS):
+            continue
+        try:
+            with Image.open(os.path.join(directory, name)) as image:
+                images.append(image.convert("RGB"))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable reference image {name}: {e}")
+    return images
+
+
+def _counts(model, images: List[Image.Image], confidence: float) -> Tuple[List[int], float]:
+    """Detection count per image and mean seconds per image"""
+    counts = []
+    start = time.perf_counter()
+    for image in images:
+        results = model.predict(source=image, conf=confidence, verbose=False)
+        counts.append(len(results[0].boxes) if results and results[0].boxes is not None else 0)
+    elapsed = time.perf_counter() - start
+    return counts, elapsed / max(1, len(images))
+
+
+def validate_seed_model(
+    candidate,
+    reference,
+    images: List[Image.Image],
+    confidence: float = SEED_MODEL_PARITY_CONFIDENCE,
+    max_deviation: float = SEED_MODEL_MAX_COUNT_DEVIATION
+) -> Dict[str, Any]:
+    """
+    Compare per-image counts of a candidate model against the .pt reference.
+
+    Args:
+        candidate: Model in an optimized format
+        reference: PyTorch model from the same checkpoint
+        images: Reference tray images
+        confidence: Detection threshold used for both models
+        max_deviation: Relative count deviation above which an image is listed as deviating
+
+    Returns:
+        Dict with the worst relative count deviation, deviating images and per-image latencies
+    """
+    if not images:
+        raise ValueError("Reference image set is empty")
+
+    reference_counts, reference_latency = _counts(reference, images, confidence)
+    candidate_counts, candidate_latency = _counts(candidate, images, confidence)
+
+    deviations = [
+        abs(actual - expected) / max(1, expected)
+        for expected, actual in zip(reference_counts, candidate_counts)
+    ]
+    return {
+        "images": len(images),
+        "max_count_deviation": round(max(deviations), 4),
+        "deviating": [i for i, deviation in enumerate(deviations) if deviation > max_deviation],
+        "reference_counts": reference_counts,
+        "candidate_counts": candidate_counts,
+        "reference_ms_per_image": round(reference_latency * 1000, 2),
+        "candidate_ms_per_image": round(candidate_latency * 1000, 2),
+    }
+
+
+def load_validated_seed_model(checkpoint: str, model_format: str = SEED_MODEL_FORMAT) -> Tuple[Any, str]:
+    """
+    Build the configured format, falling back to the .pt model unless it passes the parity check.
+
+    Returns:
+        Tuple of (model, name of the format actually in use)
+    """
+    if model_format not in SEED_MODEL_FORMATS:
+        logger.warning(f"Unknown SEED_MODEL_FORMAT '{model_format}', using {PYTORCH}")
+        model_format = PYTORCH
+    if not checkpoint.endswith(".pt"):
+        # Already an exported artifact (.onnx file or OpenVINO directory); nothing to compare against
+        return build_seed_model(checkpoint), ONNX if checkpoint.endswith(".onnx") else OPENVINO
+    if model_format == PYTORCH:
+        return build_seed_model(checkpoint, PYTORCH), PYTORCH
+
+    if not SEED_MODEL_VALIDATION_DIR:
+        if SEED_MODEL_REQUIRE_VALIDATION:
+            logger.warning(
+                f"Seed model format '{model_format}' requested without SEED_MODEL_VALIDATION_DIR; "
+                f"using {PYTORCH}"
+            )
+            return build_seed_model(checkpoint, PYTORCH), PYTORCH
+        logger.warning(f"Using unvalidated seed model format '{model_format}'")
+
+    try:
+        candidate = build_seed_model(checkpoint, model_format)
+    except Exception as e:
+        logger.error(f"Failed to build seed model format '{model_format}': {e}; using {PYTORCH}")
+        return build_seed_model(checkpoint, PYTORCH), PYTORCH
+
+    if not SEED_MODEL_VALIDATION_DIR:
+        # Validation disabled by SEED_MODEL_REQUIRE_VALIDATION=false
+        return candidate, model_format
+
+    reference = build_seed_model(checkpoint, PYTORCH)
+    try:
+        report = validate_seed_model(candidate, reference, load_reference_images(SEED_MODEL_VALIDATION_DIR))
+    except (OSError, ValueError) as e:
+        # Missing or empty reference set: parity cannot be checked
+        logger.error(
+            f"Cannot check seed model format '{model_format}' against '{SEED_MODEL_VALIDATION_DIR}': {e}; "
+            f"using {PYTORCH}"
+        )
+        del candidate
+        gc.collect()
+        return reference, PYTORCH
+    logger.info(f"Seed model format '{model_format}' parity check: {report}")
+
+    if report["max_count_deviation"] > SEED_MODEL_MAX_COUNT_DEVIATION:
+        logger.error(
+            f"Seed model format '{model_format}' count deviation {report['max_count_deviation']:.3f} "
+            f"exceeds {SEED_MODEL_MAX_COUNT_DEVIATION}; using {PYTORCH}"
+        )
+        del candidate
+        gc.collect()
+        return reference, PYTORCH
+
+    # Drop the reference model so only the optimized one stays resident
+    del reference
+    gc.collect()
+    return candidate, model_format
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export a seed model and check count parity against .pt")
+    parser.add_argument("--format", choices=SEED_MODEL_FORMATS[1:], required=True)
+    parser.add_argument("--model", default=os.getenv("FISH_SEED_MODEL_PATH", "models/fish_seed_count.pt"))
+    parser.add_argument("--images", required=True, help="Directory of reference tray images")
+    parser.add_argument("--confidence", type=float, default=SEED_MODEL_PARITY_CONFIDENCE)
+    parser.add_argument("--max-deviation", type=float, default=SEED_MODEL_MAX_COUNT_DEVIATION)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    images = load_reference_images(args.images)
+    report = validate_seed_model(
+        build_seed_model(args.model, args.format),
+        build_seed_model(args.model, PYTORCH),
+        images,
+        args.confidence,
+        args.max_deviation
+    )
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+    passed = report["max_count_deviation"] <= args.max_deviation
+    print("PASS" if passed else "FAIL")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
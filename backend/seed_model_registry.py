@@ -0,0 +1,235 @@
+"""
+Seed Model Registry
+Holds the active seed-count YOLO model and replaces it without downtime.
+New weights are loaded and warmed up with a dummy batch on a background
+thread, then swapped in atomically; requests that already hold the old
+model finish on it. The runtime (PyTorch, ONNX Runtime, OpenVINO) is picked
+by SEED_MODEL_FORMAT, see seed_model_backends.
+
+Models are per process: with the thread executor (the default, also used by
+serve.py workers) every request in the process sees a swap; process-pool
+workers each keep their own registry.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+except Exception:  # pragma: no cover - handled at runtime
+    YOLO = None
+
+from seed_model_backends import PYTORCH, load_validated_seed_model
+
+logger = logging.getLogger(__name__)
+
+MODEL_ENV_KEY = "FISH_SEED_MODEL_PATH"
+DEFAULT_MODEL_PATH = os.getenv(MODEL_ENV_KEY, "models/fish_seed_count.pt")
+
+# Dummy batch run before a model goes live, so first requests are not cold
+SEED_MODEL_WARMUP_BATCH = int(os.getenv("SEED_MODEL_WARMUP_BATCH", "2"))
+SEED_MODEL_WARMUP_IMGSZ = int(os.getenv("SEED_MODEL_WARMUP_IMGSZ", "640"))
+# Poll the model file and reload when it changes (seconds, 0 = off)
+SEED_MODEL_WATCH_INTERVAL = float(os.getenv("SEED_MODEL_WATCH_INTERVAL", "0"))
+
+
+def ensure_ultralytics_available() -> None:
+    if YOLO is None:
+        raise RuntimeError(
+            "Ultralytics is not installed. Please add 'ultralytics' to backend requirements."
+        )
+
+
+def _file_version(path: str) -> str:
+    """Short content hash identifying a weights file (or an exported model directory)"""
+    if os.path.isdir(path):
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+        ]
+    else:
+        files = [path]
+
+    digest = hashlib.sha256()
+    for file_path in sorted(files):
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+@dataclass
+class LoadedModel:
+    model: Any
+    path: str
+    version: str
+    mtime: float
+    loaded_at: float
+    warmup_ms: float
+    format: str = PYTORCH
+
+
+class SeedModelRegistry:
+    """Active seed model plus background load / warmup / swap"""
+
+    def __init__(self, path: str = DEFAULT_MODEL_PATH):
+        self.path = path
+        self.last_error: Optional[str] = None
+        self._active: Optional[LoadedModel] = None
+        # Serializes loads; readers never take it
+        self._load_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def active(self) -> Optional[LoadedModel]:
+        return self._active
+
+    @property
+    def loading(self) -> bool:
+        return self._loader is not None and self._loader.is_alive()
+
+    def get(self):
+        """
+        The active model, loading it on first use if no load has finished yet.
+
+        Callers should fetch the model once per inference call and keep the
+        reference, so a concurrent swap cannot change it mid-request.
+        """
+        current = self._active
+        if current is not None:
+            return current.model
+        return self.load().model
+
+    def load(self, path: Optional[str] = None, force: bool = False) -> LoadedModel:
+        """
+        Load, warm up and activate a model (blocking).
+
+        Args:
+            path: Weights file; defaults to the current path
+            force: Reload even if this file version is already active
+
+        Returns:
+            The active model after the call
+        """
+        ensure_ultralytics_available()
+        with self._load_lock:
+            path = path or self.path
+            current = self._active
+            if current is not None and not force and current.path == path:
+                return current
+
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    f"Seed count model not found at '{path}'. "
+                    f"Set {MODEL_ENV_KEY} to the correct .pt file or exported model."
+                )
+
+            mtime = os.path.getmtime(path)
+            version = _file_version(path)
+            if current is not None and current.path == path and current.version == version:
+                # Touched but unchanged
+                current.mtime = mtime
+                return current
+
+            start = time.perf_counter()
+            model, model_format = load_validated_seed_model(path)
+            if model_format == PYTORCH:
+                # Fuse before warmup so the live model is never mutated by a request
+                model.fuse()
+            warmup_ms = self._warm_up(model)
+
+            # Single reference assignment: readers see either the old or the new model
+            self._active = LoadedModel(model, path, version, mtime, time.time(), warmup_ms, model_format)
+            self.path = path
+            self.last_error = None
+            logger.info(
+                f"Seed model {version} ({model_format}) from '{path}' active "
+                f"(load {time.perf_counter() - start:.1f}s, warmup {warmup_ms:.0f}ms)"
+            )
+            return self._active
+
+    @staticmethod
+    def _warm_up(model) -> float:
+        """Run a dummy batch so lazy initialization happens before going live"""
+        if SEED_MODEL_WARMUP_BATCH <= 0:
+            return 0.0
+        start = time.perf_counter()
+        frame = np.zeros((SEED_MODEL_WARMUP_IMGSZ, SEED_MODEL_WARMUP_IMGSZ, 3), dtype=np.uint8)
+        model.predict(
+            source=[frame] * SEED_MODEL_WARMUP_BATCH,
+            imgsz=SEED_MODEL_WARMUP_IMGSZ,
+            verbose=False,
+        )
+        return (time.perf_counter() - start) * 1000
+
+    def load_in_background(self, path: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Start load() on a background thread.
+
+        Returns:
+            False if a load is already in progress
+        """
+        if self.loading:
+            return False
+
+        def run():
+            try:
+                self.load(path, force)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Failed to load seed model from '{path or self.path}': {e}")
+
+        self._loader = threading.Thread(target=run, name="seed-model-loader", daemon=True)
+        self._loader.start()
+        return True
+
+    def watch(self, interval: float = SEED_MODEL_WATCH_INTERVAL) -> None:
+        """Reload in the background whenever the weights file's mtime changes"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def run():
+            while not self._stop_watching.wait(interval):
+                current = self._active
+                try:
+                    mtime = os.path.getmtime(self.path)
+                except OSError:
+                    continue
+                if current is None or current.path != self.path or mtime != current.mtime:
+                    self.load_in_background(force=True)
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=run, name="seed-model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._active
+        return {
+            "path": self.path,
+            "version": current.version if current else None,
+            "format": current.format if current else None,
+            "loaded_at": (
+                time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(current.loaded_at)) if current else None
+            ),
+            "warmup_ms": round(current.warmup_ms, 1) if current else None,
+            "loading": self.loading,
+            "last_error": self.last_error,
+        }
+
+
+# Process-wide registry used by seed counting
+seed_model_registry = SeedModelRegistry()
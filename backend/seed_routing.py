@@ -0,0 +1,187 @@
+"""
+Seed-Count Backend Routing
+Chooses between the local YOLO model and the hosted Roboflow model per request.
+Local inference is preferred; requests overflow to Roboflow when the local
+queue is saturated, and fall back to local when Roboflow errors or is slow.
+Repeatedly failing remotes are skipped for a cooldown period.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+from inference_executor import inference_executor
+from metrics import SEED_ROUTING_DECISIONS
+from roboflow_client import roboflow_client, roboflow_configured
+
+logger = logging.getLogger(__name__)
+
+# "auto" routes by load; "local" or "remote" pins a backend when it is available
+SEED_ROUTING = os.getenv("SEED_ROUTING", "auto").strip().lower()
+# Overflow to the remote once this many requests are waiting for the local model
+SEED_ROUTE_MAX_LOCAL_QUEUE = int(os.getenv("SEED_ROUTE_MAX_LOCAL_QUEUE", "2"))
+# Remote calls slower than this fall back to local (when a local model exists)
+SEED_ROUTE_REMOTE_TIMEOUT_SECONDS = float(os.getenv("SEED_ROUTE_REMOTE_TIMEOUT_SECONDS", "15"))
+# Consecutive remote failures before the remote is skipped for the cooldown
+SEED_ROUTE_REMOTE_MAX_FAILURES = int(os.getenv("SEED_ROUTE_REMOTE_MAX_FAILURES", "3"))
+SEED_ROUTE_REMOTE_COOLDOWN_SECONDS = float(os.getenv("SEED_ROUTE_REMOTE_COOLDOWN_SECONDS", "60"))
+
+_LATENCY_EWMA_ALPHA = 0.2
+
+LOCAL = "local"
+REMOTE = "remote"
+
+LocalDetect = Callable[[Image.Image, float, bool], Awaitable[Dict[str, Any]]]
+
+
+class SeedBackendRouter:
+    """
+    Routes seed-count inference to the local model or Roboflow.
+
+    Both backends return {"boxes": (N, 6) array} of x1, y1, x2, y2, confidence,
+    class_id in input-image coordinates; local results may also carry "tiles".
+    """
+
+    def __init__(
+        self,
+        local_detect: LocalDetect,
+        local_available: Callable[[], bool],
+        local_ready: Callable[[], bool] = lambda: True,
+        mode: str = SEED_ROUTING
+    ):
+        """
+        Args:
+            local_detect: Coroutine function (image, confidence, tiled) running the local model
+            local_available: Whether the local model can be used
+            local_ready: Whether the local model is loaded (requests wait for it otherwise)
+            mode: "auto", "local" or "remote"
+        """
+        if mode not in ("auto", LOCAL, REMOTE):
+            logger.warning(f"Unknown SEED_ROUTING '{mode}', using 'auto'")
+            mode = "auto"
+        self.mode = mode
+        self._local_detect = local_detect
+        self._local_available = local_available
+        self._local_ready = local_ready
+        self.remote_latency: Optional[float] = None
+        self._remote_failures = 0
+        self._remote_disabled_until = 0.0
+
+    def _remote_state(self) -> Tuple[bool, str]:
+        if not roboflow_configured():
+            return False, "no_remote"
+        if time.monotonic() < self._remote_disabled_until:
+            return False, "remote_cooldown"
+        return True, ""
+
+    def _local_saturated(self) -> bool:
+        waiting = inference_executor.waiting["seed"]
+        if waiting >= SEED_ROUTE_MAX_LOCAL_QUEUE:
+            return True
+
+        # Queued local work would take longer than a typical remote call
+        service_time = inference_executor.service_time["seed"]
+        if waiting and service_time is not None and self.remote_latency is not None:
+            capacity = max(1, inference_executor.limits["seed"])
+            expected_local = service_time * (1 + waiting / capacity)
+            return expected_local > self.remote_latency
+        return False
+
+    def choose(self, tiled: bool) -> Tuple[str, str]:
+        """
+        Pick a backend for one request.
+
+        Returns:
+            Tuple of (backend, reason)
+        """
+        local_ok = self._local_available()
+        remote_ok, remote_reason = self._remote_state()
+
+        if not local_ok:
+            return REMOTE, "no_local_model"
+        if not remote_ok:
+            return LOCAL, remote_reason
+        if tiled:
+            # Tiling multiplies remote calls; it only runs locally
+            return LOCAL, "tiled"
+        if self.mode != "auto":
+            # A pinned mode holds while the model loads; local requests wait for it
+            return self.mode, "pinned"
+        if not self._local_ready():
+            return REMOTE, "local_loading"
+        if self._local_saturated():
+            return REMOTE, "overflow"
+        return LOCAL, "local_capacity"
+
+    def _record_remote(self, seconds: Optional[float]) -> None:
+        """Record a remote success (with its latency) or a failure (None)"""
+        if seconds is None:
+            self._remote_failures += 1
+            if self._remote_failures >= SEED_ROUTE_REMOTE_MAX_FAILURES:
+                self._remote_disabled_until = time.monotonic() + SEED_ROUTE_REMOTE_COOLDOWN_SECONDS
+                self._remote_failures = 0
+                logger.warning(
+                    f"Roboflow failed {SEED_ROUTE_REMOTE_MAX_FAILURES} times in a row; "
+                    f"using local only for {SEED_ROUTE_REMOTE_COOLDOWN_SECONDS:.0f}s"
+                )
+            return
+
+        self._remote_failures = 0
+        if self.remote_latency is None:
+            self.remote_latency = seconds
+        else:
+            self.remote_latency += _LATENCY_EWMA_ALPHA * (seconds - self.remote_latency)
+
+    async def detect(self, image: Image.Image, confidence: float, tiled: bool) -> Dict[str, Any]:
+        """
+        Run seed detection on the chosen backend, falling back to local on remote failure.
+
+        Returns:
+            Dict with boxes, backend and optionally tiles; remote results
+            also carry the confidence floor Roboflow applied
+        """
+        backend, reason = self.choose(tiled)
+        SEED_ROUTING_DECISIONS.inc(backend=backend, reason=reason)
+
+        if backend == REMOTE:
+            can_fall_back = self._local_available()
+            start = time.perf_counter()
+            try:
+                detect = roboflow_client.detect(image, confidence)
+                if can_fall_back:
+                    remote = await asyncio.wait_for(detect, SEED_ROUTE_REMOTE_TIMEOUT_SECONDS)
+                else:
+                    remote = await detect
+                self._record_remote(time.perf_counter() - start)
+                # Roboflow clamps the threshold; report the floor it actually applied
+                return {"boxes": remote["boxes"], "backend": REMOTE, "floor": remote["confidence_threshold"]}
+            except Exception as e:
+                self._record_remote(None)
+                if not can_fall_back:
+                    raise
+                fallback_reason = "remote_timeout" if isinstance(e, asyncio.TimeoutError) else "remote_error"
+                logger.warning(
+                    f"Roboflow seed count failed ({fallback_reason}: {str(e) or type(e).__name__}); using local model"
+                )
+                SEED_ROUTING_DECISIONS.inc(backend=LOCAL, reason=fallback_reason)
+
+        result = await self._local_detect(image, confidence, tiled)
+        result["backend"] = LOCAL
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        remote_ok, remote_reason = self._remote_state()
+        service_time = inference_executor.service_time["seed"]
+        return {
+            "mode": self.mode,
+            "local_available": self._local_available(),
+            "remote_available": remote_ok,
+            "remote_unavailable_reason": remote_reason or None,
+            "local_service_time_ms": round(service_time * 1000, 1) if service_time is not None else None,
+            "remote_latency_ms": round(self.remote_latency * 1000, 1) if self.remote_latency is not None else None,
+            "remote_in_flight": roboflow_client.in_flight,
+        }
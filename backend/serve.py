@@ -0,0 +1,181 @@
+"""
+Pre-fork Server
+Loads the classifier and seed-count model once in a parent process, then
+forks uvicorn workers that share the model weights copy-on-write.
+N workers cost roughly one copy of the weights instead of N.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+# Workers serve inference from the inherited in-process models
+os.environ["INFERENCE_EXECUTOR"] = "thread"
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("serve")
+
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+
+
+def memory_usage(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Memory of a process in MB from /proc (Linux only).
+
+    rss counts shared pages in full; pss divides shared pages among the
+    processes sharing them, so summing pss across workers gives real usage.
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Shared_Clean": "shared_mb", "Private_Dirty": "private_mb"}
+    usage: Dict[str, float] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def preload_models() -> None:
+    """Load every model in the parent so forked workers inherit them"""
+    from inference_executor import load_classifier
+
+    backend = load_classifier()
+    if backend is None:
+        logger.error("Classifier failed to load in parent; workers will serve without it")
+
+    from seed_model_registry import seed_model_registry
+    if os.path.exists(seed_model_registry.path):
+        try:
+            # Loads, fuses and warms up; doing this per worker would write new weights and break sharing
+            seed_model_registry.load()
+        except Exception as e:
+            logger.error(f"Failed to preload seed model: {e}")
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, host: str, port: int, torch_threads: int) -> None:
+    """Body of a forked worker process; never returns"""
+    import uvicorn
+
+    # Children must not inherit the parent's signal handlers
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    import main
+
+    @main.app.on_event("startup")
+    async def report_memory():
+        # Pss splits shared weight pages across workers; Rss counts them in full
+        logger.info(f"Worker {os.getpid()} ready, memory: {memory_usage()}")
+
+    config = uvicorn.Config(main.app, host=host, port=port, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+    os._exit(0)
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    sock = _bind_socket(host, port)
+    logger.info(f"Listening on {host}:{port}, loading models before forking {workers} workers")
+
+    preload_models()
+    # Import the app in the parent too, so its code objects are shared
+    import main  # noqa: F401
+
+    # Move everything allocated so far out of GC tracking; otherwise collections
+    # in the workers touch object headers and un-share their pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Parent memory after model load: {memory_usage()}")
+
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    children: Dict[int, int] = {}
+    shutting_down = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(sock, host, port, torch_threads)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        slot = children.pop(pid, None)
+        if slot is None or shutting_down:
+            continue
+        logger.warning(f"Worker {pid} exited with status {status}; restarting")
+        time.sleep(1)
+        spawn(slot)
+
+    logger.info("All workers stopped")
+    sock.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked, model-sharing workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        logger.error("Pre-fork mode requires a POSIX system; use 'uvicorn main:app' instead")
+        return 1
+
+    serve(args.host, args.port, max(1, args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Per-Pond Temperature History
+In-process time series of sensor readings keyed by pond (or location).
+Each pond keeps a fixed-size ring buffer of timestamps and temperatures in
+typed arrays, so memory per pond is bounded by the window. Rolling min, max
+and mean and the rate of change per hour are maintained incrementally on
+append, in amortized O(1), and feed the rapid-change check of the risk assessment.
+Readings are also handed to the durable store (temperature_store), which
+refills a pond's window after a restart; async callers fetch those readings
+with apreload() in a worker thread, so recording never blocks on the database. When the species' safe range is
+known, each pond also accumulates thermal stress (see thermal_stress).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from temperature_store import TemperatureStore, temperature_store
+from thermal_stress import ThermalStressAccumulator
+
+logger = logging.getLogger(__name__)
+
+# Readings kept per pond (1440 = one day at one reading per minute)
+TEMPERATURE_HISTORY_WINDOW = int(os.getenv("TEMPERATURE_HISTORY_WINDOW", "1440"))
+# Ponds kept in memory; the least recently updated are dropped first
+TEMPERATURE_HISTORY_MAX_PONDS = int(os.getenv("TEMPERATURE_HISTORY_MAX_PONDS", "10000"))
+# Rate of change is measured against the oldest reading within this many minutes
+TEMPERATURE_RATE_WINDOW_MINUTES = float(os.getenv("TEMPERATURE_RATE_WINDOW_MINUTES", "60"))
+# No rate is reported until the readings span at least this long (avoids noisy extrapolation)
+TEMPERATURE_RATE_MIN_SPAN_MINUTES = float(os.getenv("TEMPERATURE_RATE_MIN_SPAN_MINUTES", "5"))
+
+Timestamp = Union[float, int, str, datetime, None]
+
+
+def to_epoch_seconds(timestamp: Timestamp) -> float:
+    """Epoch seconds from epoch seconds, an ISO 8601 string or a datetime (None = now)"""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    return float(timestamp)
+
+
+class PondHistory:
+    """
+    Ring buffer of one pond's readings with incremental rolling statistics.
+
+    Readings are addressed by a sequence number; reading n lives in slot
+    n % capacity and the window holds the last `capacity` readings. Min and
+    max use monotonic queues of sequence numbers, the mean a running sum,
+    and the rate a pointer that only moves forward through the rate window.
+    """
+
+    def __init__(
+        self,
+        capacity: int = TEMPERATURE_HISTORY_WINDOW,
+        rate_window_seconds: float = TEMPERATURE_RATE_WINDOW_MINUTES * 60,
+        rate_min_span_seconds: float = TEMPERATURE_RATE_MIN_SPAN_MINUTES * 60
+    ):
+        self.capacity = max(2, capacity)
+        self.rate_window_seconds = rate_window_seconds
+        self.rate_min_span_seconds = rate_min_span_seconds
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.values = np.zeros(self.capacity, dtype=np.float32)
+        # Sequence number of the next reading (= readings seen so far)
+        self.count = 0
+        self._sum = 0.0
+        self._min_queue: Deque[int] = deque()
+        self._max_queue: Deque[int] = deque()
+        self._rate_start = 0
+        # Created on the first reading that comes with a safe range
+        self.stress: Optional[ThermalStressAccumulator] = None
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _value(self, seq: int) -> float:
+        return float(self.values[seq % self.capacity])
+
+    def _timestamp(self, seq: int) -> float:
+        return float(self.timestamps[seq % self.capacity])
+
+    @property
+    def oldest_seq(self) -> int:
+        return max(0, self.count - self.capacity)
+
+    @property
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """(timestamp, temperature) of the newest reading"""
+        if not self.count:
+            return None
+        return self._timestamp(self.count - 1), self._value(self.count - 1)
+
+    def append(
+        self,
+        temperature: float,
+        timestamp: float,
+        safe_range: Optional[Tuple[float, float]] = None
+    ) -> bool:
+        """
+        Add a reading.
+
+        Args:
+            temperature: Water temperature in Celsius
+            timestamp: Epoch seconds
+            safe_range: (min, max) of the pond's species, for thermal stress
+
+        Returns:
+            False if the reading is older than the newest one and was ignored
+        """
+        if self.count and timestamp < self._timestamp(self.count - 1):
+            return False
+
+        seq = self.count
+        slot = seq % self.capacity
+        if seq >= self.capacity:
+            # Overwriting the oldest reading evicts it from the running sum
+            self._sum -= float(self.values[slot])
+        self.timestamps[slot] = timestamp
+        self.values[slot] = temperature
+        # Use the stored float32 value so additions and evictions cancel exactly
+        value = float(self.values[slot])
+        self._sum += value
+        self.count += 1
+
+        # Monotonic queues: front is the window min / max, evicted by sequence number
+        oldest = self.oldest_seq
+        while self._min_queue and self._value(self._min_queue[-1]) >= value:
+            self._min_queue.pop()
+        while self._max_queue and self._value(self._max_queue[-1]) <= value:
+            self._max_queue.pop()
+        self._min_queue.append(seq)
+        self._max_queue.append(seq)
+        while self._min_queue[0] < oldest:
+            self._min_queue.popleft()
+        while self._max_queue[0] < oldest:
+            self._max_queue.popleft()
+
+        self._rate_start = max(self._rate_start, oldest)
+        while timestamp - self._timestamp(self._rate_start) > self.rate_window_seconds:
+            self._rate_start += 1
+
+        if safe_range is not None:
+            if self.stress is None:
+                self.stress = ThermalStressAccumulator()
+            self.stress.add(value, timestamp, *safe_range)
+        return True
+
+    def rate_per_hour(self) -> Optional[float]:
+        """°C per hour between the oldest reading in the rate window and the newest"""
+        if self.count < 2:
+            return None
+        latest = self.count - 1
+        start = self._rate_start
+        if start == latest and start > self.oldest_seq:
+            # Gap longer than the rate window: compare with the reading before it
+            start -= 1
+        span = self._timestamp(latest) - self._timestamp(start)
+        if span < self.rate_min_span_seconds or span <= 0:
+            return None
+        return (self._value(latest) - self._value(start)) / (span / 3600)
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"readings": 0}
+        latest_time, latest_value = self.latest
+        size = len(self)
+        rate = self.rate_per_hour()
+        return {
+            "readings": size,
+            "latest_temperature": round(latest_value, 2),
+            "latest_timestamp": latest_time,
+            "window_start": self._timestamp(self.oldest_seq),
+            "min": round(self._value(self._min_queue[0]), 2),
+            "max": round(self._value(self._max_queue[0]), 2),
+            "mean": round(self._sum / size, 2),
+            "rate_per_hour": round(rate, 2) if rate is not None else None,
+            "degree_hours": self.stress.degree_hours() if self.stress is not None else None,
+        }
+
+    def series(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, temperatures) of the window, oldest first"""
+        seqs = np.arange(self.oldest_seq, self.count) % self.capacity
+        return self.timestamps[seqs], self.values[seqs]
+
+
+class TemperatureHistoryStore:
+    """Pond histories, bounded by window size per pond and a maximum pond count"""
+
+    def __init__(
+        self,
+        window: int = TEMPERATURE_HISTORY_WINDOW,
+        max_ponds: int = TEMPERATURE_HISTORY_MAX_PONDS,
+        store: Optional[TemperatureStore] = None
+    ):
+        """
+        Args:
+            window: Readings kept in memory per pond
+            max_ponds: Ponds kept in memory
+            store: Durable store that receives every accepted reading and
+                refills the window of ponds not in memory
+        """
+        self.window = window
+        self.max_ponds = max(1, max_ponds)
+        self.store = store
+        self._ponds: "OrderedDict[str, PondHistory]" = OrderedDict()
+        # Stored readings of ponds not in memory yet, fetched by preload() and replayed by record()
+        self._preloaded: Dict[str, List[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ponds)
+
+    def get(self, pond_id: str) -> Optional[PondHistory]:
+        return self._ponds.get(pond_id)
+
+    def _cold(self, pond_ids: Iterable[Optional[str]]) -> List[str]:
+        """Ponds whose stored readings still have to be fetched"""
+        if self.store is None or not self.store.enabled:
+            return []
+        return [
+            pond_id for pond_id in dict.fromkeys(pond_ids)
+            if pond_id and pond_id not in self._ponds and pond_id not in self._preloaded
+        ]
+
+    def preload(self, pond_ids: Iterable[Optional[str]]) -> None:
+        """Fetch stored readings of ponds not in memory (blocking; see apreload)"""
+        for pond_id in self._cold(pond_ids):
+            rows = self.store.recent(pond_id, self.window)
+            with self._lock:
+                if pond_id in self._ponds:
+                    continue
+                self._preloaded[pond_id] = rows
+                if len(self._preloaded) > self.max_ponds:
+                    # Fetched but never recorded; drop the oldest
+                    del self._preloaded[next(iter(self._preloaded))]
+
+    async def apreload(self, pond_ids: Iterable[Optional[str]]) -> None:
+        """Fetch stored readings of ponds about to be recorded in a worker thread"""
+        cold = self._cold(pond_ids)
+        if cold:
+            await asyncio.to_thread(self.preload, cold)
+
+    def record(
+        self,
+        pond_id: str,
+        temperature: float,
+        timestamp: Timestamp = None,
+        safe_range: Optional[Tuple[float, float]] = None
+    ) -> PondHistory:
+        """
+        Append a reading to a pond's history, creating the pond if needed.
+
+        Never touches the database: a new pond is filled from readings
+        fetched by preload() / apreload() beforehand, if any.
+
+        Args:
+            pond_id: Pond or location identifier
+            temperature: Water temperature in Celsius
+            timestamp: Epoch seconds, ISO 8601 string or datetime; defaults to now
+            safe_range: (min, max) of the pond's species; enables thermal stress tracking
+
+        Returns:
+            The pond's history after the append
+        """
+        seconds = to_epoch_seconds(timestamp)
+        with self._lock:
+            history = self._ponds.get(pond_id)
+            if history is None:
+                history = PondHistory(self.window)
+                for stored_time, stored_value in self._preloaded.pop(pond_id, ()):
+                    history.append(stored_value, stored_time, safe_range)
+                self._ponds[pond_id] = history
+                if len(self._ponds) > self.max_ponds:
+                    evicted, _ = self._ponds.popitem(last=False)
+                    logger.info(f"Temperature history full; dropped pond '{evicted}'")
+            else:
+                self._ponds.move_to_end(pond_id)
+            if not history.append(temperature, seconds, safe_range):
+                logger.debug(f"Ignoring out-of-order reading for pond '{pond_id}'")
+            elif self.store is not None:
+                self.store.add(pond_id, seconds, temperature)
+        return history
+
+    def stats(self, pond_id: str) -> Optional[Dict[str, Any]]:
+        history = self._ponds.get(pond_id)
+        if history is None:
+            return None
+        return {"pond_id": pond_id, **history.stats()}
+
+
+# Shared by all requests in this process
+temperature_history = TemperatureHistoryStore(store=temperature_store)
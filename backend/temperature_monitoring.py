@@ -5,11 +5,18 @@ Supports species-specific safe temperature ranges and provides actionable recomm
 """
 
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
+import json
 import logging
 
+import numpy as np
+
+from temperature_history import Timestamp, temperature_history
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,10 +41,14 @@ class RiskAssessment:
     risk_level: RiskLevel
     current_temperature: float
     safe_range: Tuple[float, float]
-    possible_issues: List[str]
-    recommended_actions: List[str]
+    possible_issues: Sequence[str]
+    recommended_actions: Sequence[str]
     urgency_score: float  # 0-100, higher = more urgent
     species: str
+    rate_per_hour: Optional[float] = None  # From the pond's history, when known
+    degree_hours: Optional[Dict[str, Dict[str, float]]] = None  # Thermal stress per window
+    temperature_change: Optional[float] = None  # Against previous_temp, when given
+    template: Optional["RiskTemplate"] = None  # Shared non-numeric part, see risk_template()
 
 
 # Species-specific safe temperature ranges (in Celsius)
@@ -60,8 +71,317 @@ DEFAULT_TEMP_RANGE = {"min": 20, "max": 28, "optimal": 24}
 # Temperature change rate risk thresholds (°C per hour)
 RAPID_CHANGE_THRESHOLD = 2.0
 
-# Historical data for comparing trends (simplified - in production use database)
-TEMPERATURE_HISTORY = {}
+# Per-pond history used for the rate of change (see temperature_history)
+TEMPERATURE_HISTORY = temperature_history
+
+
+@dataclass(frozen=True)
+class TemperatureCondition:
+    """Where a reading sits relative to its safe range, with the shared issues and actions for it"""
+    key: str
+    risk_level: RiskLevel
+    urgency_score: float
+    possible_issues: Tuple[str, ...]
+    recommended_actions: Tuple[str, ...]
+
+
+# Within this many °C of a safe-range boundary counts as caution
+BOUNDARY_MARGIN = 2
+# More than this many °C outside the safe range is high risk
+SEVERE_DEVIATION = 5
+
+# Indices into TEMPERATURE_CONDITIONS
+OPTIMAL, NEAR_MIN, NEAR_MAX, COLD, SEVERE_COLD, HOT, SEVERE_HOT = range(7)
+
+TEMPERATURE_CONDITIONS: Tuple[TemperatureCondition, ...] = (
+    TemperatureCondition(
+        "optimal", RiskLevel.NORMAL, 0,
+        ("No temperature-related action needed",),
+        ("Continue normal monitoring", "Feed according to schedule"),
+    ),
+    TemperatureCondition(
+        "near_min", RiskLevel.CAUTION, 30,
+        (
+            "Temperature approaching minimum safe threshold",
+            "Reduced metabolic activity and feeding",
+        ),
+        (
+            "Monitor temperature closely",
+            "Ensure adequate aeration",
+            "Check heater functionality",
+        ),
+    ),
+    TemperatureCondition(
+        "near_max", RiskLevel.CAUTION, 30,
+        (
+            "Temperature approaching maximum safe threshold",
+            "Reduced oxygen availability",
+            "Increased bacterial disease risk",
+        ),
+        (
+            "Increase water aeration immediately",
+            "Check pond shade (e.g., netting or water hyacinth)",
+            "Monitor for disease signs",
+        ),
+    ),
+    TemperatureCondition(
+        "cold", RiskLevel.CAUTION, 60,
+        (
+            "Water temperature below optimal range",
+            "Reduced feeding and growth rates",
+            "Slower immune response to pathogens",
+            "Increased susceptibility to bacterial diseases",
+        ),
+        (
+            "Activate heating system if available",
+            "Reduce feeding by 50%",
+            "Increase water aeration",
+            "Monitor for disease signs daily",
+            "Maintain excellent water quality",
+            "Adjust feeding schedule to warmer times of day",
+        ),
+    ),
+    TemperatureCondition(
+        "severe_cold", RiskLevel.HIGH_RISK, 95,
+        (
+            "CRITICAL: Water temperature far below safe range",
+            "Severe reduction in metabolism and immunity",
+            "Increased disease susceptibility",
+            "Poor feed conversion",
+            "Risk of cold-water shock mortality",
+            "Bacterial growth slowdown but parasites may thrive",
+        ),
+        (
+            "IMMEDIATE: Activate backup heaters or heat source",
+            "Check heating system immediately",
+            "Reduce feeding to minimum",
+            "Increase aeration for oxygenation",
+            "Monitor fish closely for lethargy or disease signs",
+            "Consider emergency measures (shelter, insulation)",
+            "Prepare isolation tank with warmer water",
+            "Test water quality (oxygen, ammonia) frequently",
+        ),
+    ),
+    TemperatureCondition(
+        "hot", RiskLevel.CAUTION, 70,
+        (
+            "Water temperature above optimal range",
+            "Reduced dissolved oxygen availability",
+            "Increased stress on fish",
+            "Elevated bacterial disease risk",
+            "Potential parasitic infections (Ichthyophthirius, Trichodina)",
+            "Increased ammonia/nitrite toxicity",
+        ),
+        (
+            "Increase aeration immediately",
+            "Add shade to pond (aquatic plants, netting, partial tarp)",
+            "Perform 25-30% water change with cooler source if possible",
+            "Reduce feeding to 75% of normal",
+            "Monitor disease signs closely (gasping, fin clamping)",
+            "Test water quality daily (oxygen, ammonia, nitrite)",
+            "Consider emergency cooling (ice addition - use with caution)",
+            "Arrange for shade installation",
+            "Monitor forecast for temperature trends",
+        ),
+    ),
+    TemperatureCondition(
+        "severe_hot", RiskLevel.HIGH_RISK, 98,
+        (
+            "CRITICAL: Water temperature far exceeds safe range",
+            "Severe oxygen depletion in water",
+            "Extreme metabolic stress on fish",
+            "Critical disease outbreak risk (bacterial and parasitic)",
+            "Zooplankton die-off reducing natural food",
+            "Potential thermal shock mortality",
+            "Ammonia and nitrite toxicity increases significantly",
+        ),
+        (
+            "IMMEDIATE: Emergency cooling measures required",
+            "Increase aeration to MAXIMUM capacity",
+            "Add fresh, cooler water if available (avoid thermal shock)",
+            "Install shade structures (netting, water hyacinth, tarps)",
+            "Consider emergency partial water change with cooler source",
+            "Stop feeding immediately",
+            "Monitor oxygen levels continuously",
+            "Prepare quarantine tank for emergency treatment",
+            "Test water quality (especially dissolved oxygen and ammonia)",
+            "Contact veterinary expert immediately",
+            "Document all deaths for insurance/records",
+        ),
+    ),
+)
+
+# Prepended when a reading moved more than RAPID_CHANGE_THRESHOLD since the previous one
+RAPID_CHANGE_ISSUE = "Rapid temperature change detected"
+RAPID_CHANGE_ACTION = "Monitor for shock-induced stress signs"
+RAPID_CHANGE_URGENCY = 15
+# Appended when the pond's accumulated degree-hours raise urgency
+THERMAL_STRESS_ISSUE = "Prolonged thermal stress ({day:.1f} degree-hours outside safe range in 24h, {week:.1f} in 7 days)"
+
+RISK_COLORS: Mapping[RiskLevel, str] = MappingProxyType({
+    RiskLevel.NORMAL: "#10b981",      # Green
+    RiskLevel.CAUTION: "#f59e0b",     # Amber/Orange
+    RiskLevel.HIGH_RISK: "#ef4444",   # Red
+})
+
+RISK_LABELS: Mapping[RiskLevel, str] = MappingProxyType({
+    RiskLevel.NORMAL: "No Action Needed",
+    RiskLevel.CAUTION: "Monitor Closely",
+    RiskLevel.HIGH_RISK: "Immediate Action Required",
+})
+
+DISEASE_RISK_FACTORS: Mapping[RiskLevel, Mapping[str, str]] = MappingProxyType({
+    RiskLevel.NORMAL: MappingProxyType({
+        "bacterial_disease": "Low (optimal conditions)",
+        "parasitic_disease": "Low",
+        "viral_disease": "Low",
+        "fungal_disease": "Low"
+    }),
+    RiskLevel.CAUTION: MappingProxyType({
+        "bacterial_disease": "Moderate (stress weakens immunity)",
+        "parasitic_disease": "Moderate to High (if too warm)",
+        "viral_disease": "Moderate (stress increases vulnerability)",
+        "fungal_disease": "Moderate (if too cold and damp)"
+    }),
+    RiskLevel.HIGH_RISK: MappingProxyType({
+        "bacterial_disease": "CRITICAL (severe immune suppression)",
+        "parasitic_disease": "CRITICAL (rapid reproduction in warm water)",
+        "viral_disease": "CRITICAL (high stress = infection spreads rapidly)",
+        "fungal_disease": "HIGH (if temperature too cold)"
+    }),
+})
+
+
+@dataclass(frozen=True)
+class RiskTemplate:
+    """
+    The part of an assessment that depends only on the species range, the
+    condition and the rapid-change / thermal-stress flags, shared by every
+    assessment with the same key. json_fields is the static part of the
+    response, pre-serialized without the enclosing braces. The rapid-change
+    and thermal-stress issues carry per-reading numbers, so when either
+    applies possible_issues holds only the condition's issues and is left
+    out of json_fields (static_issues is False).
+    """
+    risk_level: RiskLevel
+    safe_range: Tuple[float, float]
+    possible_issues: Tuple[str, ...]
+    recommended_actions: Tuple[str, ...]
+    urgency_score: float  # Before thermal stress
+    disease_risks: Mapping[str, str]
+    json_fields: str
+    static_issues: bool = True
+
+
+@lru_cache(maxsize=None)
+def risk_template(range_key: Optional[str], condition: int, rapid_change: bool, thermal_stress: bool) -> RiskTemplate:
+    """
+    Shared template for one (species range, condition, flags) combination.
+
+    Args:
+        range_key: Key into SPECIES_TEMPERATURE_RANGES, or None for the default range
+        condition: Index into TEMPERATURE_CONDITIONS
+        rapid_change: Whether the rapid-change action and urgency apply
+        thermal_stress: Whether a thermal-stress issue follows the condition's issues
+
+    The key space is finite (species x conditions x flags), so the cache is bounded.
+    """
+    safe_range = SPECIES_TEMPERATURE_RANGES.get(range_key, DEFAULT_TEMP_RANGE) if range_key else DEFAULT_TEMP_RANGE
+    base = TEMPERATURE_CONDITIONS[condition]
+    issues = base.possible_issues
+    actions = base.recommended_actions
+    urgency = base.urgency_score
+    if rapid_change:
+        actions = (RAPID_CHANGE_ACTION,) + actions
+        urgency = min(100, urgency + RAPID_CHANGE_URGENCY)
+    static_issues = not (rapid_change or thermal_stress)
+
+    disease_risks = DISEASE_RISK_FACTORS[base.risk_level]
+    fields = {
+        "risk_level": base.risk_level.value,
+        "risk_label": RISK_LABELS[base.risk_level],
+        "color_code": RISK_COLORS[base.risk_level],
+        "safe_range": {"min": safe_range["min"], "max": safe_range["max"]},
+        "possible_issues": issues,
+        "recommended_actions": actions,
+        "disease_risks": dict(disease_risks),
+    }
+    if not static_issues:
+        del fields["possible_issues"]
+    return RiskTemplate(
+        risk_level=base.risk_level,
+        safe_range=(safe_range["min"], safe_range["max"]),
+        possible_issues=issues,
+        recommended_actions=actions,
+        urgency_score=urgency,
+        disease_risks=disease_risks,
+        json_fields=json.dumps(fields)[1:-1],
+        static_issues=static_issues,
+    )
+
+
+@dataclass
+class BatchRiskAssessment:
+    """
+    Risk assessment of many readings, one array entry per reading.
+
+    conditions index TEMPERATURE_CONDITIONS, which holds the shared issue and
+    action tuples; temperature_change and rate_per_hour are NaN where unknown.
+    """
+    temperatures: np.ndarray
+    species: List[str]
+    safe_min: np.ndarray
+    safe_max: np.ndarray
+    conditions: np.ndarray
+    urgency_scores: np.ndarray
+    temperature_change: np.ndarray
+    rapid_change: np.ndarray
+    rate_per_hour: np.ndarray
+    stress_urgency: np.ndarray
+    # Configured range per distinct species (values as in SPECIES_TEMPERATURE_RANGES) and each entry's index into it
+    safe_ranges: Optional[List[Dict[str, float]]] = None
+    range_index: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.temperatures)
+
+
+def condition_index(current_temp: float, min_safe: float, max_safe: float) -> int:
+    """Index into TEMPERATURE_CONDITIONS for one reading"""
+    if min_safe <= current_temp <= max_safe:
+        # Within safe range - check if close to boundaries
+        if current_temp - min_safe < BOUNDARY_MARGIN:
+            return NEAR_MIN
+        if max_safe - current_temp < BOUNDARY_MARGIN:
+            return NEAR_MAX
+        return OPTIMAL
+    if current_temp < min_safe:
+        return SEVERE_COLD if min_safe - current_temp > SEVERE_DEVIATION else COLD
+    return SEVERE_HOT if current_temp - max_safe > SEVERE_DEVIATION else HOT
+
+
+def _condition_indices(temps: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+    """Vectorized condition_index"""
+    below = temps < mins
+    above = temps > maxs
+    in_range = ~below & ~above
+    near_min = in_range & (temps - mins < BOUNDARY_MARGIN)
+    near_max = in_range & ~near_min & (maxs - temps < BOUNDARY_MARGIN)
+    return np.select(
+        [
+            near_min,
+            near_max,
+            below & (mins - temps > SEVERE_DEVIATION),
+            below,
+            above & (temps - maxs > SEVERE_DEVIATION),
+            above,
+        ],
+        [NEAR_MIN, NEAR_MAX, SEVERE_COLD, COLD, SEVERE_HOT, HOT],
+        default=OPTIMAL,
+    ).astype(np.int8)
+
+
+_CONDITION_URGENCY = np.array([condition.urgency_score for condition in TEMPERATURE_CONDITIONS], dtype=np.int16)
 
 
 class TemperatureRiskAssessor:
@@ -77,7 +397,9 @@ class TemperatureRiskAssessor:
         current_temp: float,
         species: str = "Generic",
         previous_temp: Optional[float] = None,
-        location: str = "Unknown"
+        location: str = "Unknown",
+        pond_id: Optional[str] = None,
+        timestamp: Timestamp = None
     ) -> RiskAssessment:
         """
         Classify temperature risk based on current temperature and species.
@@ -87,217 +409,189 @@ class TemperatureRiskAssessor:
             species: Fish/shrimp species being farmed
             previous_temp: Previous temperature reading for trend analysis
             location: Location identifier for context
+            pond_id: Records the reading in this pond's history and uses its
+                rate of change per hour instead of previous_temp
+            timestamp: Reading time (epoch seconds or ISO 8601), defaults to now
             
         Returns:
             RiskAssessment with risk level, possible issues, and recommendations
         """
+        range_key = species if species in SPECIES_TEMPERATURE_RANGES else None
         safe_range = TemperatureRiskAssessor.get_safe_range(species)
         min_safe, max_safe = safe_range["min"], safe_range["max"]
-        optimal = safe_range["optimal"]
-        
-        possible_issues = []
-        recommended_actions = []
-        risk_level = RiskLevel.NORMAL
-        urgency_score = 0
+        condition = condition_index(current_temp, min_safe, max_safe)
         
-        # Check if temperature is within safe range
-        if min_safe <= current_temp <= max_safe:
-            # Within safe range - check if close to boundaries
-            margin_low = current_temp - min_safe
-            margin_high = max_safe - current_temp
-            
-            if margin_low < 2 or margin_high < 2:
-                # Close to boundary
-                risk_level = RiskLevel.CAUTION
-                urgency_score = 30
-                
-                if margin_low < 2:
-                    possible_issues.append("Temperature approaching minimum safe threshold")
-                    possible_issues.append("Reduced metabolic activity and feeding")
-                    recommended_actions.append("Monitor temperature closely")
-                    recommended_actions.append("Ensure adequate aeration")
-                    recommended_actions.append("Check heater functionality")
-                else:
-                    possible_issues.append("Temperature approaching maximum safe threshold")
-                    possible_issues.append("Reduced oxygen availability")
-                    possible_issues.append("Increased bacterial disease risk")
-                    recommended_actions.append("Increase water aeration immediately")
-                    recommended_actions.append("Check pond shade (e.g., netting or water hyacinth)")
-                    recommended_actions.append("Monitor for disease signs")
-            else:
-                # Comfortably within range
-                risk_level = RiskLevel.NORMAL
-                urgency_score = 0
-                possible_issues.append("No temperature-related action needed")
-                recommended_actions.append("Continue normal monitoring")
-                recommended_actions.append("Feed according to schedule")
+        rate = None
+        degree_hours = None
+        stress_urgency = 0
+        if pond_id is not None:
+            history = temperature_history.record(pond_id, current_temp, timestamp, (min_safe, max_safe))
+            rate = history.rate_per_hour()
+            degree_hours = history.stress.degree_hours()
+            stress_urgency = history.stress.urgency()
         
-        # Below minimum safe temperature
-        elif current_temp < min_safe:
-            below_by = min_safe - current_temp
-            
-            if below_by > 5:
-                # Severely cold
-                risk_level = RiskLevel.HIGH_RISK
-                urgency_score = 95
-                possible_issues = [
-                    "CRITICAL: Water temperature far below safe range",
-                    "Severe reduction in metabolism and immunity",
-                    "Increased disease susceptibility",
-                    "Poor feed conversion",
-                    "Risk of cold-water shock mortality",
-                    "Bacterial growth slowdown but parasites may thrive"
-                ]
-                recommended_actions = [
-                    "IMMEDIATE: Activate backup heaters or heat source",
-                    "Check heating system immediately",
-                    "Reduce feeding to minimum",
-                    "Increase aeration for oxygenation",
-                    "Monitor fish closely for lethargy or disease signs",
-                    "Consider emergency measures (shelter, insulation)",
-                    "Prepare isolation tank with warmer water",
-                    "Test water quality (oxygen, ammonia) frequently"
-                ]
-            else:
-                # Moderately cold
-                risk_level = RiskLevel.CAUTION
-                urgency_score = 60
-                possible_issues = [
-                    "Water temperature below optimal range",
-                    "Reduced feeding and growth rates",
-                    "Slower immune response to pathogens",
-                    "Increased susceptibility to bacterial diseases"
-                ]
-                recommended_actions = [
-                    "Activate heating system if available",
-                    "Reduce feeding by 50%",
-                    "Increase water aeration",
-                    "Monitor for disease signs daily",
-                    "Maintain excellent water quality",
-                    "Adjust feeding schedule to warmer times of day"
-                ]
+        # Check for rapid temperature changes (rapid change is stressful)
+        temp_change = None
+        if rate is not None:
+            rapid_change = abs(rate) > RAPID_CHANGE_THRESHOLD
+        elif previous_temp is not None:
+            temp_change = abs(current_temp - previous_temp)
+            rapid_change = temp_change > RAPID_CHANGE_THRESHOLD
+        else:
+            rapid_change = False
         
-        # Above maximum safe temperature
-        else:  # current_temp > max_safe
-            above_by = current_temp - max_safe
-            
-            if above_by > 5:
-                # Severely hot
-                risk_level = RiskLevel.HIGH_RISK
-                urgency_score = 98
-                possible_issues = [
-                    "CRITICAL: Water temperature far exceeds safe range",
-                    "Severe oxygen depletion in water",
-                    "Extreme metabolic stress on fish",
-                    "Critical disease outbreak risk (bacterial and parasitic)",
-                    "Zooplankton die-off reducing natural food",
-                    "Potential thermal shock mortality",
-                    "Ammonia and nitrite toxicity increases significantly"
-                ]
-                recommended_actions = [
-                    "IMMEDIATE: Emergency cooling measures required",
-                    "Increase aeration to MAXIMUM capacity",
-                    "Add fresh, cooler water if available (avoid thermal shock)",
-                    "Install shade structures (netting, water hyacinth, tarps)",
-                    "Consider emergency partial water change with cooler source",
-                    "Stop feeding immediately",
-                    "Monitor oxygen levels continuously",
-                    "Prepare quarantine tank for emergency treatment",
-                    "Test water quality (especially dissolved oxygen and ammonia)",
-                    "Contact veterinary expert immediately",
-                    "Document all deaths for insurance/records"
-                ]
+        # Condition issues, actions and base urgency are shared across readings
+        template = risk_template(range_key, condition, rapid_change, stress_urgency > 0)
+        possible_issues = template.possible_issues
+        if rapid_change:
+            if rate is not None:
+                issue = f"{RAPID_CHANGE_ISSUE} ({rate:+.1f}°C/hour)"
             else:
-                # Moderately hot
-                risk_level = RiskLevel.CAUTION
-                urgency_score = 70
-                possible_issues = [
-                    "Water temperature above optimal range",
-                    "Reduced dissolved oxygen availability",
-                    "Increased stress on fish",
-                    "Elevated bacterial disease risk",
-                    "Potential parasitic infections (Ichthyophthirius, Trichodina)",
-                    "Increased ammonia/nitrite toxicity"
-                ]
-                recommended_actions = [
-                    "Increase aeration immediately",
-                    "Add shade to pond (aquatic plants, netting, partial tarp)",
-                    "Perform 25-30% water change with cooler source if possible",
-                    "Reduce feeding to 75% of normal",
-                    "Monitor disease signs closely (gasping, fin clamping)",
-                    "Test water quality daily (oxygen, ammonia, nitrite)",
-                    "Consider emergency cooling (ice addition - use with caution)",
-                    "Arrange for shade installation",
-                    "Monitor forecast for temperature trends"
-                ]
+                issue = f"{RAPID_CHANGE_ISSUE} ({temp_change:.1f}°C)"
+            possible_issues = (issue,) + possible_issues
         
-        # Check for rapid temperature changes
-        if previous_temp is not None:
-            temp_change = abs(current_temp - previous_temp)
-            if temp_change > RAPID_CHANGE_THRESHOLD:
-                # Rapid change is stressful
-                possible_issues.insert(0, f"Rapid temperature change detected ({temp_change:.1f}°C)")
-                recommended_actions.insert(0, "Monitor for shock-induced stress signs")
-                # Increase urgency slightly
-                urgency_score = min(100, urgency_score + 15)
+        # Cumulative time outside the safe range drives disease outbreaks
+        if stress_urgency:
+            day, week = (
+                degree_hours["above"][window] + degree_hours["below"][window] for window in ("24h", "7d")
+            )
+            possible_issues = possible_issues + (THERMAL_STRESS_ISSUE.format(day=day, week=week),)
         
         return RiskAssessment(
-            risk_level=risk_level,
+            risk_level=template.risk_level,
             current_temperature=current_temp,
-            safe_range=(min_safe, max_safe),
+            safe_range=template.safe_range,
             possible_issues=possible_issues,
-            recommended_actions=recommended_actions,
-            urgency_score=urgency_score,
-            species=species
+            recommended_actions=template.recommended_actions,
+            urgency_score=min(100, template.urgency_score + stress_urgency),
+            species=species,
+            rate_per_hour=rate,
+            degree_hours=degree_hours,
+            temperature_change=temp_change,
+            template=template
         )
 
     @staticmethod
-    def get_disease_risk_factors(risk_level: RiskLevel, species: str) -> Dict[str, str]:
+    def classify_batch(
+        temperatures: Sequence[float],
+        species: Union[str, Sequence[str]] = "Generic",
+        previous_temperatures: Optional[Sequence[Optional[float]]] = None,
+        pond_ids: Optional[Sequence[Optional[str]]] = None,
+        timestamps: Optional[Sequence[Timestamp]] = None
+    ) -> BatchRiskAssessment:
+        """
+        Classify many readings at once; same rules as classify_risk.
+        
+        Args:
+            temperatures: Current water temperatures in Celsius
+            species: One species for all readings, or one per reading
+            previous_temperatures: Previous reading per entry (None where unknown)
+            pond_ids: Pond per entry (None to skip); readings are recorded in order
+                and the pond's rate per hour replaces previous_temperatures
+            timestamps: Reading time per entry, defaults to now
+            
+        Returns:
+            BatchRiskAssessment referencing the shared TEMPERATURE_CONDITIONS
+        """
+        temps = np.asarray(temperatures, dtype=np.float64)
+        n = len(temps)
+        if isinstance(species, str):
+            species = [species] * n
+        else:
+            species = list(species)
+        if len(species) != n:
+            raise ValueError("species must be a single name or one name per temperature")
+
+        # Look up each distinct species once
+        names, inverse = np.unique(np.asarray(species, dtype=object).astype(str), return_inverse=True)
+        ranges = [TemperatureRiskAssessor.get_safe_range(name) for name in names]
+        mins = np.array([r["min"] for r in ranges], dtype=np.float64)[inverse]
+        maxs = np.array([r["max"] for r in ranges], dtype=np.float64)[inverse]
+
+        conditions = _condition_indices(temps, mins, maxs)
+        urgency = _CONDITION_URGENCY[conditions]
+
+        if previous_temperatures is None:
+            change = np.full(n, np.nan)
+        else:
+            previous = np.array(
+                [np.nan if p is None else p for p in previous_temperatures], dtype=np.float64
+            )
+            if len(previous) != n:
+                raise ValueError("previous_temperatures must have one entry per temperature")
+            change = np.abs(temps - previous)
+
+        rates = np.full(n, np.nan)
+        stress = np.zeros(n, dtype=np.int16)
+        if pond_ids is not None:
+            if len(pond_ids) != n or (timestamps is not None and len(timestamps) != n):
+                raise ValueError("pond_ids and timestamps must have one entry per temperature")
+            for i, pond_id in enumerate(pond_ids):
+                if pond_id is None:
+                    continue
+                history = temperature_history.record(
+                    pond_id,
+                    float(temps[i]),
+                    timestamps[i] if timestamps is not None else None,
+                    (float(mins[i]), float(maxs[i]))
+                )
+                rate = history.rate_per_hour()
+                if rate is not None:
+                    rates[i] = rate
+                stress[i] = history.stress.urgency()
+
+        # NaN (no previous reading) compares False
+        has_rate = ~np.isnan(rates)
+        rapid = np.where(has_rate, np.abs(rates) > RAPID_CHANGE_THRESHOLD, change > RAPID_CHANGE_THRESHOLD)
+        urgency = np.where(rapid, np.minimum(100, urgency + RAPID_CHANGE_URGENCY), urgency)
+        urgency = np.minimum(100, urgency + stress)
+
+        return BatchRiskAssessment(
+            temperatures=temps,
+            species=species,
+            safe_min=mins,
+            safe_max=maxs,
+            conditions=conditions,
+            urgency_scores=urgency,
+            temperature_change=change,
+            rapid_change=rapid,
+            rate_per_hour=rates,
+            stress_urgency=stress,
+            safe_ranges=[{"min": r["min"], "max": r["max"]} for r in ranges],
+            range_index=inverse,
+        )
+
+    @staticmethod
+    def get_disease_risk_factors(risk_level: RiskLevel, species: str) -> Mapping[str, str]:
         """
         Map temperature risk level to disease outbreak probability.
-        Returns disease-specific risks.
+        Returns disease-specific risks (shared, read-only).
         """
-        risk_mapping = {
-            RiskLevel.NORMAL: {
-                "bacterial_disease": "Low (optimal conditions)",
-                "parasitic_disease": "Low",
-                "viral_disease": "Low",
-                "fungal_disease": "Low"
-            },
-            RiskLevel.CAUTION: {
-                "bacterial_disease": "Moderate (stress weakens immunity)",
-                "parasitic_disease": "Moderate to High (if too warm)",
-                "viral_disease": "Moderate (stress increases vulnerability)",
-                "fungal_disease": "Moderate (if too cold and damp)"
-            },
-            RiskLevel.HIGH_RISK: {
-                "bacterial_disease": "CRITICAL (severe immune suppression)",
-                "parasitic_disease": "CRITICAL (rapid reproduction in warm water)",
-                "viral_disease": "CRITICAL (high stress = infection spreads rapidly)",
-                "fungal_disease": "HIGH (if temperature too cold)"
-            }
-        }
-        return risk_mapping.get(risk_level, risk_mapping[RiskLevel.NORMAL])
+        return DISEASE_RISK_FACTORS.get(risk_level, DISEASE_RISK_FACTORS[RiskLevel.NORMAL])
 
     @staticmethod
     def get_color_code(risk_level: RiskLevel) -> str:
         """Get color code for UI display"""
-        colors = {
-            RiskLevel.NORMAL: "#10b981",      # Green
-            RiskLevel.CAUTION: "#f59e0b",     # Amber/Orange
-            RiskLevel.HIGH_RISK: "#ef4444"    # Red
-        }
-        return colors.get(risk_level, "#6b7280")
+        return RISK_COLORS.get(risk_level, "#6b7280")
 
     @staticmethod
     def get_risk_label(risk_level: RiskLevel) -> str:
         """Get human-readable risk label"""
-        labels = {
-            RiskLevel.NORMAL: "No Action Needed",
-            RiskLevel.CAUTION: "Monitor Closely",
-            RiskLevel.HIGH_RISK: "Immediate Action Required"
-        }
-        return labels.get(risk_level, "Unknown")
+        return RISK_LABELS.get(risk_level, "Unknown")
+
+
+def _numeric_fields(assessment: RiskAssessment) -> Dict[str, Any]:
+    """The per-reading part of an assessment response"""
+    return {
+        "current_temperature": assessment.current_temperature,
+        "urgency_score": assessment.urgency_score,
+        "species": assessment.species,
+        "temperature_change": (
+            round(assessment.temperature_change, 2) if assessment.temperature_change is not None else None
+        ),
+        "rate_per_hour": round(assessment.rate_per_hour, 2) if assessment.rate_per_hour is not None else None,
+        "degree_hours": assessment.degree_hours,
+    }
 
 
 def create_assessment_response(assessment: RiskAssessment) -> Dict:
@@ -306,16 +600,105 @@ def create_assessment_response(assessment: RiskAssessment) -> Dict:
         "risk_level": assessment.risk_level.value,
         "risk_label": TemperatureRiskAssessor.get_risk_label(assessment.risk_level),
         "color_code": TemperatureRiskAssessor.get_color_code(assessment.risk_level),
-        "current_temperature": assessment.current_temperature,
         "safe_range": {
             "min": assessment.safe_range[0],
             "max": assessment.safe_range[1]
         },
-        "urgency_score": assessment.urgency_score,
-        "possible_issues": assessment.possible_issues,
-        "recommended_actions": assessment.recommended_actions,
-        "species": assessment.species,
-        "disease_risks": TemperatureRiskAssessor.get_disease_risk_factors(
+        "possible_issues": list(assessment.possible_issues),
+        "recommended_actions": list(assessment.recommended_actions),
+        "disease_risks": dict(TemperatureRiskAssessor.get_disease_risk_factors(
             assessment.risk_level, assessment.species
+        )),
+        **_numeric_fields(assessment),
+    }
+
+
+def create_assessment_response_json(assessment: RiskAssessment, extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Serialize an assessment straight to JSON bytes.
+
+    The static part comes pre-serialized from the assessment's template, so
+    only the numeric fields, issues that carry numbers (and extra) are encoded per call.
+    """
+    template = assessment.template
+    if template is None:
+        return json.dumps({**create_assessment_response(assessment), **(extra or {})}).encode("utf-8")
+    fields = _numeric_fields(assessment)
+    if not template.static_issues:
+        fields["possible_issues"] = list(assessment.possible_issues)
+    dynamic = json.dumps({**fields, **(extra or {})})
+    return ("{" + template.json_fields + ", " + dynamic[1:]).encode("utf-8")
+
+
+def _condition_response(condition: TemperatureCondition) -> Dict:
+    return {
+        "risk_level": condition.risk_level.value,
+        "risk_label": TemperatureRiskAssessor.get_risk_label(condition.risk_level),
+        "color_code": TemperatureRiskAssessor.get_color_code(condition.risk_level),
+        "possible_issues": list(condition.possible_issues),
+        "recommended_actions": list(condition.recommended_actions),
+        "disease_risks": dict(TemperatureRiskAssessor.get_disease_risk_factors(condition.risk_level, "")),
+    }
+
+
+# Built once; every batch response references these instead of per-reading copies
+CONDITION_RESPONSES = {condition.key: _condition_response(condition) for condition in TEMPERATURE_CONDITIONS}
+_CONDITION_KEYS = [condition.key for condition in TEMPERATURE_CONDITIONS]
+_CONDITION_RISK_LEVELS = [condition.risk_level.value for condition in TEMPERATURE_CONDITIONS]
+
+
+def create_batch_assessment_response(batch: BatchRiskAssessment) -> Dict:
+    """
+    Convert BatchRiskAssessment to a JSON-serializable dict.
+
+    Issues, actions and disease risks appear once per condition under
+    "conditions"; each result names its condition by key.
+    """
+    codes = batch.conditions.tolist()
+    # Same values (and JSON types) as the single assessment; one dict per species
+    if batch.safe_ranges is not None:
+        safe_ranges = [batch.safe_ranges[i] for i in batch.range_index.tolist()]
+    else:
+        safe_ranges = [
+            {"min": low, "max": high} for low, high in zip(batch.safe_min.tolist(), batch.safe_max.tolist())
+        ]
+    changes = np.round(batch.temperature_change, 2)
+    rates = np.round(batch.rate_per_hour, 2)
+    results = [
+        {
+            "temperature": temperature,
+            "species": species,
+            "condition": _CONDITION_KEYS[code],
+            "risk_level": _CONDITION_RISK_LEVELS[code],
+            "urgency_score": urgency,
+            "safe_range": safe_range,
+            "temperature_change": None if change != change else change,
+            "rapid_change": rapid,
+            "rate_per_hour": None if rate != rate else rate,
+            "stress_urgency": stress,
+        }
+        for temperature, species, code, urgency, safe_range, change, rapid, rate, stress in zip(
+            batch.temperatures.tolist(),
+            batch.species,
+            codes,
+            batch.urgency_scores.tolist(),
+            safe_ranges,
+            changes.tolist(),
+            batch.rapid_change.tolist(),
+            rates.tolist(),
+            batch.stress_urgency.tolist(),
         )
+    ]
+
+    used = {_CONDITION_KEYS[code] for code in set(codes)}
+    return {
+        "count": len(batch),
+        "results": results,
+        "conditions": {key: CONDITION_RESPONSES[key] for key in _CONDITION_KEYS if key in used},
+        "rapid_change": {
+            "threshold_celsius": RAPID_CHANGE_THRESHOLD,
+            "possible_issue": RAPID_CHANGE_ISSUE,
+            "recommended_action": RAPID_CHANGE_ACTION,
+            "urgency_increase": RAPID_CHANGE_URGENCY,
+        },
     }
@@ -0,0 +1,313 @@
+"""
+Durable Temperature Time-Series Store
+Persists sensor readings in an embedded SQLite database so history survives
+restarts. Readings are buffered and written in batches; each flush also
+folds the new readings into 1-minute, 1-hour and 1-day min/max/mean rollups
+with upserts, so chart queries over long spans read a few hundred rollup
+rows instead of every raw reading.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory for local state; unset means nothing is written to disk unless a path is given explicitly
+AQUA_DATA_DIR = os.getenv("AQUA_DATA_DIR", "").strip() or None
+# SQLite file for readings and rollups (empty = keep history in memory only)
+TEMPERATURE_DB_PATH = os.getenv(
+    "TEMPERATURE_DB_PATH", os.path.join(AQUA_DATA_DIR, "temperature.db") if AQUA_DATA_DIR else ""
+).strip() or None
+# Buffered readings are written when this many are pending, or every flush interval
+TEMPERATURE_DB_BATCH_SIZE = int(os.getenv("TEMPERATURE_DB_BATCH_SIZE", "500"))
+TEMPERATURE_DB_FLUSH_SECONDS = float(os.getenv("TEMPERATURE_DB_FLUSH_SECONDS", "2"))
+# Raw readings older than this are deleted; rollups are kept (0 = keep everything)
+TEMPERATURE_DB_RAW_RETENTION_DAYS = float(os.getenv("TEMPERATURE_DB_RAW_RETENTION_DAYS", "30"))
+# History queries pick the finest resolution that returns at most this many points
+TEMPERATURE_HISTORY_MAX_POINTS = int(os.getenv("TEMPERATURE_HISTORY_MAX_POINTS", "1000"))
+
+RAW = "raw"
+# Rollup resolutions in seconds
+ROLLUP_RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+# Raw readings are assumed to arrive at most about once a minute when choosing a resolution
+_RAW_POINT_SECONDS = 60
+
+# Pruning runs at most this often
+_PRUNE_INTERVAL_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    pond_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    temperature REAL NOT NULL,
+    PRIMARY KEY (pond_id, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollups (
+    pond_id TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (pond_id, resolution, bucket)
+) WITHOUT ROWID;
+
+CREATE TEMP TABLE IF NOT EXISTS incoming (
+    pond_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    temperature REAL NOT NULL
+);
+"""
+
+# Existing buckets are merged: counts and totals add up, extremes widen
+_UPSERT_ROLLUP = """
+INSERT INTO rollups (pond_id, resolution, bucket, count, total, min, max)
+SELECT pond_id, ?, CAST(ts / ? AS INTEGER) * ?, COUNT(*), SUM(temperature), MIN(temperature), MAX(temperature)
+FROM incoming WHERE true
+GROUP BY pond_id, CAST(ts / ? AS INTEGER)
+ON CONFLICT (pond_id, resolution, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    total = total + excluded.total,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max)
+"""
+
+
+def choose_resolution(start: float, end: float, max_points: int = TEMPERATURE_HISTORY_MAX_POINTS) -> str:
+    """Finest resolution that keeps a query over [start, end] within max_points"""
+    span = max(0.0, end - start)
+    if span / _RAW_POINT_SECONDS <= max_points:
+        return RAW
+    for name, seconds in ROLLUP_RESOLUTIONS.items():
+        if span / seconds <= max_points:
+            return name
+    return "1d"
+
+
+class TemperatureStore:
+    """
+    SQLite-backed readings with batched writes and incremental rollups.
+
+    add() only appends to an in-memory buffer; a background thread flushes
+    it in one transaction every flush interval, or as soon as it is full. All database access goes
+    through one connection guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = TEMPERATURE_DB_PATH,
+        batch_size: int = TEMPERATURE_DB_BATCH_SIZE,
+        flush_seconds: float = TEMPERATURE_DB_FLUSH_SECONDS,
+        raw_retention_days: float = TEMPERATURE_DB_RAW_RETENTION_DAYS
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.raw_retention_seconds = raw_retention_days * 86400
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._buffer: List[Tuple[str, float, float]] = []
+        self._buffer_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._last_prune = 0.0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Several serve.py workers may share the file; wait for their write locks
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def add(self, pond_id: str, timestamp: float, temperature: float) -> None:
+        """Buffer one reading for the next batched write"""
+        if not self.enabled:
+            return
+        with self._buffer_lock:
+            self._buffer.append((pond_id, timestamp, temperature))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            if self._flusher is None:
+                # No background flusher (e.g. scripts): write inline
+                self.flush()
+            else:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write buffered readings and update rollups in one transaction.
+
+        Returns:
+            Number of new readings written (duplicates of stored readings are skipped)
+        """
+        if not self.enabled:
+            return 0
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        # Last value wins for repeated (pond, timestamp) pairs within the batch
+        rows = list({(pond_id, ts): (pond_id, ts, temp) for pond_id, ts, temp in batch}.values())
+        with self._db_lock:
+            connection = self._connect()
+            try:
+                connection.execute("BEGIN")
+                connection.executemany("INSERT INTO incoming VALUES (?, ?, ?)", rows)
+                # Readings already stored must not be counted into the rollups again
+                connection.execute(
+                    "DELETE FROM incoming WHERE EXISTS ("
+                    "SELECT 1 FROM readings r WHERE r.pond_id = incoming.pond_id AND r.ts = incoming.ts)"
+                )
+                written = connection.execute("INSERT INTO readings SELECT * FROM incoming").rowcount
+                for seconds in ROLLUP_RESOLUTIONS.values():
+                    connection.execute(_UPSERT_ROLLUP, (seconds, seconds, seconds, seconds))
+                connection.execute("DELETE FROM incoming")
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            self._prune(connection)
+        self.written += written
+        return written
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        now = time.time()
+        if self.raw_retention_seconds <= 0 or now - self._last_prune < _PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        deleted = connection.execute(
+            "DELETE FROM readings WHERE ts < ?", (now - self.raw_retention_seconds,)
+        ).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} raw temperature readings past retention")
+
+    def start(self) -> None:
+        """Flush the buffer periodically on a background thread"""
+        if not self.enabled or self._flusher is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_seconds)
+                self._wake.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Failed to write temperature readings: {e}")
+
+        self._stop.clear()
+        self._flusher = threading.Thread(target=run, name="temperature-store-flusher", daemon=True)
+        self._flusher.start()
+        logger.info(f"Temperature store at '{self.path}' (flush every {self.flush_seconds}s)")
+
+    def close(self) -> None:
+        """Stop the flusher, write what is buffered and close the database"""
+        self._stop.set()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_seconds + 5)
+            self._flusher = None
+        self.flush()
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def recent(self, pond_id: str, limit: int) -> List[Tuple[float, float]]:
+        """The newest `limit` stored readings of a pond as (timestamp, temperature), oldest first"""
+        if not self.enabled:
+            return []
+        with self._db_lock:
+            rows = self._connect().execute(
+                "SELECT ts, temperature FROM readings WHERE pond_id = ? ORDER BY ts DESC LIMIT ?",
+                (pond_id, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def query(
+        self,
+        pond_id: str,
+        start: float,
+        end: float,
+        resolution: Optional[str] = None,
+        max_points: int = TEMPERATURE_HISTORY_MAX_POINTS
+    ) -> Dict[str, Any]:
+        """
+        History of a pond for charts (blocking).
+
+        Args:
+            pond_id: Pond identifier
+            start: Start of the range, epoch seconds (inclusive)
+            end: End of the range, epoch seconds (inclusive)
+            resolution: "raw", "1m", "1h" or "1d"; chosen from the span when None
+            max_points: Point budget used to choose the resolution
+
+        Returns:
+            Dict with the resolution used and points of timestamp, min, max, mean and count
+        """
+        if resolution is None:
+            resolution = choose_resolution(start, end, max_points)
+        if resolution != RAW and resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {[RAW, *ROLLUP_RESOLUTIONS]}")
+
+        # Make readings still in the buffer visible
+        self.flush()
+        with self._db_lock:
+            connection = self._connect()
+            if resolution == RAW:
+                rows = connection.execute(
+                    "SELECT ts, temperature, temperature, temperature, 1 FROM readings "
+                    "WHERE pond_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                    (pond_id, start, end),
+                ).fetchall()
+            else:
+                seconds = ROLLUP_RESOLUTIONS[resolution]
+                rows = connection.execute(
+                    "SELECT bucket, min, max, total / count, count FROM rollups "
+                    "WHERE pond_id = ? AND resolution = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                    (pond_id, seconds, math.floor(start / seconds) * seconds, end),
+                ).fetchall()
+
+        return {
+            "pond_id": pond_id,
+            "resolution": resolution,
+            "start": start,
+            "end": end,
+            "points": [
+                {"timestamp": ts, "min": low, "max": high, "mean": round(mean, 3), "count": count}
+                for ts, low, high, mean, count in rows
+            ],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "buffered": len(self._buffer),
+            "written": self.written,
+        }
+
+
+# Shared by all requests in this process
+temperature_store = TemperatureStore()
@@ -0,0 +1,202 @@
+"""
+Streaming Temperature Ingestion
+Evaluates continuous sensor readings incrementally per pond and reports only
+risk-level transitions. Each reading is recorded in the pond's history (for
+the hourly rate of change) and classified against the species range; a pond
+escalates as soon as a worse level is confirmed, and only clears back to a
+better level once readings are clear of the boundary by a hysteresis margin,
+so readings hovering at a boundary do not produce a stream of alerts.
+"""
+
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from temperature_history import (
+    TEMPERATURE_HISTORY_MAX_PONDS,
+    Timestamp,
+    temperature_history,
+    to_epoch_seconds,
+)
+from temperature_monitoring import (
+    RAPID_CHANGE_THRESHOLD,
+    RAPID_CHANGE_URGENCY,
+    TEMPERATURE_CONDITIONS,
+    RiskLevel,
+    TemperatureRiskAssessor,
+    condition_index,
+)
+
+logger = logging.getLogger(__name__)
+
+# Readings must be this many °C inside a better band before a pond's level drops
+TEMPERATURE_ALERT_HYSTERESIS_CELSIUS = float(os.getenv("TEMPERATURE_ALERT_HYSTERESIS_CELSIUS", "0.5"))
+# Consecutive readings needed to confirm a worse / better level
+TEMPERATURE_ALERT_ESCALATE_READINGS = int(os.getenv("TEMPERATURE_ALERT_ESCALATE_READINGS", "1"))
+TEMPERATURE_ALERT_CLEAR_READINGS = int(os.getenv("TEMPERATURE_ALERT_CLEAR_READINGS", "3"))
+
+_SEVERITY = {RiskLevel.NORMAL: 0, RiskLevel.CAUTION: 1, RiskLevel.HIGH_RISK: 2}
+_LEVELS = (RiskLevel.NORMAL, RiskLevel.CAUTION, RiskLevel.HIGH_RISK)
+
+
+@dataclass
+class PondRiskState:
+    species: str
+    severity: int
+    pending: Optional[int] = None
+    pending_count: int = 0
+
+
+class TemperatureStreamMonitor:
+    """
+    Per-pond risk state for streamed readings.
+
+    State is process-wide, so a logger that reconnects continues where it
+    left off instead of re-alerting. Ponds are bounded like the history store.
+    """
+
+    def __init__(
+        self,
+        hysteresis: float = TEMPERATURE_ALERT_HYSTERESIS_CELSIUS,
+        escalate_readings: int = TEMPERATURE_ALERT_ESCALATE_READINGS,
+        clear_readings: int = TEMPERATURE_ALERT_CLEAR_READINGS,
+        max_ponds: int = TEMPERATURE_HISTORY_MAX_PONDS
+    ):
+        self.hysteresis = max(0.0, hysteresis)
+        self.escalate_readings = max(1, escalate_readings)
+        self.clear_readings = max(1, clear_readings)
+        self.max_ponds = max(1, max_ponds)
+        self._ponds: "OrderedDict[str, PondRiskState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _severity(self, temperature: float, min_safe: float, max_safe: float) -> int:
+        return _SEVERITY[TEMPERATURE_CONDITIONS[condition_index(temperature, min_safe, max_safe)].risk_level]
+
+    def _target(self, state: PondRiskState, temperature: float, min_safe: float, max_safe: float) -> int:
+        """Level the pond should move towards after this reading"""
+        observed = self._severity(temperature, min_safe, max_safe)
+        if observed >= state.severity:
+            return observed
+        # Clearing: the reading must stay better even when shifted by the margin either way
+        guarded = max(
+            self._severity(temperature - self.hysteresis, min_safe, max_safe),
+            self._severity(temperature + self.hysteresis, min_safe, max_safe),
+        )
+        return min(guarded, state.severity)
+
+    def ingest(
+        self,
+        pond_id: str,
+        temperature: float,
+        species: Optional[str] = None,
+        timestamp: Timestamp = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate one reading.
+
+        Args:
+            pond_id: Pond identifier
+            temperature: Water temperature in Celsius
+            species: Species farmed in the pond; defaults to the pond's last known species
+            timestamp: Reading time (epoch seconds or ISO 8601), defaults to now
+
+        Returns:
+            A risk_change event if the pond's level changed (or this is its first reading), else None
+        """
+        seconds = to_epoch_seconds(timestamp)
+        with self._lock:
+            state = self._ponds.get(pond_id)
+            species = species or (state.species if state else "Generic")
+            safe_range = TemperatureRiskAssessor.get_safe_range(species)
+            min_safe, max_safe = safe_range["min"], safe_range["max"]
+            history = temperature_history.record(pond_id, temperature, seconds, (min_safe, max_safe))
+
+            if state is None:
+                state = PondRiskState(species, self._severity(temperature, min_safe, max_safe))
+                self._ponds[pond_id] = state
+                if len(self._ponds) > self.max_ponds:
+                    self._ponds.popitem(last=False)
+                previous = None
+            else:
+                self._ponds.move_to_end(pond_id)
+                state.species = species
+                target = self._target(state, temperature, min_safe, max_safe)
+                if target == state.severity:
+                    state.pending, state.pending_count = None, 0
+                    return None
+
+                if state.pending == target:
+                    state.pending_count += 1
+                else:
+                    state.pending, state.pending_count = target, 1
+                needed = self.escalate_readings if target > state.severity else self.clear_readings
+                if state.pending_count < needed:
+                    return None
+
+                previous = _LEVELS[state.severity]
+                state.severity = target
+                state.pending, state.pending_count = None, 0
+
+        condition = TEMPERATURE_CONDITIONS[condition_index(temperature, min_safe, max_safe)]
+        level = _LEVELS[state.severity]
+        rate = history.rate_per_hour()
+        urgency = condition.urgency_score
+        if rate is not None and abs(rate) > RAPID_CHANGE_THRESHOLD:
+            urgency = min(100, urgency + RAPID_CHANGE_URGENCY)
+        urgency = min(100, urgency + history.stress.urgency())
+        return {
+            "event": "risk_change",
+            "pond_id": pond_id,
+            "species": species,
+            "previous_risk_level": previous.value if previous else None,
+            "risk_level": level.value,
+            "risk_label": TemperatureRiskAssessor.get_risk_label(level),
+            "color_code": TemperatureRiskAssessor.get_color_code(level),
+            "condition": condition.key,
+            "temperature": temperature,
+            "timestamp": seconds,
+            "rate_per_hour": round(rate, 2) if rate is not None else None,
+            "urgency_score": urgency,
+            "degree_hours": history.stress.degree_hours(),
+            "safe_range": {"min": min_safe, "max": max_safe},
+            "recommended_actions": condition.recommended_actions,
+        }
+
+    def ingest_message(self, message: Any) -> Optional[Dict[str, Any]]:
+        """
+        Validate and evaluate one decoded JSON reading:
+        {"pond_id": ..., "temperature": ..., "species"?: ..., "timestamp"?: ...}
+
+        Raises:
+            ValueError: If the reading is malformed
+        """
+        if not isinstance(message, dict):
+            raise ValueError("Reading must be a JSON object")
+        pond_id = message.get("pond_id")
+        if not isinstance(pond_id, str) or not pond_id:
+            raise ValueError("Reading needs a pond_id")
+        temperature = message.get("temperature")
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+            raise ValueError("Reading needs a numeric temperature")
+        if not -50 <= temperature <= 60:
+            raise ValueError("Temperature must be between -50°C and 60°C")
+        species = message.get("species")
+        if species is not None and not isinstance(species, str):
+            raise ValueError("species must be a string")
+        timestamp = message.get("timestamp")
+        if timestamp is not None and not isinstance(timestamp, str):
+            if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+                raise ValueError("timestamp must be epoch seconds or an ISO 8601 string")
+        return self.ingest(pond_id, float(temperature), species, timestamp)
+
+    def risk_level(self, pond_id: str) -> Optional[RiskLevel]:
+        state = self._ponds.get(pond_id)
+        return _LEVELS[state.severity] if state else None
+
+
+# Shared by all stream connections in this process
+temperature_stream_monitor = TemperatureStreamMonitor()
@@ -0,0 +1,129 @@
+"""
+Shared test setup: the backend modules live flat in backend/, so make them
+importable, and keep the shared instances from touching local state.
+"""
+
+import io
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set before any backend module reads them (load_dotenv() does not override)
+os.environ.setdefault("AQUA_DATA_DIR", "")
+os.environ.setdefault("TEMPERATURE_DB_PATH", "")
+os.environ.setdefault("GEOCODE_CACHE_PATH", "")
+os.environ.setdefault("GAZETTEER_PATH", "")
+
+
+def image_bytes(color=(0, 128, 255), size=(32, 32), fmt="PNG") -> bytes:
+    """Small encoded image for upload tests"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def client():
+    """API test client with startup/shutdown hooks run (no models are installed here)"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def fake_classifier(client, monkeypatch):
+    """
+    Stand-in classifier behind the real batcher: predicts from the image's
+    red channel and records each batch it is given.
+    """
+    import main
+    from prediction_cache import PredictionCache
+
+    batches = []
+
+    async def run_batch(images):
+        batches.append(len(images))
+        labels = ["Fish_Healthy Fish" if image.getpixel((0, 0))[0] < 128 else "Fish_Bacterial Red disease"
+                  for image in images]
+        return [[{"label": label, "score": 0.9}] for label in labels]
+
+    monkeypatch.setattr(main.classifier_batcher, "run_batch", run_batch)
+    monkeypatch.setattr(main.inference_executor, "classifier_loaded", True)
+    monkeypatch.setattr(main.inference_executor, "classifier_backend", "fake")
+    monkeypatch.setattr(main, "classifier_cache", PredictionCache("classifier", disk_dir=None))
+    return batches
+
+
+class _FakeTensor:
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class _FakeBoxes:
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+        self.xyxy = _FakeTensor(rows[:, :4])
+        self.conf = _FakeTensor(rows[:, 4])
+        self.cls = _FakeTensor(rows[:, 5])
+
+    def __len__(self):
+        return len(self.xyxy.numpy())
+
+
+class FakeYolo:
+    """
+    Stand-in for an ultralytics model: ``detect(image)`` gives the (N, 6)
+    rows for one image; predict() filters them by ``conf`` like YOLO does.
+    """
+
+    def __init__(self, detect):
+        self.detect = detect
+        self.calls = []
+
+    def predict(self, source, conf=0.25, imgsz=None, verbose=True):
+        images = source if isinstance(source, list) else [source]
+        self.calls.append((len(images), conf, imgsz))
+        results = []
+        for image in images:
+            rows = np.asarray(self.detect(image), dtype=np.float32).reshape(-1, 6)
+            results.append(SimpleNamespace(boxes=_FakeBoxes(rows[rows[:, 4] >= conf])))
+        return results
+
+
+@pytest.fixture
+def executor():
+    """The process-wide inference executor, started for one test"""
+    from inference_executor import inference_executor
+
+    inference_executor.start()
+    yield inference_executor
+    inference_executor.shutdown()
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """Empty in-memory pond histories in place of the process-wide one"""
+    import main
+    import temperature_monitoring
+    import temperature_stream
+    from temperature_history import TemperatureHistoryStore
+
+    history = TemperatureHistoryStore(store=None)
+    for module in (temperature_monitoring, temperature_stream, main):
+        monkeypatch.setattr(module, "temperature_history", history)
+    return history
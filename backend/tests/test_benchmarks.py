@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_upstreams import LatencyProfile, MockConfig, create_mock_app  # noqa: E402
+from run_benchmark import ScenarioResult, compare_to_baseline, percentile, synthetic_jpeg  # noqa: E402
+
+
+def result(scenario, rps, p95_ms):
+    return ScenarioResult(scenario, 100, 0, 4, 1.0, rps, p95_ms / 2, p95_ms, p95_ms, p95_ms, {"200": 100})
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_synthetic_images_are_reproducible():
+    assert synthetic_jpeg(64, 48, seed=1)[:2] == b"\xff\xd8"
+    assert synthetic_jpeg(64, 48, seed=1) != synthetic_jpeg(64, 48, seed=2)
+
+
+def test_compare_to_baseline_flags_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": [
+        {"scenario": "predict", "rps": 100.0, "p95_ms": 50.0},
+        {"scenario": "assess-risk", "rps": 1000.0, "p95_ms": 5.0},
+    ]}))
+
+    regressions = compare_to_baseline(
+        [result("predict", 95.0, 54.0), result("assess-risk", 500.0, 9.0), result("seed-count", 1.0, 999.0)],
+        str(baseline),
+        tolerance_pct=10
+    )
+
+    assert regressions == ["assess-risk: p95 5.0 -> 9.0 ms", "assess-risk: rps 1000.0 -> 500.0"]
+
+
+@pytest.fixture
+def mock_client():
+    config = MockConfig(roboflow_detections=3)
+    return TestClient(create_mock_app(config)), config
+
+
+def test_mock_geocoding_is_deterministic(mock_client):
+    client, _ = mock_client
+
+    first = client.get("/geocoding/v1/search", params={"name": "eluru"}).json()
+    second = client.get("/geocoding/v1/search", params={"name": "Eluru"}).json()
+
+    assert first == second
+    assert first["results"][0]["name"] == "Eluru"
+
+
+def test_mock_forecast_returns_requested_days(mock_client):
+    client, _ = mock_client
+
+    body = client.get(
+        "/forecast/v1/forecast",
+        params={"latitude": 16.5, "longitude": 81.5, "current": "temperature_2m", "daily": "x", "forecast_days": 3}
+    ).json()
+
+    assert "temperature_2m" in body["current"]
+    assert len(body["daily"]["time"]) == 3
+
+
+def test_mock_roboflow_returns_configured_detections(mock_client):
+    client, _ = mock_client
+
+    body = client.post("/roboflow/fry/1", content=b"image").json()
+
+    assert len(body["predictions"]) == 3
+
+
+def test_mock_injects_failures(mock_client):
+    client, config = mock_client
+    config.roboflow = LatencyProfile(error_rate=1.0)
+
+    assert client.post("/roboflow/fry/1", content=b"image").status_code == 503
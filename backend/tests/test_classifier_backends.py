@@ -0,0 +1,143 @@
+import runpy
+
+import pytest
+from PIL import Image
+
+import classifier_backends
+from classifier_backends import EAGER, ONNX, QUANTIZED, load_validated_classifier, validate_backend
+
+
+class FakeClassifier:
+    """Labels each image by its red channel; ``flip`` mislabels every image"""
+
+    def __init__(self, name, flip=False):
+        self.name = name
+        self.flip = flip
+
+    def __call__(self, images, batch_size=1):
+        results = []
+        for image in images:
+            dark = image.getpixel((0, 0))[0] < 128
+            results.append([{"label": "dark" if dark != self.flip else "light", "score": 1.0}])
+        return results
+
+
+@pytest.fixture
+def reference_dir(tmp_path):
+    for i, shade in enumerate((0, 255, 30)):
+        Image.new("RGB", (8, 8), (shade, 0, 0)).save(tmp_path / f"{i}.png")
+    (tmp_path / "notes.txt").write_text("ignored")
+    return tmp_path
+
+
+@pytest.fixture
+def builders(monkeypatch):
+    built = {}
+
+    def builder(name, flip=False):
+        def build(hf_token):
+            built[name] = FakeClassifier(name, flip)
+            return built[name]
+        return build
+
+    monkeypatch.setitem(classifier_backends._BUILDERS, EAGER, builder(EAGER))
+    monkeypatch.setitem(classifier_backends._BUILDERS, QUANTIZED, builder(QUANTIZED))
+    monkeypatch.setitem(classifier_backends._BUILDERS, ONNX, builder(ONNX, flip=True))
+    return built
+
+
+def test_validate_backend_reports_agreement():
+    images = [Image.new("RGB", (4, 4), (shade, 0, 0)) for shade in (0, 200)]
+
+    same = validate_backend(FakeClassifier("a"), FakeClassifier("b"), images)
+    different = validate_backend(FakeClassifier("a", flip=True), FakeClassifier("b"), images)
+
+    assert (same["top1_agreement"], same["mismatches"]) == (1.0, [])
+    assert (different["top1_agreement"], different["mismatches"]) == (0.0, [0, 1])
+
+
+def test_validate_backend_rejects_empty_reference_set():
+    with pytest.raises(ValueError):
+        validate_backend(FakeClassifier("a"), FakeClassifier("b"), [])
+
+
+def test_agreeing_backend_is_used(builders, reference_dir, monkeypatch):
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", str(reference_dir))
+
+    classifier, backend = load_validated_classifier(QUANTIZED)
+
+    assert backend == QUANTIZED
+    assert classifier.name == QUANTIZED
+
+
+def test_disagreeing_backend_falls_back_to_eager(builders, reference_dir, monkeypatch):
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", str(reference_dir))
+
+    classifier, backend = load_validated_classifier(ONNX)
+
+    assert backend == EAGER
+    assert classifier.name == EAGER
+
+
+@pytest.mark.parametrize("make_dir", ["missing", "empty"])
+def test_unusable_reference_set_falls_back_to_eager(builders, tmp_path, monkeypatch, make_dir):
+    directory = tmp_path / "reference"
+    if make_dir == "empty":
+        directory.mkdir()
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", str(directory))
+
+    classifier, backend = load_validated_classifier(QUANTIZED)
+
+    assert backend == EAGER
+    assert classifier.name == EAGER
+
+
+def test_validation_is_required_by_default(builders, monkeypatch):
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", None)
+
+    assert load_validated_classifier(QUANTIZED)[1] == EAGER
+
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_REQUIRE_VALIDATION", False)
+
+    assert load_validated_classifier(QUANTIZED)[1] == QUANTIZED
+
+
+def test_build_failure_falls_back_to_eager(builders, reference_dir, monkeypatch):
+    def broken(hf_token):
+        raise RuntimeError("optimum is not installed")
+
+    monkeypatch.setitem(classifier_backends._BUILDERS, ONNX, broken)
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", str(reference_dir))
+
+    assert load_validated_classifier(ONNX)[1] == EAGER
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        classifier_backends.build_classifier("tensorrt")
+
+
+@pytest.mark.parametrize("backend", [ONNX, "tensorrt"])
+def test_unvalidated_build_failure_falls_back_to_eager(builders, monkeypatch, backend):
+    def broken(hf_token):
+        raise ImportError("optimum[onnxruntime] is not installed")
+
+    monkeypatch.setitem(classifier_backends._BUILDERS, ONNX, broken)
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_VALIDATION_DIR", None)
+    monkeypatch.setattr(classifier_backends, "CLASSIFIER_REQUIRE_VALIDATION", False)
+
+    classifier, name = load_validated_classifier(backend)
+
+    assert name == EAGER
+    assert classifier.name == EAGER
+
+
+def test_unknown_configured_backend_defaults_to_eager(monkeypatch):
+    monkeypatch.setenv("CLASSIFIER_BACKEND", "TensorRT")
+
+    namespace = runpy.run_path(classifier_backends.__file__)
+
+    assert namespace["CLASSIFIER_BACKEND"] == EAGER
+
+    monkeypatch.setenv("CLASSIFIER_BACKEND", " ONNX ")
+    assert runpy.run_path(classifier_backends.__file__)["CLASSIFIER_BACKEND"] == ONNX
@@ -0,0 +1,320 @@
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import types
+
+import numpy as np
+import pytest
+
+import seed_counting
+from conftest import FakeYolo, image_bytes
+from fry_tracking import FryStreamCounter, LineCrossingTracker, read_video_frames
+
+FRAME = (100, 100)
+
+
+def box(x, y, half=2):
+    return [x - half, y - half, x + half, y + half]
+
+
+def run_track(tracker, positions):
+    """Feed one fry per frame at each (x, y) in positions; returns crossings per frame"""
+    return [tracker.update(np.array([box(x, y)], dtype=np.float32), FRAME) for x, y in positions]
+
+
+def test_fry_is_counted_once_when_it_crosses():
+    tracker = LineCrossingTracker(line_position=0.5, axis="y", max_distance=0.05)
+
+    crossings = run_track(tracker, [(50, y) for y in range(40, 62, 4)])
+
+    assert sum(crossings) == 1
+    assert tracker.total == 1
+
+
+def test_crossing_back_does_not_count_again():
+    tracker = LineCrossingTracker(line_position=0.5, axis="y", max_distance=0.05)
+
+    run_track(tracker, [(50, y) for y in (44, 48, 52, 48, 44, 48, 52, 56)])
+
+    assert tracker.total == 1
+
+
+def test_fry_that_stays_on_one_side_is_not_counted():
+    tracker = LineCrossingTracker(line_position=0.5, axis="x", max_distance=0.05)
+
+    run_track(tracker, [(x, 50) for x in range(10, 40, 3)])
+
+    assert tracker.total == 0
+    assert tracker.active_tracks == 1
+
+
+def test_two_fry_crossing_together_are_both_counted():
+    tracker = LineCrossingTracker(line_position=0.5, axis="y", max_distance=0.05)
+    for y in range(42, 60, 3):
+        tracker.update(np.array([box(20, y), box(80, 100 - y)], dtype=np.float32), FRAME)
+
+    assert tracker.total == 2
+
+
+def test_tracks_expire_after_missed_frames():
+    tracker = LineCrossingTracker(max_missed=2)
+    tracker.update(np.array([box(50, 20)], dtype=np.float32), FRAME)
+    empty = np.empty((0, 6), dtype=np.float32)
+
+    tracker.update(empty, FRAME)
+    tracker.update(empty, FRAME)
+    assert tracker.active_tracks == 1
+    tracker.update(empty, FRAME)
+
+    assert tracker.active_tracks == 0
+
+
+def test_jumps_beyond_max_distance_start_a_new_track():
+    tracker = LineCrossingTracker(line_position=0.5, max_distance=0.05)
+
+    run_track(tracker, [(50, 30), (50, 70)])
+
+    assert tracker.total == 0
+    assert tracker.active_tracks == 2
+
+
+def test_invalid_axis_is_rejected():
+    with pytest.raises(ValueError):
+        LineCrossingTracker(axis="z")
+
+
+def test_counter_applies_stride_and_drops_oldest_frames():
+    counter = FryStreamCounter(frame_stride=2, max_pending=2)
+    for i in range(8):
+        counter.submit(i)
+
+    assert counter.frames_received == 8
+    assert counter.pending == 2
+    assert counter.frames_dropped == 2
+    assert [frame for _, frame in counter._pending] == [4, 6]
+
+
+def frame_at(y):
+    """Blank frame carrying the fry's y position in its first pixel"""
+    frame = np.zeros((FRAME[1], FRAME[0], 3), dtype=np.uint8)
+    frame[0, 0, 0] = y
+    return frame
+
+
+@pytest.fixture
+def fry_model(monkeypatch):
+    model = FakeYolo(lambda frame: [box(50, int(np.asarray(frame)[0, 0, 0])) + [0.9, 0]])
+    monkeypatch.setattr(seed_counting, "get_seed_model", lambda: model)
+    return model
+
+
+def test_counter_batches_frames_through_the_model(executor, fry_model):
+    counter = FryStreamCounter(frame_stride=1, batch_size=4, max_pending=None)
+    for y in range(40, 60, 2):
+        counter.submit(frame_at(y))
+
+    async def drain():
+        summaries = []
+        while counter.pending:
+            summaries.append(await counter.process_pending())
+        return summaries
+
+    summaries = asyncio.run(drain())
+
+    assert [n for n, _, _ in fry_model.calls] == [4, 4, 2]
+    assert summaries[-1]["count"] == 1
+    assert summaries[-1]["frames_processed"] == 10
+    assert summaries[-1]["frame"] == 9
+
+
+def test_undecodable_frames_are_skipped_and_reported(executor, fry_model):
+    counter = FryStreamCounter(frame_stride=1, batch_size=4, max_pending=None)
+    counter.submit(b"not an image")
+    counter.submit(image_bytes((50, 0, 0), size=FRAME))
+    counter.submit(b"")
+
+    summary = asyncio.run(counter.process_pending())
+
+    assert [n for n, _, _ in fry_model.calls] == [1]
+    assert summary["frames_processed"] == 1
+    assert summary["frames_invalid"] == 2
+    assert summary["frame"] == 2
+
+    counter.submit(b"still not an image")
+    summary = asyncio.run(counter.process_pending())
+    assert len(fry_model.calls) == 1
+    assert summary["frames_invalid"] == 3
+
+
+def test_live_stream_survives_a_corrupt_frame(client, executor, fry_model, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "local_model_available", lambda: True)
+
+    with client.websocket_connect("/seed-count/stream") as ws:
+        ws.send_bytes(b"corrupt")
+        ws.send_bytes(image_bytes((50, 0, 0), size=FRAME))
+        ws.send_bytes(image_bytes((52, 0, 0), size=FRAME))
+        ws.send_text("end")
+        summaries = []
+        while not summaries or not summaries[-1].get("final"):
+            summaries.append(ws.receive_json())
+
+    final = summaries[-1]
+    assert final["frames_received"] == 3
+    assert final["frames_invalid"] == 1
+    assert final["frames_processed"] == 1
+
+
+class FakeCapture:
+    def __init__(self, frames, opened=True):
+        self.frames = list(frames)
+        self.opened = opened
+        self.released = False
+
+    def isOpened(self):
+        return self.opened
+
+    def get(self, prop):
+        return 10.0
+
+    def grab(self):
+        if not self.frames:
+            return False
+        self.frames.pop(0)
+        return True
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+def test_read_video_frames_skips_strided_frames_without_decoding():
+    capture = FakeCapture(frame_at(y) for y in range(5))
+    counter = FryStreamCounter(frame_stride=2, max_pending=None)
+
+    assert read_video_frames(capture, counter, max_frames=2) is True
+    assert read_video_frames(capture, counter, max_frames=2) is False
+    assert counter.frames_received == 5
+    assert [int(frame[0, 0, 0]) for _, frame in counter._pending] == [0, 2, 4]
+
+
+@pytest.fixture
+def fake_cv2(monkeypatch, tmp_path):
+    """OpenCV stand-in whose captures replay ``frames`` (None = cannot decode)"""
+    import main
+    import tempfile
+
+    module = types.ModuleType("cv2")
+    module.CAP_PROP_FPS = 5
+    module.frames = None
+    module.captures = []
+
+    def video_capture(path):
+        assert os.path.exists(path)
+        capture = FakeCapture(module.frames or [], opened=module.frames is not None)
+        module.captures.append(capture)
+        return capture
+
+    module.VideoCapture = video_capture
+    monkeypatch.setitem(sys.modules, "cv2", module)
+    monkeypatch.setattr(main, "local_model_available", lambda: True)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return module
+
+
+def test_video_upload_streams_counts_and_removes_the_file(client, fake_cv2, fry_model, tmp_path):
+    fake_cv2.frames = [frame_at(y) for y in range(40, 60)]
+
+    response = client.post("/seed-count/video", files={"file": ("pond.mp4", b"video", "video/mp4")})
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["final"] is True
+    assert events[-1]["count"] == 1
+    assert "video_time" in events[0]
+    assert fake_cv2.captures[0].released
+    assert os.listdir(tmp_path) == []
+
+
+def test_undecodable_video_is_rejected_and_removed(client, fake_cv2, fry_model, tmp_path):
+    response = client.post("/seed-count/video", files={"file": ("pond.mp4", b"video", "video/mp4")})
+
+    assert response.status_code == 400
+    assert fake_cv2.captures[0].released
+    assert os.listdir(tmp_path) == []
+
+
+def test_setup_errors_remove_the_file(client, fake_cv2, fry_model, tmp_path, monkeypatch):
+    import main
+
+    def broken_counter(**kwargs):
+        raise RuntimeError("tracker setup failed")
+
+    fake_cv2.frames = [frame_at(50)]
+    monkeypatch.setattr(main, "FryStreamCounter", broken_counter)
+
+    with pytest.raises(RuntimeError):
+        client.post("/seed-count/video", files={"file": ("pond.mp4", b"video", "video/mp4")})
+
+    assert os.listdir(tmp_path) == []
+
+
+class SlowCapture(FakeCapture):
+    """Capture whose reads take a while, recording any release that lands mid-read"""
+
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.reading = False
+        self.released_mid_read = False
+
+    def read(self):
+        self.reading = True
+        try:
+            time.sleep(0.005)
+            return super().read()
+        finally:
+            self.reading = False
+
+    def release(self):
+        self.released_mid_read = self.reading
+        super().release()
+
+
+def test_disconnect_waits_for_the_running_read_before_release(executor, fake_cv2, fry_model, tmp_path):
+    import main
+    from starlette.datastructures import Headers, UploadFile
+
+    capture = SlowCapture(frame_at(40 + y % 20) for y in range(400))
+    fake_cv2.VideoCapture = lambda path: capture
+
+    async def run():
+        upload = UploadFile(
+            io.BytesIO(b"video"), filename="pond.mp4", headers=Headers({"content-type": "video/mp4"})
+        )
+        response = await main.count_fry_in_video(upload, None)
+        body = response.body_iterator
+        await body.__anext__()
+        # Client goes away while the next batch of frames is being read
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        for _ in range(200):
+            if capture.released:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert capture.released
+    assert not capture.released_mid_read
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import geocoding
+import weather_service
+from geocoding import Gazetteer, GeocodeCache, normalize_place_name
+from weather_service import LocationService, WeatherHttpClient
+
+BUNDLED_GAZETTEER = os.path.join(os.path.dirname(geocoding.__file__), "gazetteer.csv")
+BHIMAVARAM = (16.54, 81.52, "Bhimavaram, India")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() as seen by the geocoding module"""
+    now = SimpleNamespace(value=1_800_000_000.0)
+    monkeypatch.setattr(geocoding, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_normalize_place_name():
+    assert normalize_place_name("  São  Paulo, BR ") == "sao paulo br"
+    assert normalize_place_name("Rajahmundry") == normalize_place_name("RAJAHMUNDRY.")
+    assert normalize_place_name("Bhimavaram,Andhra_Pradesh") == "bhimavaram andhra pradesh"
+    assert normalize_place_name(" ,. ") == ""
+
+
+def test_gazetteer_lookup_by_name_state_and_country():
+    gazetteer = Gazetteer(BUNDLED_GAZETTEER)
+
+    assert gazetteer.lookup("Bhimavaram") == BHIMAVARAM
+    assert gazetteer.lookup("bhimavaram, andhra pradesh") == BHIMAVARAM
+    assert gazetteer.lookup("Bhimavaram India") == BHIMAVARAM
+    assert gazetteer.lookup("Bhimavaram, Andhra Pradesh, India") == BHIMAVARAM
+    assert gazetteer.lookup("Bhima") is None
+    assert gazetteer.lookup("") is None
+    assert len(gazetteer) == 53
+
+
+def test_gazetteer_prefix_search():
+    gazetteer = Gazetteer(BUNDLED_GAZETTEER)
+
+    names = [place["name"] for place in gazetteer.search("ra")]
+    assert names == ["Rajahmundry, India", "Rajamahendravaram, India", "Ramagundam, India"]
+    assert [p["name"] for p in gazetteer.search("K", limit=2)] == ["Kadapa, India", "Kaikaluru, India"]
+    # Aliases of one place are listed once
+    assert gazetteer.search("Bhimavaram") == [{"name": "Bhimavaram, India", "latitude": 16.54, "longitude": 81.52}]
+    assert gazetteer.search("  ") == []
+
+
+def test_gazetteer_skips_bad_rows_and_keeps_the_first_duplicate(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,state,country,latitude,longitude\n"
+        "Springfield,Illinois,USA,39.8,-89.6\n"
+        "Springfield,Missouri,USA,37.2,-93.3\n"
+        "Nowhere,,,north,east\n"
+        ",,,1,2\n"
+        "Lonely,,,1.5,2.5\n",
+        encoding="utf-8",
+    )
+    gazetteer = Gazetteer(str(path))
+
+    assert gazetteer.lookup("Springfield") == (39.8, -89.6, "Springfield, USA")
+    assert gazetteer.lookup("Springfield Missouri") == (37.2, -93.3, "Springfield, USA")
+    assert gazetteer.lookup("Nowhere") is None
+    assert gazetteer.lookup("Lonely") == (1.5, 2.5, "Lonely")
+    assert len(gazetteer) == 3
+
+
+def test_missing_or_disabled_gazetteer_is_empty(tmp_path):
+    assert Gazetteer(None).lookup("Bhimavaram") is None
+    assert len(Gazetteer(str(tmp_path / "missing.csv"))) == 0
+
+
+def test_cache_is_lru_bounded(clock):
+    cache = GeocodeCache(path=None, max_entries=2)
+    cache.put("a", (1.0, 1.0, "A"))
+    cache.put("b", (2.0, 2.0, "B"))
+    assert cache.get("a") == (True, (1.0, 1.0, "A"))
+
+    cache.put("c", (3.0, 3.0, "C"))
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert len(cache) == 2
+
+
+def test_cache_expires_found_and_not_found_answers(clock):
+    cache = GeocodeCache(path=None, ttl_seconds=1000, negative_ttl_seconds=10)
+    cache.put("found", (1.0, 1.0, "Found"))
+    cache.put("missing", None)
+
+    assert cache.get("missing") == (True, None)
+    clock.value += 11
+    assert cache.get("missing") == (False, None)
+    assert cache.get("found") == (True, (1.0, 1.0, "Found"))
+
+    clock.value += 1000
+    assert cache.get("found") == (False, None)
+    # Expired places still answer when the API is down; "not found" answers do not
+    assert cache.get("found", allow_stale=True) == (True, (1.0, 1.0, "Found"))
+    assert cache.get("missing", allow_stale=True) == (False, None)
+    assert (cache.hits, cache.misses, cache.stale_hits) == (2, 2, 1)
+
+
+def test_not_found_answers_are_skipped_without_a_negative_ttl():
+    cache = GeocodeCache(path=None, negative_ttl_seconds=0)
+
+    cache.put("missing", None)
+    cache.put("", (1.0, 1.0, "Empty"))
+
+    assert len(cache) == 0
+
+
+def test_cache_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "state" / "geocode.json")
+    cache = GeocodeCache(path=path, max_entries=2)
+    cache.put("a", (1.0, 1.0, "A"))
+    cache.put("b", None)
+    cache.put("c", (3.0, 3.0, "C"))
+
+    assert cache.save() is True
+    assert cache.save() is False
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith(".tmp")]
+
+    reloaded = GeocodeCache(path=path, max_entries=1)
+    assert reloaded.get("c") == (True, (3.0, 3.0, "C"))
+    assert reloaded.get("b") == (False, None)
+    assert len(reloaded) == 1
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"entries": [["a", 1]]}', "[]", '{"entries": 3}'])
+def test_unreadable_cache_file_is_ignored(tmp_path, content):
+    path = tmp_path / "geocode.json"
+    path.write_text(content, encoding="utf-8")
+    cache = GeocodeCache(path=str(path))
+
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_save_if_due_waits_for_the_interval(tmp_path, clock):
+    path = tmp_path / "geocode.json"
+    cache = GeocodeCache(path=str(path), save_seconds=60)
+    cache.put("a", (1.0, 1.0, "A"))
+
+    asyncio.run(cache.save_if_due())
+    assert json.loads(path.read_text())["entries"] == [["a", clock.value, [1.0, 1.0, "A"]]]
+
+    cache.put("b", (2.0, 2.0, "B"))
+    asyncio.run(cache.save_if_due())
+    assert len(json.loads(path.read_text())["entries"]) == 1
+
+    clock.value += 60
+    asyncio.run(cache.save_if_due())
+    assert len(json.loads(path.read_text())["entries"]) == 2
+
+
+@pytest.fixture
+def geocoder(monkeypatch):
+    """resolve_location against the bundled gazetteer, a fresh cache and a mock geocoding API"""
+    api = SimpleNamespace(requests=[], down=False)
+
+    def handler(request):
+        api.requests.append(request)
+        if api.down:
+            raise httpx.ConnectError("unreachable", request=request)
+        if request.url.params["name"] == "Atlantis":
+            return httpx.Response(200, json={})
+        return httpx.Response(200, json={
+            "results": [{"name": "Hanoi", "country": "Vietnam", "latitude": 21.03, "longitude": 105.85}]
+        })
+
+    shared = WeatherHttpClient(http2=False)
+    shared._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api.cache = GeocodeCache(path=None, negative_ttl_seconds=3600)
+    monkeypatch.setattr(weather_service, "weather_http_client", shared)
+    monkeypatch.setattr(weather_service, "gazetteer", Gazetteer(BUNDLED_GAZETTEER))
+    monkeypatch.setattr(weather_service, "geocode_cache", api.cache)
+    return api
+
+
+def resolve(name):
+    return asyncio.run(LocationService.resolve_location(name))
+
+
+def test_gazetteer_places_resolve_offline(geocoder):
+    assert resolve("bhimavaram, Andhra Pradesh") == BHIMAVARAM
+    assert geocoder.requests == []
+
+
+def test_api_answers_are_cached(geocoder):
+    assert resolve("Hanoi") == (21.03, 105.85, "Hanoi, Vietnam")
+    assert resolve(" HANOI ") == (21.03, 105.85, "Hanoi, Vietnam")
+    assert resolve("Atlantis") is None
+    assert resolve("atlantis") is None
+
+    assert len(geocoder.requests) == 2
+
+
+def test_expired_answers_are_used_while_the_api_is_down(geocoder, clock):
+    resolve("Hanoi")
+    clock.value += geocoder.cache.ttl_seconds + 1
+    geocoder.down = True
+
+    assert resolve("Hanoi") == (21.03, 105.85, "Hanoi, Vietnam")
+    assert resolve("Hue") is None
+    assert geocoder.cache.stale_hits == 1
+
+
+def test_location_search_endpoint(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "gazetteer", Gazetteer(BUNDLED_GAZETTEER))
+
+    response = client.get("/weather/locations/search", params={"q": "viz", "limit": 5})
+    assert response.status_code == 200
+    assert [place["name"] for place in response.json()["results"]] == ["Vizag, India", "Vizianagaram, India"]
+
+    assert client.get("/weather/locations/search", params={"q": " "}).status_code == 400
+    assert client.get("/weather/locations/search", params={"q": "a", "limit": 51}).status_code == 400
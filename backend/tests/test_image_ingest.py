@@ -0,0 +1,66 @@
+import io
+
+from PIL import Image
+
+from conftest import image_bytes
+from image_ingest import decode_for_seed_counter, decode_image
+
+
+def exif_rotated_jpeg(size, orientation):
+    image = Image.new("RGB", size, (10, 20, 30))
+    exif = image.getexif()
+    exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def test_min_side_shrinks_shorter_side_to_target():
+    image, scale = decode_image(image_bytes(size=(2000, 1000), fmt="JPEG"), min_side=250)
+
+    assert image.size == (500, 250)
+    assert scale == 0.25
+
+
+def test_max_side_caps_longer_side():
+    image, scale = decode_image(image_bytes(size=(1600, 800)), max_side=400)
+
+    assert image.size == (400, 200)
+    assert scale == 0.25
+
+
+def test_small_images_are_never_upscaled():
+    image, scale = decode_image(image_bytes(size=(100, 50)), min_side=448)
+
+    assert image.size == (100, 50)
+    assert scale == 1.0
+
+
+def test_exif_orientation_is_applied_before_sizing():
+    # Stored landscape, displayed portrait
+    image, scale = decode_image(exif_rotated_jpeg((800, 400), orientation=6), max_side=200)
+
+    assert image.size == (100, 200)
+    assert scale == 0.25
+
+
+def test_output_is_rgb_and_timings_are_recorded():
+    buffer = io.BytesIO()
+    Image.new("L", (64, 64), 128).save(buffer, format="PNG")
+    timings = {}
+
+    image, _ = decode_image(buffer.getvalue(), max_side=32, timings=timings)
+
+    assert image.mode == "RGB"
+    assert set(timings) == {"decode", "preprocessing"}
+
+
+def test_tiled_seed_decode_keeps_more_resolution(monkeypatch):
+    import image_ingest
+
+    monkeypatch.setattr(image_ingest, "SEED_DECODE_MAX_SIDE", 100)
+    monkeypatch.setattr(image_ingest, "SEED_TILED_DECODE_MAX_SIDE", 400)
+    contents = image_bytes(size=(800, 400))
+
+    assert decode_for_seed_counter(contents)[0].size == (100, 50)
+    assert decode_for_seed_counter(contents, tiled=True)[0].size == (400, 200)
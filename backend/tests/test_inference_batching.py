@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from inference_batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=50, name="test")
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(main())
+
+    assert results == [0, 10, 20, 30, 40, 50]
+    assert [len(batch) for batch in batches] == [4, 2]
+
+
+def test_lone_request_dispatches_after_max_wait():
+    async def run_batch(items):
+        return items
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait_ms=5, name="test")
+        batcher.start()
+        try:
+            return await asyncio.wait_for(batcher.submit("x"), timeout=1)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(main()) == "x"
+
+
+def test_batch_failure_reaches_every_caller():
+    async def run_batch(items):
+        raise ValueError("model failed")
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=20, name="test")
+        batcher.start()
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_wrong_output_count_is_an_error():
+    async def run_batch(items):
+        return items[:-1]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch_size=2, max_wait_ms=20, name="test")
+        batcher.start()
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_submit_requires_running_batcher():
+    async def run_batch(items):
+        return items
+
+    batcher = MicroBatcher(run_batch, name="test")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher.submit(1))
+
+
+def test_stop_fails_queued_and_running_requests():
+    release = None
+
+    async def run_batch(items):
+        await release.wait()
+        return items
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = MicroBatcher(run_batch, max_batch_size=1, max_wait_ms=0, name="test")
+        batcher.start()
+        first = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0.01)
+        # The only batch slot is busy, so this one stays queued
+        second = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        release.set()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(main())
+
+    assert isinstance(first, RuntimeError)
+    assert isinstance(second, RuntimeError)
+
+
+def test_stop_fails_requests_of_a_batch_being_collected():
+    calls = []
+
+    async def run_batch(items):
+        calls.append(items)
+        return items
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait_ms=500, name="test")
+        batcher.start()
+        pending = asyncio.ensure_future(batcher.submit(1))
+        # The worker holds the request while it waits for the batch to fill
+        await asyncio.sleep(0.05)
+        assert batcher.queue_depth == 0
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(pending, return_exceptions=True), timeout=1)
+
+    (result,) = asyncio.run(main())
+
+    assert isinstance(result, RuntimeError)
+    assert calls == []
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from inference_executor import InferenceExecutor
+
+
+def test_per_model_limit_caps_concurrent_calls():
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work(seconds):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(seconds)
+        with lock:
+            running -= 1
+        return seconds
+
+    async def main():
+        executor = InferenceExecutor(kind="thread", workers=4, limits={"seed": 2})
+        executor.start()
+        try:
+            return await asyncio.gather(*(executor.run("seed", work, 0.02) for _ in range(6)))
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(main()) == [0.02] * 6
+    assert peak == 2
+
+
+def test_models_do_not_share_permits():
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    async def main():
+        executor = InferenceExecutor(kind="thread", workers=2, limits={"seed": 1, "classifier": 1})
+        executor.start()
+        try:
+            seed = asyncio.ensure_future(executor.run("seed", block))
+            await asyncio.to_thread(started.wait, 5)
+            # The classifier still runs while the only seed permit is held
+            result = await asyncio.wait_for(executor.run("classifier", lambda: "ok"), timeout=2)
+            assert executor.in_flight["seed"] == 1
+            release.set()
+            await seed
+            return result
+        finally:
+            release.set()
+            executor.shutdown()
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_permits_are_released_after_success_and_failure():
+    def fail():
+        raise ValueError("inference failed")
+
+    async def main():
+        executor = InferenceExecutor(kind="thread", workers=1, limits={"seed": 1})
+        executor.start()
+        try:
+            for _ in range(3):
+                with pytest.raises(ValueError):
+                    await executor.run("seed", fail)
+                assert await asyncio.wait_for(executor.run("seed", lambda: 1), timeout=2) == 1
+            return executor
+        finally:
+            executor.shutdown()
+
+    executor = asyncio.run(main())
+
+    assert executor.in_flight["seed"] == 0
+    assert executor.waiting["seed"] == 0
+    assert executor.service_time["seed"] is not None
+
+
+def test_run_requires_started_executor():
+    executor = InferenceExecutor(kind="thread", workers=1, limits={"seed": 1})
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run("seed", lambda: None))
+
+
+def test_unknown_kind_falls_back_to_threads():
+    assert InferenceExecutor(kind="gpu", limits={"seed": 1}).kind == "thread"
+
+
+def test_cancelled_callers_keep_the_permit_until_the_work_finishes():
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    async def main():
+        executor = InferenceExecutor(kind="thread", workers=2, limits={"seed": 1})
+        executor.start()
+        try:
+            caller = asyncio.ensure_future(executor.run("seed", block))
+            await asyncio.to_thread(started.wait, 5)
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+
+            # The abandoned call is still running, so it still holds the only permit
+            assert executor.in_flight["seed"] == 1
+            second = asyncio.ensure_future(executor.run("seed", lambda: "next"))
+            await asyncio.sleep(0.05)
+            assert not second.done()
+            assert executor.waiting["seed"] == 1
+
+            release.set()
+            assert await asyncio.wait_for(second, timeout=2) == "next"
+            await asyncio.sleep(0)
+            assert executor.in_flight["seed"] == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_calls_cancelled_before_starting_release_their_permit():
+    async def main():
+        executor = InferenceExecutor(kind="thread", workers=1, limits={"seed": 2})
+        executor.start()
+        blocker = threading.Event()
+        try:
+            busy = asyncio.ensure_future(executor.run("seed", blocker.wait, 5))
+            await asyncio.sleep(0.02)
+            # Queued behind the busy worker; cancelling it cancels the pool job too
+            queued = asyncio.ensure_future(executor.run("seed", lambda: "never"))
+            await asyncio.sleep(0.02)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            await asyncio.sleep(0.02)
+            assert executor.in_flight["seed"] == 1
+            blocker.set()
+            await busy
+            await asyncio.sleep(0)
+            assert executor.in_flight["seed"] == 0
+        finally:
+            blocker.set()
+            executor.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Metrics created in a test register here instead of the process-wide registry"""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    return registry
+
+
+def test_counter_renders_per_label_set(registry):
+    counter = Counter("test_total", "Things", ("kind",))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    counter.inc(kind='say "hi"')
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP test_total Things", "# TYPE test_total counter"]
+    assert 'test_total{kind="a"} 3' in lines
+    assert 'test_total{kind="say \\"hi\\""} 1' in lines
+
+
+def test_labels_must_match_declared_names(registry):
+    counter = Counter("test_total", "Things", ("kind",))
+
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+
+
+def test_duplicate_names_are_rejected(registry):
+    Counter("test_total", "Things")
+
+    with pytest.raises(ValueError):
+        Gauge("test_total", "Again")
+
+
+def test_gauge_callbacks_are_read_at_scrape_time(registry):
+    gauge = Gauge("test_depth", "Depth", ("model",))
+    depth = {"value": 1}
+    gauge.set_function(lambda: depth["value"], model="seed")
+    gauge.set(5, model="classifier")
+    gauge.dec(2, model="classifier")
+    depth["value"] = 7
+
+    text = registry.render()
+
+    assert 'test_depth{model="seed"} 7' in text
+    assert 'test_depth{model="classifier"} 3' in text
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_sum 6.05" in lines
+    assert "test_seconds_count 4" in lines
+
+
+def test_upstream_timer_records_errors(registry, monkeypatch):
+    histogram = Histogram("test_upstream_seconds", "Upstream", ("service", "call", "outcome"))
+    monkeypatch.setattr(metrics, "UPSTREAM_LATENCY", histogram)
+
+    with metrics.upstream_timer("weather", "forecast") as state:
+        state["outcome"] = "200"
+    with pytest.raises(OSError):
+        with metrics.upstream_timer("weather", "forecast"):
+            raise OSError("connection reset")
+
+    text = registry.render()
+
+    assert 'test_upstream_seconds_count{service="weather",call="forecast",outcome="200"} 1' in text
+    assert 'test_upstream_seconds_count{service="weather",call="forecast",outcome="error"} 1' in text
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE aqua_http_request_duration_seconds histogram" in response.text
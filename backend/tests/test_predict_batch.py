@@ -0,0 +1,70 @@
+import io
+import zipfile
+
+from conftest import image_bytes
+
+
+def test_batch_returns_ordered_per_image_results(client, fake_classifier):
+    files = [
+        ("files", ("healthy.png", image_bytes((0, 0, 0)), "image/png")),
+        ("files", ("notes.txt", b"not an image", "text/plain")),
+        ("files", ("red.png", image_bytes((255, 0, 0)), "image/png")),
+        ("files", ("broken.png", b"\x89PNG garbage", "image/png")),
+    ]
+
+    response = client.post("/predict/batch", files=files)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["filename"] for r in results] == ["healthy.png", "notes.txt", "red.png", "broken.png"]
+    assert [r["status"] for r in results] == ["ok", "error", "ok", "error"]
+    assert results[1]["error"] == "File must be an image"
+    assert results[3]["error"] == "Could not decode image"
+    # Both decodable images went through the classifier in one batch
+    assert fake_classifier == [2]
+
+
+def test_batch_accepts_zip_archive(client, fake_classifier):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("pond/a.png", image_bytes((0, 0, 0)))
+        archive.writestr("__MACOSX/pond/._a.png", b"resource fork")
+        archive.writestr("pond/readme.md", b"skip me")
+        archive.writestr("pond/b.jpg", image_bytes((255, 0, 0), fmt="JPEG"))
+
+    response = client.post(
+        "/predict/batch",
+        files=[("files", ("photos.zip", buffer.getvalue(), "application/zip"))]
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["filename"] for r in results] == ["pond/a.png", "pond/b.jpg"]
+    assert all(r["status"] == "ok" for r in results)
+
+
+def test_batch_rejects_invalid_zip(client, fake_classifier):
+    response = client.post(
+        "/predict/batch",
+        files=[("files", ("photos.zip", b"not a zip", "application/zip"))]
+    )
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_too_many_images(client, fake_classifier, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "BATCH_MAX_IMAGES", 2)
+    files = [("files", (f"{i}.png", image_bytes(), "image/png")) for i in range(3)]
+
+    response = client.post("/predict/batch", files=files)
+
+    assert response.status_code == 413
+
+
+def test_batch_requires_loaded_classifier(client):
+    response = client.post("/predict/batch", files=[("files", ("a.png", image_bytes(), "image/png"))])
+
+    assert response.status_code == 503
@@ -0,0 +1,86 @@
+import os
+import time
+
+from conftest import image_bytes
+from prediction_cache import PredictionCache, content_key
+
+
+def test_content_key_depends_only_on_bytes():
+    assert content_key(b"abc") == content_key(b"abc")
+    assert content_key(b"abc") != content_key(b"abd")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = PredictionCache("test", max_entries=2, disk_dir=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache("test", ttl_seconds=0.05, disk_dir=None)
+    cache.set("a", [1, 2])
+    assert cache.get("a") == [1, 2]
+
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_hit_and_miss_counters():
+    cache = PredictionCache("test", disk_dir=None)
+    cache.get("missing")
+    cache.set("a", 1)
+    cache.get("a")
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    PredictionCache("test", disk_dir=str(tmp_path)).set("a", {"label": "x"})
+
+    reloaded = PredictionCache("test", disk_dir=str(tmp_path))
+
+    assert reloaded.get("a") == {"label": "x"}
+
+
+def test_expired_and_corrupt_disk_entries_are_removed(tmp_path):
+    cache = PredictionCache("test", ttl_seconds=-1, disk_dir=str(tmp_path))
+    cache.set("old", 1)
+    with open(os.path.join(cache.disk_path, "bad.json"), "w") as f:
+        f.write("{not json")
+
+    fresh = PredictionCache("test", disk_dir=str(tmp_path))
+
+    assert fresh.get("old") is None
+    assert fresh.get("bad") is None
+    assert os.listdir(cache.disk_path) == []
+
+
+def test_disk_tier_is_pruned_to_its_bound(tmp_path, monkeypatch):
+    import prediction_cache
+
+    monkeypatch.setattr(prediction_cache, "_DISK_PRUNE_INTERVAL", 5)
+    cache = PredictionCache("test", disk_dir=str(tmp_path), disk_max_entries=3)
+    for i in range(5):
+        cache.set(str(i), i)
+
+    assert len(os.listdir(cache.disk_path)) == 3
+
+
+def test_repeat_upload_skips_the_classifier(client, fake_classifier):
+    upload = image_bytes((0, 0, 0))
+
+    first = client.post("/predict", files={"file": ("a.png", upload, "image/png")})
+    second = client.post("/predict", files={"file": ("again.png", upload, "image/png")})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert fake_classifier == [1]
@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+from PIL import Image
+
+import roboflow_client
+from roboflow_client import RoboflowClient, _parse_predictions, encode_upload
+
+
+@pytest.fixture(autouse=True)
+def configured(monkeypatch):
+    monkeypatch.setenv("ROBOFLOW_API_KEY", "test-key")
+    monkeypatch.setenv("ROBOFLOW_MODEL_ID", "fry/1")
+    monkeypatch.setenv("ROBOFLOW_BASE_URL", "https://roboflow.test/")
+
+
+def run_detect(handler, image=None, confidence=0.25, **kwargs):
+    """Call RoboflowClient.detect against a mock transport"""
+    kwargs.setdefault("backoff", 0)
+
+    async def main():
+        client = RoboflowClient(**kwargs)
+        client._ensure_client()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.detect(image or Image.new("RGB", (200, 100)), confidence)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+def test_encode_upload_downscales_and_reports_scale(monkeypatch):
+    monkeypatch.setattr(roboflow_client, "ROBOFLOW_UPLOAD_MAX_SIDE", 100)
+
+    jpeg, scale = encode_upload(Image.new("RGB", (400, 200)))
+
+    assert jpeg[:2] == b"\xff\xd8"
+    assert scale == 0.25
+
+
+def test_predictions_are_mapped_back_to_input_coordinates():
+    boxes = _parse_predictions(
+        [{"x": 10, "y": 20, "width": 4, "height": 6, "confidence": 0.8, "class": "fry", "class_id": 0}],
+        scale=0.5
+    )
+
+    assert boxes[0].tolist() == pytest.approx([16, 34, 24, 46, 0.8, 0])
+    assert _parse_predictions([], scale=1).shape == (0, 6)
+
+
+def test_detect_sends_percent_confidence_and_parses_boxes():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"predictions": [{"x": 50, "y": 50, "width": 10, "height": 10, "confidence": 0.9}]})
+
+    result = run_detect(handler, confidence=0.25)
+
+    assert str(requests[0].url).startswith("https://roboflow.test/fry/1?")
+    assert requests[0].url.params["confidence"] == "25.0"
+    assert requests[0].url.params["api_key"] == "test-key"
+    assert result["count"] == 1
+    assert result["confidence_threshold"] == 0.25
+    assert result["boxes"][0, :4].tolist() == [45, 45, 55, 55]
+
+
+@pytest.mark.parametrize("requested, applied", [(0.001, 0.01), (0.999, 0.99), (50, 0.5)])
+def test_confidence_is_clamped_to_the_api_range(requested, applied):
+    result = run_detect(lambda request: httpx.Response(200, json={"predictions": []}), confidence=requested)
+
+    assert result["confidence_threshold"] == pytest.approx(applied)
+
+
+def test_transient_failures_are_retried():
+    responses = iter([httpx.Response(503), httpx.Response(429), httpx.Response(200, json={"predictions": []})])
+
+    result = run_detect(lambda request: next(responses), max_retries=2)
+
+    assert result["count"] == 0
+
+
+def test_gives_up_after_max_retries():
+    attempts = []
+
+    def handler(request):
+        attempts.append(1)
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        run_detect(handler, max_retries=1)
+
+    assert len(attempts) == 2
+
+
+def test_client_errors_are_not_retried():
+    attempts = []
+
+    def handler(request):
+        attempts.append(1)
+        return httpx.Response(401)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_detect(handler, max_retries=3)
+
+    assert len(attempts) == 1
+
+
+def test_detect_requires_an_api_key(monkeypatch):
+    monkeypatch.setenv("ROBOFLOW_API_KEY", "")
+
+    with pytest.raises(RuntimeError):
+        run_detect(lambda request: httpx.Response(200, json={}))
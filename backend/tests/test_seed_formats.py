@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+import seed_counting
+from conftest import image_bytes
+from prediction_cache import PredictionCache
+from seed_counting import detections_to_bytes, detections_to_columns, detections_to_objects
+from seed_routing import LOCAL
+
+BOXES = np.array([
+    [1.234, 2.0, 11.5, 12.25, 0.87654, 0],
+    [20.0, 30.0, 40.0, 50.0, 0.5, 1],
+], dtype=np.float32)
+
+
+class StaticRouter:
+    def choose(self, tiled):
+        return LOCAL, "test"
+
+    async def detect(self, image, confidence, tiled):
+        return {"boxes": BOXES.copy(), "backend": LOCAL}
+
+
+@pytest.fixture
+def seed_model(monkeypatch):
+    monkeypatch.setattr(seed_counting, "seed_router", StaticRouter())
+    monkeypatch.setattr(seed_counting, "seed_cache", PredictionCache("seed", disk_dir=None))
+
+
+def test_object_format():
+    objects = detections_to_objects(BOXES)
+
+    assert objects[0] == {"bbox": [1.23, 2.0, 11.5, 12.25], "confidence": 0.8765, "class_id": 0}
+    assert objects[1]["class_id"] == 1
+
+
+def test_columnar_format():
+    columns = detections_to_columns(BOXES)
+
+    assert list(columns) == ["x1", "y1", "x2", "y2", "confidence", "class_id"]
+    assert columns["x1"] == [1.23, 20.0]
+    assert columns["confidence"] == [0.8765, 0.5]
+    assert columns["class_id"] == [0, 1]
+
+
+def test_binary_format_round_trips():
+    decoded = np.frombuffer(detections_to_bytes(BOXES), dtype="<f4").reshape(-1, 6)
+
+    np.testing.assert_array_equal(decoded, BOXES)
+
+
+def test_empty_detections_in_every_format():
+    empty = np.empty((0, 6), dtype=np.float32)
+
+    assert detections_to_objects(empty) == []
+    assert detections_to_columns(empty)["x1"] == []
+    assert detections_to_bytes(empty) == b""
+
+
+@pytest.mark.parametrize("format, key", [("objects", list), ("columnar", dict)])
+def test_seed_count_json_formats(client, seed_model, format, key):
+    response = client.post(
+        "/seed-count",
+        files={"file": ("tray.png", image_bytes(), "image/png")},
+        data={"confidence": "0.3", "format": format}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert isinstance(body["detections"], key)
+
+
+def test_seed_count_only_format(client, seed_model):
+    response = client.post(
+        "/seed-count",
+        files={"file": ("tray.png", image_bytes(), "image/png")},
+        data={"confidence": "0.6", "format": "count"}
+    )
+
+    assert response.json() == {"count": 1, "confidence_threshold": 0.6}
+
+
+def test_seed_count_binary_format(client, seed_model):
+    response = client.post(
+        "/seed-count",
+        files={"file": ("tray.png", image_bytes(), "image/png")},
+        data={"confidence": "0.3", "format": "binary"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-seed-count"] == "2"
+    assert response.headers["x-detection-columns"] == "x1,y1,x2,y2,confidence,class_id"
+    assert len(response.content) == 2 * 6 * 4
+
+
+def test_unknown_format_is_rejected(client, seed_model):
+    response = client.post(
+        "/seed-count",
+        files={"file": ("tray.png", image_bytes(), "image/png")},
+        data={"format": "xml"}
+    )
+
+    assert response.status_code == 400
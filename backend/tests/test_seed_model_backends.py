@@ -0,0 +1,168 @@
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+import seed_model_backends
+from conftest import FakeYolo
+from seed_model_backends import (
+    ONNX,
+    ONNX_INT8,
+    OPENVINO,
+    PYTORCH,
+    export_seed_model,
+    load_validated_seed_model,
+    validate_seed_model,
+)
+
+
+def fry_model(per_image):
+    """Model finding ``per_image`` fry on every image"""
+    return FakeYolo(lambda image: [[i, i, i + 1, i + 1, 0.9, 0] for i in range(per_image)])
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Fake build_seed_model: 100 fry per image for .pt, ``counts[format]`` for exports"""
+    counts = {ONNX: 100, OPENVINO: 90}
+    built = []
+
+    def build(checkpoint, model_format=PYTORCH):
+        built.append(model_format)
+        model = fry_model(100 if model_format == PYTORCH else counts[model_format])
+        model.format = model_format
+        return model
+
+    monkeypatch.setattr(seed_model_backends, "build_seed_model", build)
+    return built
+
+
+@pytest.fixture
+def trays(tmp_path, monkeypatch):
+    directory = tmp_path / "trays"
+    directory.mkdir()
+    for i in range(3):
+        Image.new("RGB", (8, 8)).save(directory / f"{i}.jpg")
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_VALIDATION_DIR", str(directory))
+    return directory
+
+
+def test_artifacts_live_next_to_the_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_EXPORT_DIR", None)
+    checkpoint = str(tmp_path / "fry.pt")
+
+    assert seed_model_backends._artifact_path(checkpoint, ONNX) == str(tmp_path / "fry.onnx")
+    assert seed_model_backends._artifact_path(checkpoint, ONNX_INT8) == str(tmp_path / "fry_int8.onnx")
+    assert seed_model_backends._artifact_path(checkpoint, OPENVINO) == str(tmp_path / "fry_openvino_model")
+
+
+def test_fresh_export_is_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_EXPORT_DIR", None)
+    checkpoint = tmp_path / "fry.pt"
+    checkpoint.write_bytes(b"weights")
+    artifact = tmp_path / "fry.onnx"
+    artifact.write_bytes(b"graph")
+    os.utime(artifact, (os.path.getmtime(checkpoint) + 10,) * 2)
+
+    assert export_seed_model(str(checkpoint), ONNX) == str(artifact)
+
+
+def test_pytorch_is_not_an_export_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_seed_model(str(tmp_path / "fry.pt"), PYTORCH)
+
+
+def test_parity_report_measures_relative_count_deviation():
+    images = [Image.new("RGB", (8, 8))] * 2
+
+    report = validate_seed_model(fry_model(98), fry_model(100), images, confidence=0.25)
+
+    assert report["max_count_deviation"] == 0.02
+    assert report["reference_counts"] == [100, 100]
+    assert report["candidate_counts"] == [98, 98]
+
+
+def test_deviating_images_use_the_given_threshold():
+    images = [Image.new("RGB", (8, 8))] * 2
+
+    loose = validate_seed_model(fry_model(98), fry_model(100), images, confidence=0.25, max_deviation=0.05)
+    strict = validate_seed_model(fry_model(98), fry_model(100), images, confidence=0.25, max_deviation=0.01)
+
+    assert loose["deviating"] == []
+    assert strict["deviating"] == [0, 1]
+
+
+@pytest.mark.parametrize("max_deviation, verdict, deviating", [("0.05", "PASS", "[]"), ("0.01", "FAIL", "[0, 1, 2]")])
+def test_cli_report_follows_max_deviation(trays, monkeypatch, capsys, max_deviation, verdict, deviating):
+    monkeypatch.setattr(
+        seed_model_backends, "build_seed_model",
+        lambda checkpoint, model_format=PYTORCH: fry_model(100 if model_format == PYTORCH else 98),
+    )
+    monkeypatch.setattr(sys, "argv", [
+        "seed_model_backends.py", "--format", ONNX, "--model", "fry.pt",
+        "--images", str(trays), "--max-deviation", max_deviation,
+    ])
+
+    exit_code = seed_model_backends.main()
+
+    output = capsys.readouterr().out.splitlines()
+    assert f"deviating: {deviating}" in output
+    assert output[-1] == verdict
+    assert exit_code == (0 if verdict == "PASS" else 1)
+
+
+def test_matching_export_is_served(builds, trays):
+    model, model_format = load_validated_seed_model("fry.pt", ONNX)
+
+    assert model_format == ONNX
+    assert model.format == ONNX
+
+
+def test_deviating_export_falls_back_to_pytorch(builds, trays):
+    model, model_format = load_validated_seed_model("fry.pt", OPENVINO)
+
+    assert model_format == PYTORCH
+    assert model.format == PYTORCH
+
+
+@pytest.mark.parametrize("make_dir", ["missing", "empty"])
+def test_unusable_reference_set_falls_back_to_pytorch(builds, tmp_path, monkeypatch, make_dir):
+    directory = tmp_path / "trays"
+    if make_dir == "empty":
+        directory.mkdir()
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_VALIDATION_DIR", str(directory))
+
+    assert load_validated_seed_model("fry.pt", ONNX)[1] == PYTORCH
+
+
+def test_validation_is_required_by_default(builds, monkeypatch):
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_VALIDATION_DIR", None)
+
+    assert load_validated_seed_model("fry.pt", ONNX)[1] == PYTORCH
+
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_REQUIRE_VALIDATION", False)
+
+    assert load_validated_seed_model("fry.pt", ONNX)[1] == ONNX
+
+
+def test_unvalidated_build_failure_falls_back_to_pytorch(builds, monkeypatch):
+    def build(checkpoint, model_format=PYTORCH):
+        if model_format != PYTORCH:
+            raise ImportError("onnxruntime is not installed")
+        return fry_model(100)
+
+    monkeypatch.setattr(seed_model_backends, "build_seed_model", build)
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_VALIDATION_DIR", None)
+    monkeypatch.setattr(seed_model_backends, "SEED_MODEL_REQUIRE_VALIDATION", False)
+
+    assert load_validated_seed_model("fry.pt", ONNX)[1] == PYTORCH
+
+
+def test_exported_artifacts_are_served_as_is(builds):
+    assert load_validated_seed_model("fry.onnx", PYTORCH)[1] == ONNX
+    assert load_validated_seed_model("fry_openvino_model", PYTORCH)[1] == OPENVINO
+
+
+def test_unknown_format_uses_pytorch(builds):
+    assert load_validated_seed_model("fry.pt", "tensorrt")[1] == PYTORCH
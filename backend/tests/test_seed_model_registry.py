@@ -0,0 +1,151 @@
+import time
+
+import pytest
+
+import seed_model_registry as registry_module
+from conftest import FakeYolo
+from seed_model_registry import SeedModelRegistry
+
+
+class LoadableYolo(FakeYolo):
+    def __init__(self, path):
+        super().__init__(lambda image: [])
+        self.path = path
+        self.fused = False
+
+    def fuse(self):
+        self.fused = True
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """Loads weights files as LoadableYolo instances and records each load"""
+    loaded = []
+
+    def load_validated_seed_model(path):
+        model = LoadableYolo(path)
+        loaded.append(model)
+        return model, registry_module.PYTORCH
+
+    monkeypatch.setattr(registry_module, "YOLO", object())
+    monkeypatch.setattr(registry_module, "load_validated_seed_model", load_validated_seed_model)
+    monkeypatch.setattr(registry_module, "SEED_MODEL_WARMUP_BATCH", 2)
+    monkeypatch.setattr(registry_module, "SEED_MODEL_WARMUP_IMGSZ", 32)
+    return loaded
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "seed.pt"
+    path.write_bytes(b"weights v1")
+    return path
+
+
+def test_load_fuses_and_warms_up_before_activating(loader, weights):
+    registry = SeedModelRegistry(str(weights))
+
+    active = registry.load()
+
+    model = loader[0]
+    assert registry.get() is model
+    assert model.fused
+    assert model.calls == [(2, 0.25, 32)]
+    assert active.version == registry.stats()["version"]
+
+
+def test_unchanged_file_is_not_reloaded(loader, weights):
+    registry = SeedModelRegistry(str(weights))
+    first = registry.load()
+
+    again = registry.load(force=True)
+
+    assert again is first
+    assert len(loader) == 1
+
+
+def test_changed_file_is_swapped_in(loader, weights):
+    registry = SeedModelRegistry(str(weights))
+    old = registry.load()
+    old_model = registry.get()
+    weights.write_bytes(b"weights v2")
+
+    new = registry.load(force=True)
+
+    assert new.version != old.version
+    assert registry.get() is loader[1]
+    # Holders of the previous model keep a working reference
+    assert old_model is loader[0]
+
+
+def test_missing_file_is_an_error(loader, tmp_path):
+    registry = SeedModelRegistry(str(tmp_path / "missing.pt"))
+
+    with pytest.raises(FileNotFoundError):
+        registry.get()
+
+
+def test_background_load_reports_failures(loader, tmp_path):
+    registry = SeedModelRegistry(str(tmp_path / "missing.pt"))
+
+    assert registry.load_in_background()
+    registry._loader.join(5)
+
+    assert registry.active is None
+    assert "not found" in registry.last_error
+
+
+def test_watcher_reloads_a_changed_file(loader, weights):
+    registry = SeedModelRegistry(str(weights))
+    registry.load()
+    try:
+        registry.watch(interval=0.01)
+        weights.write_bytes(b"weights v2")
+        deadline = time.time() + 5
+        while len(loader) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop_watching()
+
+    assert len(loader) == 2
+
+
+@pytest.fixture
+def reload_endpoint(client, loader, weights, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "SEED_MODEL_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "SEED_MODEL_DIR", str(weights.parent))
+    monkeypatch.setattr(main, "seed_model_registry", SeedModelRegistry(str(weights)))
+    return main.seed_model_registry
+
+
+def test_reload_is_hidden_without_a_token(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "SEED_MODEL_ADMIN_TOKEN", "")
+
+    assert client.post("/seed-count/model/reload").status_code == 404
+
+
+def test_reload_requires_the_admin_token(client, reload_endpoint):
+    assert client.post("/seed-count/model/reload").status_code == 403
+    assert client.post("/seed-count/model/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+@pytest.mark.parametrize("path", ["../outside.pt", "/etc/passwd"])
+def test_reload_rejects_paths_outside_the_model_dir(client, reload_endpoint, path):
+    response = client.post("/seed-count/model/reload", data={"path": path}, headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 400
+
+
+def test_reload_loads_a_model_from_the_model_dir(client, reload_endpoint, weights):
+    other = weights.parent / "seed_v2.pt"
+    other.write_bytes(b"weights v2")
+
+    response = client.post("/seed-count/model/reload", data={"path": "seed_v2.pt"}, headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 202
+    assert response.json()["path"] == str(other)
+    reload_endpoint._loader.join(5)
+    assert reload_endpoint.active.path == str(other)
@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import seed_counting
+from prediction_cache import PredictionCache
+from seed_routing import LOCAL, REMOTE
+
+CONFIDENCES = [0.95, 0.7, 0.4, 0.2, 0.08, 0.03, 0.012]
+
+
+class FakeRouter:
+    """Returns one box per confidence in CONFIDENCES at or above the requested floor"""
+
+    def __init__(self, backend=LOCAL, remote_floor=None):
+        self.backend = backend
+        self.remote_floor = remote_floor
+        self.calls = []
+
+    def choose(self, tiled):
+        return self.backend, "test"
+
+    async def detect(self, image, confidence, tiled):
+        self.calls.append(confidence)
+        floor = max(confidence, self.remote_floor or 0)
+        rows = [[i, i, i + 5, i + 5, c, 0] for i, c in enumerate(CONFIDENCES) if c >= floor]
+        result = {"boxes": np.array(rows, dtype=np.float32).reshape(-1, 6), "backend": self.backend}
+        if self.remote_floor is not None:
+            result["floor"] = floor
+        return result
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = FakeRouter()
+    monkeypatch.setattr(seed_counting, "seed_router", router)
+    monkeypatch.setattr(seed_counting, "seed_cache", PredictionCache("seed", disk_dir=None))
+    monkeypatch.setattr(seed_counting, "SEED_CONFIDENCE_FLOOR", 0.01)
+    monkeypatch.setattr(seed_counting.seed_model_registry, "_active", None)
+    return router
+
+
+def count(confidence, **kwargs):
+    kwargs.setdefault("image", Image.new("RGB", (8, 8)))
+    kwargs.setdefault("cache_key", "upload")
+    return asyncio.run(seed_counting.predict_seed_count(confidence=confidence, tiled=False, **kwargs))
+
+
+def test_threshold_changes_reuse_one_inference(router):
+    results = [count(c) for c in (0.5, 0.1, 0.05, 0.9)]
+
+    assert [r["count"] for r in results] == [2, 4, 5, 1]
+    assert router.calls == [0.01]
+
+
+def test_boxes_are_the_ones_above_the_threshold(router):
+    result = count(0.3)
+
+    assert result["boxes"][:, 4].tolist() == pytest.approx([0.95, 0.7, 0.4])
+
+
+def test_cache_miss_loads_the_image_only_once(router):
+    loads = []
+
+    async def load_image():
+        loads.append(1)
+        return Image.new("RGB", (8, 8)), 0.5
+
+    first = count(0.5, image=None, load_image=load_image)
+    second = count(0.1, image=None, load_image=load_image)
+
+    assert len(loads) == 1
+    # Boxes are stored in original-photo coordinates
+    assert first["boxes"][0, :4].tolist() == [0, 0, 10, 10]
+    assert second["count"] == 4
+
+
+def test_without_cache_key_every_request_runs_inference(router):
+    count(0.5, cache_key=None)
+    count(0.5, cache_key=None)
+
+    assert len(router.calls) == 2
+
+
+def test_sweep_counts_every_threshold_from_one_inference(router):
+    count(0.5)
+
+    sweep = asyncio.run(seed_counting.sweep_seed_count(
+        image=Image.new("RGB", (8, 8)), thresholds=[0.9, 0.05, 0.3], cache_key="upload", tiled=False
+    ))
+
+    assert sweep["thresholds"] == [0.05, 0.3, 0.9]
+    assert sweep["counts"] == [5, 3, 1]
+    assert router.calls == [0.01]
+
+
+def test_remote_floor_is_reported_and_reused(router, monkeypatch):
+    monkeypatch.setattr(seed_counting, "ROBOFLOW_MIN_CONFIDENCE", 0.05)
+    router.backend = REMOTE
+    router.remote_floor = 0.05
+
+    low = count(0.02)
+    high = count(0.3)
+
+    assert low["confidence_threshold"] == 0.05
+    assert low["count"] == 5
+    assert high["count"] == 3
+    assert len(router.calls) == 1
+
+
+def test_backend_and_model_are_part_of_the_key(router, monkeypatch):
+    count(0.5)
+    router.backend = REMOTE
+    count(0.5)
+    assert len(router.calls) == 2
+
+    router.backend = LOCAL
+    monkeypatch.setattr(
+        seed_counting.seed_model_registry, "_active", SimpleNamespace(version="abc123", format="onnx")
+    )
+    count(0.5)
+    count(0.2)
+
+    assert len(router.calls) == 3
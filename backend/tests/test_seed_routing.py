@@ -0,0 +1,146 @@
+import asyncio
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import seed_routing
+from inference_executor import inference_executor
+from seed_routing import LOCAL, REMOTE, SeedBackendRouter
+
+
+class FakeRemote:
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+
+    async def detect(self, image, confidence):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("HTTP 503")
+        return {"boxes": np.zeros((2, 6), dtype=np.float32), "confidence_threshold": max(confidence, 0.01)}
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    remote = FakeRemote()
+    monkeypatch.setenv("ROBOFLOW_API_KEY", "test-key")
+    monkeypatch.setattr(seed_routing, "roboflow_client", remote)
+    monkeypatch.setitem(inference_executor.waiting, "seed", 0)
+    monkeypatch.setitem(inference_executor.service_time, "seed", None)
+    return remote
+
+
+def make_router(available=True, ready=True, mode="auto"):
+    local_calls = []
+
+    async def local_detect(image, confidence, tiled):
+        local_calls.append(confidence)
+        return {"boxes": np.zeros((1, 6), dtype=np.float32)}
+
+    router = SeedBackendRouter(local_detect, lambda: available, lambda: ready, mode=mode)
+    router.local_calls = local_calls
+    return router
+
+
+def detect(router, tiled=False):
+    return asyncio.run(router.detect(Image.new("RGB", (8, 8)), 0.05, tiled))
+
+
+def test_local_is_preferred_when_it_has_capacity(remote):
+    assert make_router().choose(tiled=False) == (LOCAL, "local_capacity")
+
+
+def test_availability_decides_first(remote, monkeypatch):
+    assert make_router(available=False).choose(tiled=False) == (REMOTE, "no_local_model")
+
+    monkeypatch.setenv("ROBOFLOW_API_KEY", "")
+
+    assert make_router().choose(tiled=False) == (LOCAL, "no_remote")
+
+
+def test_tiled_requests_stay_local(remote):
+    assert make_router(ready=False).choose(tiled=True) == (LOCAL, "tiled")
+
+
+def test_requests_overflow_while_the_local_model_loads(remote):
+    assert make_router(ready=False).choose(tiled=False) == (REMOTE, "local_loading")
+
+
+@pytest.mark.parametrize("mode", [LOCAL, REMOTE])
+def test_pinned_mode_holds_while_the_model_loads(remote, mode):
+    assert make_router(ready=False, mode=mode).choose(tiled=False) == (mode, "pinned")
+
+
+def test_queue_depth_overflows_to_remote(remote, monkeypatch):
+    monkeypatch.setattr(seed_routing, "SEED_ROUTE_MAX_LOCAL_QUEUE", 2)
+    monkeypatch.setitem(inference_executor.waiting, "seed", 2)
+
+    assert make_router().choose(tiled=False) == (REMOTE, "overflow")
+
+
+def test_slow_local_queue_overflows_to_a_faster_remote(remote, monkeypatch):
+    monkeypatch.setattr(seed_routing, "SEED_ROUTE_MAX_LOCAL_QUEUE", 10)
+    monkeypatch.setitem(inference_executor.waiting, "seed", 1)
+    monkeypatch.setitem(inference_executor.service_time, "seed", 2.0)
+    router = make_router()
+    router.remote_latency = 5.0
+
+    assert router.choose(tiled=False) == (LOCAL, "local_capacity")
+
+    router.remote_latency = 1.0
+
+    assert router.choose(tiled=False) == (REMOTE, "overflow")
+
+
+def test_remote_result_reports_its_floor(remote):
+    result = detect(make_router(available=False))
+
+    assert result["backend"] == REMOTE
+    assert result["floor"] == 0.05
+    assert len(result["boxes"]) == 2
+
+
+def test_remote_failure_falls_back_to_local(remote):
+    remote.fail = True
+    router = make_router(ready=False)
+
+    result = detect(router)
+
+    assert result["backend"] == LOCAL
+    assert router.local_calls == [0.05]
+
+
+def test_slow_remote_falls_back_to_local(remote, monkeypatch):
+    monkeypatch.setattr(seed_routing, "SEED_ROUTE_REMOTE_TIMEOUT_SECONDS", 0.01)
+    remote.delay = 1.0
+
+    assert detect(make_router(ready=False))["backend"] == LOCAL
+
+
+def test_remote_failure_without_local_model_is_raised(remote):
+    remote.fail = True
+
+    with pytest.raises(RuntimeError):
+        detect(make_router(available=False))
+
+
+def test_repeated_remote_failures_start_a_cooldown(remote, monkeypatch):
+    monkeypatch.setattr(seed_routing, "SEED_ROUTE_REMOTE_MAX_FAILURES", 2)
+    remote.fail = True
+    router = make_router(ready=False)
+
+    detect(router)
+    detect(router)
+    detect(router)
+
+    assert remote.calls == 2
+    assert router.choose(tiled=False) == (LOCAL, "remote_cooldown")
+    assert router.stats()["remote_unavailable_reason"] == "remote_cooldown"
+
+
+def test_unknown_mode_falls_back_to_auto():
+    assert make_router(mode="gpu").mode == "auto"
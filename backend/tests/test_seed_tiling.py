@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import seed_counting
+from conftest import FakeYolo
+from seed_counting import _merge_tile_detections, _tile_image, _tile_origins
+
+
+@pytest.fixture
+def small_tiles(monkeypatch):
+    monkeypatch.setattr(seed_counting, "SEED_TILE_SIZE", 100)
+    monkeypatch.setattr(seed_counting, "SEED_TILE_OVERLAP", 0.2)
+
+
+def test_tile_origins_cover_the_far_edge():
+    assert _tile_origins(1000, 640, 512) == [0, 360]
+    assert _tile_origins(1200, 640, 512) == [0, 512, 560]
+    assert _tile_origins(500, 640, 512) == [0]
+
+
+def test_tiles_overlap_and_cover_the_image(small_tiles):
+    tiles, offsets = _tile_image(Image.new("RGB", (250, 180)))
+
+    assert offsets == [(0, 0), (80, 0), (150, 0), (0, 80), (80, 80), (150, 80)]
+    assert all(tile.size == (100, 100) for tile in tiles)
+
+
+def test_image_smaller_than_a_tile_is_one_tile(small_tiles):
+    tiles, offsets = _tile_image(Image.new("RGB", (60, 40)))
+
+    assert offsets == [(0, 0)]
+    assert tiles[0].size == (60, 40)
+
+
+def test_merge_drops_partial_box_inside_a_full_box():
+    detections = np.array([
+        [10, 10, 30, 30, 0.9, 0],   # full fry from one tile
+        [20, 10, 30, 30, 0.6, 0],   # same fry cut by the neighbouring tile's edge
+        [50, 50, 70, 70, 0.8, 0],   # separate fry
+    ], dtype=np.float32)
+
+    merged = _merge_tile_detections(detections, threshold=0.5)
+
+    assert merged[:, 4].tolist() == pytest.approx([0.9, 0.8])
+
+
+def test_merge_keeps_overlapping_boxes_of_different_classes():
+    detections = np.array([
+        [10, 10, 30, 30, 0.9, 0],
+        [10, 10, 30, 30, 0.7, 1],
+    ], dtype=np.float32)
+
+    assert len(_merge_tile_detections(detections, threshold=0.5)) == 2
+
+
+def test_merge_handles_empty_input():
+    empty = np.empty((0, 6), dtype=np.float32)
+
+    assert _merge_tile_detections(empty, threshold=0.5).shape == (0, 6)
+
+
+def test_tiled_counting_maps_boxes_to_full_image(small_tiles, executor, monkeypatch):
+    # A fry at the same place in every tile: 10..20 px from the tile's corner
+    model = FakeYolo(lambda tile: [[10, 10, 20, 20, 0.9, 0]])
+    monkeypatch.setattr(seed_counting, "get_seed_model", lambda: model)
+    monkeypatch.setattr(seed_counting, "SEED_TILE_BATCH_SIZE", 4)
+
+    boxes, tiles = asyncio.run(seed_counting._run_local_model_tiled(Image.new("RGB", (250, 180)), 0.1))
+
+    assert tiles == 6
+    assert [n for n, _, _ in model.calls] == [4, 2]
+    assert all(imgsz == 100 for _, _, imgsz in model.calls)
+    assert sorted(map(tuple, boxes[:, :2].tolist())) == [
+        (10, 10), (10, 90), (90, 10), (90, 90), (160, 10), (160, 90)
+    ]
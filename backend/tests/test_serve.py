@@ -0,0 +1,59 @@
+import os
+import socket
+
+import pytest
+
+import serve
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_memory_usage_reads_proc():
+    usage = serve.memory_usage()
+
+    assert usage["rss_mb"] > 0
+    assert usage["pss_mb"] > 0
+
+
+def test_memory_usage_of_missing_process_is_empty():
+    assert serve.memory_usage(pid=2 ** 30) == {}
+
+
+def test_bound_socket_is_inherited_by_workers():
+    sock = serve._bind_socket("127.0.0.1", 0)
+    try:
+        assert sock.get_inheritable()
+        assert sock.type == socket.SOCK_STREAM
+    finally:
+        sock.close()
+
+
+def test_preload_loads_every_model_in_the_parent(monkeypatch, tmp_path):
+    import inference_executor
+    from seed_model_registry import seed_model_registry
+
+    calls = []
+    model_path = tmp_path / "seed.pt"
+    model_path.write_bytes(b"weights")
+    monkeypatch.setattr(inference_executor, "load_classifier", lambda: calls.append("classifier") or "eager")
+    monkeypatch.setattr(seed_model_registry, "path", str(model_path))
+    monkeypatch.setattr(seed_model_registry, "load", lambda: calls.append("seed"))
+
+    serve.preload_models()
+
+    assert calls == ["classifier", "seed"]
+
+
+def test_preload_survives_seed_model_failure(monkeypatch, tmp_path):
+    import inference_executor
+    from seed_model_registry import seed_model_registry
+
+    def broken():
+        raise RuntimeError("bad weights")
+
+    model_path = tmp_path / "seed.pt"
+    model_path.write_bytes(b"weights")
+    monkeypatch.setattr(inference_executor, "load_classifier", lambda: None)
+    monkeypatch.setattr(seed_model_registry, "path", str(model_path))
+    monkeypatch.setattr(seed_model_registry, "load", broken)
+
+    serve.preload_models()
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pytest
+
+from temperature_monitoring import (
+    SPECIES_TEMPERATURE_RANGES,
+    TemperatureRiskAssessor,
+    create_assessment_response,
+    create_batch_assessment_response,
+)
+
+SPECIES = ["Tilapia", "Salmon", "Generic", "Unknown fish"]
+TEMPERATURES = [-2.0, 5.0, 9.5, 14.0, 17.0, 20.5, 24.0, 26.0, 29.9, 33.0, 40.0]
+
+
+def test_batch_matches_single_assessments():
+    temperatures = [t for t in TEMPERATURES for _ in SPECIES]
+    species = SPECIES * len(TEMPERATURES)
+    previous = [t + (3 if i % 3 == 0 else 1) if i % 5 else None for i, t in enumerate(temperatures)]
+
+    batch = create_batch_assessment_response(
+        TemperatureRiskAssessor.classify_batch(temperatures, species, previous)
+    )
+
+    for i, result in enumerate(batch["results"]):
+        single = create_assessment_response(
+            TemperatureRiskAssessor.classify_risk(temperatures[i], species[i], previous[i])
+        )
+        condition = batch["conditions"][result["condition"]]
+        assert result["risk_level"] == single["risk_level"]
+        assert result["urgency_score"] == single["urgency_score"]
+        assert result["safe_range"] == single["safe_range"]
+        assert result["temperature_change"] == single["temperature_change"]
+        assert condition["recommended_actions"] == [
+            a for a in single["recommended_actions"] if a != batch["rapid_change"]["recommended_action"]
+        ]
+
+
+def test_batch_safe_ranges_keep_configured_types():
+    batch = create_batch_assessment_response(TemperatureRiskAssessor.classify_batch([26.0], "Tilapia"))
+
+    safe_range = batch["results"][0]["safe_range"]
+    assert safe_range == {"min": 25, "max": 32}
+    assert json.dumps(safe_range) == json.dumps(
+        {"min": SPECIES_TEMPERATURE_RANGES["Tilapia"]["min"], "max": SPECIES_TEMPERATURE_RANGES["Tilapia"]["max"]}
+    )
+
+
+def test_conditions_are_listed_once():
+    batch = create_batch_assessment_response(
+        TemperatureRiskAssessor.classify_batch([28.0, 28.5, 29.0, 40.0], "Tilapia")
+    )
+
+    assert batch["count"] == 4
+    assert sorted(batch["conditions"]) == sorted({r["condition"] for r in batch["results"]})
+
+
+def test_mismatched_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        TemperatureRiskAssessor.classify_batch([20.0, 21.0], ["Carp"])
+    with pytest.raises(ValueError):
+        TemperatureRiskAssessor.classify_batch([20.0, 21.0], "Carp", [19.0])
+
+
+def test_pond_readings_use_the_history_rate(history):
+    batch = TemperatureRiskAssessor.classify_batch(
+        [24.0, 27.0, 22.0],
+        "Carp",
+        pond_ids=["pond-1", "pond-1", None],
+        timestamps=[0, 1800, None],
+    )
+
+    assert np.isnan(batch.rate_per_hour[0])
+    assert batch.rate_per_hour[1] == pytest.approx(6.0)
+    assert batch.rapid_change.tolist() == [False, True, False]
+    assert len(history.get("pond-1")) == 2
+
+
+def test_batch_endpoint(client, history):
+    response = client.post("/temperature/assess-risk/batch", json={
+        "temperatures": [26.0, 45.0],
+        "species": ["Tilapia", "Carp"],
+        "previous_temperatures": [22.0, None],
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["rapid_change"] for r in results] == [True, False]
+    assert results[1]["risk_level"] == "high_risk"
+
+
+def test_batch_endpoint_validates_input(client, history, monkeypatch):
+    import main
+
+    assert client.post("/temperature/assess-risk/batch", json={"temperatures": [20.0, 99.0]}).status_code == 400
+
+    monkeypatch.setattr(main, "TEMPERATURE_BATCH_MAX_READINGS", 1)
+
+    assert client.post("/temperature/assess-risk/batch", json={"temperatures": [20.0, 21.0]}).status_code == 413
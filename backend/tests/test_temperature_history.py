@@ -0,0 +1,150 @@
+import asyncio
+import random
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from temperature_history import PondHistory, TemperatureHistoryStore, to_epoch_seconds
+
+
+def test_timestamps_accept_epoch_iso_and_datetime():
+    moment = datetime(2024, 5, 1, 6, 30, tzinfo=timezone.utc)
+
+    assert to_epoch_seconds(moment.timestamp()) == moment.timestamp()
+    assert to_epoch_seconds("2024-05-01T06:30:00Z") == moment.timestamp()
+    assert to_epoch_seconds(moment) == moment.timestamp()
+    with pytest.raises(ValueError):
+        to_epoch_seconds("yesterday")
+
+
+def test_rolling_stats_match_a_recomputation_over_the_window():
+    rng = random.Random(7)
+    history = PondHistory(capacity=16)
+    values = []
+    for i in range(100):
+        value = round(rng.uniform(15, 35), 1)
+        history.append(value, i * 60.0)
+        values.append(value)
+
+        window = np.array(values[-16:], dtype=np.float32)
+        stats = history.stats()
+        assert stats["readings"] == len(window)
+        assert stats["min"] == round(float(window.min()), 2)
+        assert stats["max"] == round(float(window.max()), 2)
+        assert stats["mean"] == pytest.approx(float(window.mean()), abs=0.01)
+
+
+def test_series_is_oldest_first_after_wraparound():
+    history = PondHistory(capacity=4)
+    for i in range(6):
+        history.append(20 + i, float(i))
+
+    timestamps, values = history.series()
+
+    assert timestamps.tolist() == [2, 3, 4, 5]
+    assert values.tolist() == [22, 23, 24, 25]
+
+
+def test_rate_uses_the_oldest_reading_in_the_rate_window():
+    history = PondHistory(rate_window_seconds=3600, rate_min_span_seconds=300)
+    history.append(20.0, 0)
+    history.append(21.0, 1800)
+    history.append(23.0, 3600)
+    assert history.rate_per_hour() == pytest.approx(3.0)
+
+    history.append(24.0, 5400)
+
+    # 0 s dropped out of the hour; 1800 s is now the oldest
+    assert history.rate_per_hour() == pytest.approx(3.0)
+
+
+def test_rate_needs_a_minimum_span():
+    history = PondHistory(rate_min_span_seconds=300)
+    history.append(20.0, 0)
+    assert history.rate_per_hour() is None
+
+    history.append(25.0, 60)
+
+    assert history.rate_per_hour() is None
+
+
+def test_rate_across_a_long_gap_uses_the_previous_reading():
+    history = PondHistory(rate_window_seconds=3600, rate_min_span_seconds=300)
+    history.append(20.0, 0)
+    history.append(26.0, 3 * 3600)
+
+    assert history.rate_per_hour() == pytest.approx(2.0)
+
+
+def test_out_of_order_readings_are_ignored():
+    history = PondHistory()
+    history.append(20.0, 100)
+
+    assert history.append(30.0, 50) is False
+    assert history.latest == (100, 20.0)
+
+
+def test_store_evicts_least_recently_updated_ponds():
+    store = TemperatureHistoryStore(window=8, max_ponds=2, store=None)
+    store.record("a", 20, 0)
+    store.record("b", 20, 0)
+    store.record("a", 21, 60)
+    store.record("c", 20, 0)
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert len(store) == 2
+
+
+class FakeDurableStore:
+    enabled = True
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.added = []
+        self.fetched = []
+
+    def recent(self, pond_id, limit):
+        self.fetched.append(pond_id)
+        self.thread = threading.current_thread()
+        return self.rows.get(pond_id, [])[-limit:]
+
+    def add(self, pond_id, timestamp, temperature):
+        self.added.append((pond_id, timestamp, temperature))
+
+
+def test_preloaded_readings_refill_a_new_pond():
+    durable = FakeDurableStore({"a": [(0.0, 20.0), (1800.0, 21.0)]})
+    store = TemperatureHistoryStore(window=8, store=durable)
+
+    store.preload(["a", "a", None])
+    history = store.record("a", 23.0, 3600)
+
+    assert durable.fetched == ["a"]
+    assert len(history) == 3
+    assert history.rate_per_hour() == pytest.approx(3.0)
+    # Only the new reading is written back
+    assert durable.added == [("a", 3600, 23.0)]
+
+
+def test_record_never_reads_the_store():
+    durable = FakeDurableStore({"a": [(0.0, 20.0)]})
+    store = TemperatureHistoryStore(window=8, store=durable)
+
+    store.record("a", 23.0, 3600)
+
+    assert durable.fetched == []
+    assert len(store.get("a")) == 1
+
+
+def test_apreload_reads_in_a_worker_thread():
+    durable = FakeDurableStore({"a": [(0.0, 20.0)]})
+    store = TemperatureHistoryStore(window=8, store=durable)
+
+    asyncio.run(store.apreload(["a"]))
+    asyncio.run(store.apreload(["a"]))
+
+    assert durable.fetched == ["a"]
+    assert durable.thread is not threading.main_thread()
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from temperature_monitoring import (
+    RAPID_CHANGE_ACTION,
+    RAPID_CHANGE_ISSUE,
+    RAPID_CHANGE_URGENCY,
+    TEMPERATURE_CONDITIONS,
+    RiskLevel,
+    TemperatureRiskAssessor,
+    create_assessment_response,
+    create_assessment_response_json,
+    risk_template,
+)
+
+T0 = 1_800_000_000.0
+
+
+def classify(*args, **kwargs):
+    return TemperatureRiskAssessor.classify_risk(*args, **kwargs)
+
+
+def test_readings_in_the_same_condition_share_one_template():
+    first = classify(28.0, "Tilapia")
+    second = classify(28.7, "Tilapia")
+
+    assert first.template is second.template
+    assert first.possible_issues is second.possible_issues
+    assert first.recommended_actions is TEMPERATURE_CONDITIONS[0].recommended_actions
+    assert classify(28.0, "Carp").template is not first.template
+
+
+def test_unknown_species_share_the_default_template():
+    assert classify(24.0, "Unknown fish").template is classify(24.0, "Generic").template
+    assert risk_template.cache_info().currsize <= 11 * len(TEMPERATURE_CONDITIONS) * 4
+
+
+def test_shared_disease_risks_are_read_only():
+    assessment = classify(40.0, "Tilapia")
+    risks = TemperatureRiskAssessor.get_disease_risk_factors(assessment.risk_level, "Tilapia")
+
+    with pytest.raises(TypeError):
+        risks["viral_disease"] = "None"
+
+
+def test_rapid_change_from_the_previous_reading():
+    steady = classify(28.0, "Tilapia")
+    assessment = classify(28.0, "Tilapia", previous_temp=25.0)
+
+    assert assessment.possible_issues[0] == f"{RAPID_CHANGE_ISSUE} (3.0°C)"
+    assert assessment.possible_issues[1:] == steady.possible_issues
+    assert assessment.recommended_actions == (RAPID_CHANGE_ACTION,) + steady.recommended_actions
+    assert assessment.urgency_score == steady.urgency_score + RAPID_CHANGE_URGENCY
+    assert assessment.temperature_change == 3.0
+
+
+def test_rapid_change_from_the_pond_rate(history):
+    classify(27.0, "Tilapia", pond_id="p", timestamp=T0)
+    assessment = classify(29.0, "Tilapia", pond_id="p", timestamp=T0 + 1800)
+
+    assert assessment.rate_per_hour == pytest.approx(4.0)
+    assert assessment.possible_issues[0] == f"{RAPID_CHANGE_ISSUE} (+4.0°C/hour)"
+    # The pond rate replaces previous_temp
+    calm = classify(29.0, "Tilapia", previous_temp=20.0, pond_id="p", timestamp=T0 + 3600)
+    assert calm.rate_per_hour == pytest.approx(2.0)
+    assert RAPID_CHANGE_ACTION not in calm.recommended_actions
+
+
+def test_prolonged_stress_adds_an_issue_and_urgency(history):
+    for hour in range(3):
+        assessment = classify(35.0, "Tilapia", pond_id="p", timestamp=T0 + hour * 3600)
+    hot = classify(35.0, "Tilapia")
+
+    assert assessment.degree_hours["above"]["24h"] == 6.0
+    assert assessment.possible_issues[-1] == (
+        "Prolonged thermal stress (6.0 degree-hours outside safe range in 24h, 6.0 in 7 days)"
+    )
+    assert assessment.possible_issues[:-1] == hot.possible_issues
+    assert assessment.urgency_score == hot.urgency_score + 3
+
+
+@pytest.mark.parametrize("temperature", [-5.0, 10.0, 24.0, 26.0, 28.0, 31.5, 33.0, 45.0])
+@pytest.mark.parametrize("species", ["Tilapia", "Salmon", "Generic"])
+@pytest.mark.parametrize("previous", [None, 0.5, 5.0])
+def test_json_response_matches_the_dict_response(temperature, species, previous):
+    assessment = classify(
+        temperature, species, previous_temp=None if previous is None else temperature - previous
+    )
+
+    assert json.loads(create_assessment_response_json(assessment)) == create_assessment_response(assessment)
+
+
+def test_json_response_with_history_and_extra_fields(history):
+    for hour in range(3):
+        assessment = classify(35.0 + hour, "Tilapia", pond_id="p", timestamp=T0 + hour * 1800)
+    extra = {"history": history.stats("p")}
+
+    encoded = json.loads(create_assessment_response_json(assessment, extra))
+
+    assert encoded == {**create_assessment_response(assessment), **extra}
+
+
+def test_assess_risk_endpoint(client, history):
+    response = client.post("/temperature/assess-risk", json={"temperature": 33.0, "species": "Tilapia"})
+    assert response.status_code == 200
+    assert response.json() == create_assessment_response(classify(33.0, "Tilapia"))
+    assert response.json()["risk_level"] in {level.value for level in RiskLevel}
+
+    for i, temperature in enumerate((27.0, 29.0)):
+        response = client.post(
+            "/temperature/assess-risk",
+            json={"temperature": temperature, "species": "Tilapia", "pond_id": "p", "timestamp": T0 + i * 1800},
+        )
+    body = response.json()
+    assert body["rate_per_hour"] == 4.0
+    assert body["history"]["readings"] == 2
+    assert client.get("/temperature/ponds/p").json()["latest_temperature"] == 29.0
+
+    assert client.post("/temperature/assess-risk", json={"temperature": 80.0}).status_code == 400
+    response = client.post(
+        "/temperature/assess-risk", json={"temperature": 28.0, "pond_id": "p", "timestamp": "soon"}
+    )
+    assert response.status_code == 400
+    assert client.get("/temperature/ponds/missing").status_code == 404
@@ -0,0 +1,226 @@
+import os
+import runpy
+import time
+
+import pytest
+
+import temperature_store as temperature_store_module
+from temperature_store import RAW, TemperatureStore, choose_resolution
+
+# A day boundary, so every rollup bucket below starts at a known timestamp
+DAY = 86400 * 20000
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TemperatureStore(str(tmp_path / "temperature.db"), batch_size=1000, raw_retention_days=0)
+    yield store
+    store.close()
+
+
+def points(store, resolution, start=DAY, end=DAY + 2 * 86400):
+    return [
+        (p["timestamp"], p["min"], p["max"], p["mean"], p["count"])
+        for p in store.query("pond", start, end, resolution)["points"]
+    ]
+
+
+def test_choose_resolution_keeps_within_the_point_budget():
+    assert choose_resolution(0, 60 * 100, max_points=100) == RAW
+    # Raw readings are budgeted at one a minute, so a span too long for them skips past 1m
+    assert choose_resolution(0, 60 * 101, max_points=100) == "1h"
+    assert choose_resolution(0, 3600 * 100, max_points=100) == "1h"
+    assert choose_resolution(0, 86400 * 100, max_points=100) == "1d"
+    assert choose_resolution(0, 86400 * 1000, max_points=100) == "1d"
+
+
+def test_flush_writes_readings_and_rollups(store):
+    for ts, temperature in [(DAY, 20.0), (DAY + 30, 22.0), (DAY + 90, 24.0), (DAY + 3600, 30.0)]:
+        store.add("pond", ts, temperature)
+    store.add("other", DAY, 99.0)
+
+    assert store.flush() == 5
+
+    assert points(store, RAW) == [
+        (DAY, 20.0, 20.0, 20.0, 1), (DAY + 30, 22.0, 22.0, 22.0, 1),
+        (DAY + 90, 24.0, 24.0, 24.0, 1), (DAY + 3600, 30.0, 30.0, 30.0, 1),
+    ]
+    assert points(store, "1m") == [
+        (DAY, 20.0, 22.0, 21.0, 2), (DAY + 60, 24.0, 24.0, 24.0, 1), (DAY + 3600, 30.0, 30.0, 30.0, 1),
+    ]
+    assert points(store, "1h") == [(DAY, 20.0, 24.0, 22.0, 3), (DAY + 3600, 30.0, 30.0, 30.0, 1)]
+    assert points(store, "1d") == [(DAY, 20.0, 30.0, 24.0, 4)]
+
+
+def test_rollups_merge_across_flushes(store):
+    store.add("pond", DAY, 20.0)
+    store.flush()
+    store.add("pond", DAY + 10, 30.0)
+    store.flush()
+
+    assert points(store, "1m") == [(DAY, 20.0, 30.0, 25.0, 2)]
+
+
+def test_stored_readings_are_not_counted_twice(store):
+    store.add("pond", DAY, 20.0)
+    store.flush()
+
+    store.add("pond", DAY, 25.0)
+    assert store.flush() == 0
+
+    # Within one batch the last value for a timestamp wins
+    store.add("pond", DAY + 5, 10.0)
+    store.add("pond", DAY + 5, 12.0)
+    assert store.flush() == 1
+
+    assert points(store, "1d") == [(DAY, 12.0, 20.0, 16.0, 2)]
+    assert store.written == 2
+
+
+def test_query_flushes_the_buffer_and_checks_the_resolution(store):
+    store.add("pond", DAY, 20.0)
+
+    assert store.query("pond", DAY, DAY + 60)["resolution"] == RAW
+    assert points(store, RAW) == [(DAY, 20.0, 20.0, 20.0, 1)]
+    with pytest.raises(ValueError):
+        store.query("pond", DAY, DAY + 60, "1w")
+
+
+def test_rollup_query_includes_the_bucket_holding_start(store):
+    store.add("pond", DAY + 10, 20.0)
+
+    assert points(store, "1h", start=DAY + 1800, end=DAY + 7200) == [(DAY, 20.0, 20.0, 20.0, 1)]
+
+
+def test_full_buffer_is_written_inline_without_a_flusher(tmp_path):
+    store = TemperatureStore(str(tmp_path / "t.db"), batch_size=2, raw_retention_days=0)
+    try:
+        store.add("pond", DAY, 20.0)
+        assert store.written == 0
+        store.add("pond", DAY + 1, 21.0)
+        assert store.written == 2
+    finally:
+        store.close()
+
+
+def test_recent_returns_the_newest_readings_oldest_first(store):
+    for i in range(5):
+        store.add("pond", DAY + i, 20.0 + i)
+    store.flush()
+
+    assert store.recent("pond", 3) == [(DAY + 2, 22.0), (DAY + 3, 23.0), (DAY + 4, 24.0)]
+    assert store.recent("missing", 3) == []
+
+
+def test_close_flushes_and_history_survives_a_restart(tmp_path):
+    path = str(tmp_path / "t.db")
+    store = TemperatureStore(path, flush_seconds=60, raw_retention_days=0)
+    store.start()
+    store.add("pond", DAY, 20.0)
+    store.close()
+
+    reopened = TemperatureStore(path, raw_retention_days=0)
+    try:
+        assert reopened.recent("pond", 10) == [(DAY, 20.0)]
+    finally:
+        reopened.close()
+
+
+def test_background_flusher_writes_full_batches(tmp_path):
+    store = TemperatureStore(str(tmp_path / "t.db"), batch_size=2, flush_seconds=60, raw_retention_days=0)
+    store.start()
+    try:
+        store.add("pond", DAY, 20.0)
+        store.add("pond", DAY + 1, 21.0)
+        deadline = time.monotonic() + 5
+        while store.written < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.written == 2
+    finally:
+        store.close()
+
+
+def test_raw_readings_past_retention_are_pruned_but_rollups_kept(tmp_path):
+    store = TemperatureStore(str(tmp_path / "t.db"), raw_retention_days=1)
+    now = time.time()
+    try:
+        store.add("pond", now - 3 * 86400, 20.0)
+        store.add("pond", now, 22.0)
+        store.flush()
+
+        assert store.recent("pond", 10) == [(now, 22.0)]
+        assert sum(p["count"] for p in store.query("pond", now - 4 * 86400, now, "1d")["points"]) == 2
+    finally:
+        store.close()
+
+
+def test_disabled_store_keeps_nothing():
+    store = TemperatureStore(None)
+
+    store.add("pond", DAY, 20.0)
+
+    assert not store.enabled
+    assert store.flush() == 0
+    assert store.recent("pond", 10) == []
+    assert store.stats()["buffered"] == 0
+
+
+def test_database_defaults_into_the_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AQUA_DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("TEMPERATURE_DB_PATH", raising=False)
+
+    namespace = runpy.run_path(temperature_store_module.__file__)
+
+    assert namespace["TEMPERATURE_DB_PATH"] == os.path.join(str(tmp_path), "temperature.db")
+
+    monkeypatch.delenv("AQUA_DATA_DIR")
+    assert runpy.run_path(temperature_store_module.__file__)["TEMPERATURE_DB_PATH"] is None
+
+
+def test_history_endpoint(client, store, monkeypatch):
+    import main
+
+    assert client.get("/temperature/history/pond").status_code == 503
+
+    monkeypatch.setattr(main, "temperature_store", store)
+    store.add("pond", DAY, 20.0)
+    store.add("pond", DAY + 30, 22.0)
+
+    response = client.get("/temperature/history/pond", params={"start": DAY, "end": DAY + 3600})
+    assert response.status_code == 200
+    assert response.json()["resolution"] == RAW
+    assert len(response.json()["points"]) == 2
+
+    response = client.get(
+        "/temperature/history/pond", params={"start": DAY, "end": DAY + 3600, "resolution": "1h"}
+    )
+    assert response.json()["points"][0]["count"] == 2
+
+    assert client.get("/temperature/history/pond", params={"start": DAY + 10, "end": DAY}).status_code == 400
+    assert client.get("/temperature/history/pond", params={"end": "yesterday"}).status_code == 400
+    assert client.get("/temperature/history/pond", params={"resolution": "1w"}).status_code == 400
+
+
+def test_history_endpoint_accepts_any_numeric_epoch(client, store, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "temperature_store", store)
+    store.add("pond", DAY, 20.0)
+
+    response = client.get("/temperature/history/pond", params={"start": "1.728e9", "end": str(DAY + 60)})
+    assert response.status_code == 200
+    assert response.json()["start"] == DAY
+    assert len(response.json()["points"]) == 1
+
+    response = client.get("/temperature/history/pond", params={"start": "-86400", "end": str(DAY)})
+    assert response.status_code == 200
+    assert response.json()["start"] == -86400
+
+    response = client.get(
+        "/temperature/history/pond", params={"start": "2024-10-04T00:00:00Z", "end": "2024-10-05T00:00:00+00:00"}
+    )
+    assert response.status_code == 200
+    assert response.json()["end"] - response.json()["start"] == 86400
+
+    for bad in ("nan", "inf", "next week"):
+        assert client.get("/temperature/history/pond", params={"end": bad}).status_code == 400
@@ -0,0 +1,161 @@
+import json
+import math
+
+import pytest
+
+from temperature_monitoring import RiskLevel
+from temperature_stream import TemperatureStreamMonitor
+
+# Tilapia is safe from 25°C to 32°C: 27-30 is optimal, above 30 is near the maximum
+OPTIMAL, NEAR_MAX = 28.0, 31.0
+
+
+@pytest.fixture
+def monitor(history):
+    return TemperatureStreamMonitor(hysteresis=0.5, escalate_readings=1, clear_readings=3)
+
+
+def feed(monitor, temperatures, pond_id="pond-1", start=1_000_000.0):
+    return [
+        monitor.ingest(pond_id, t, "Tilapia", start + 60 * i)
+        for i, t in enumerate(temperatures)
+    ]
+
+
+def test_first_reading_reports_the_initial_level(monitor):
+    event = monitor.ingest("pond-1", OPTIMAL, "Tilapia", 1_000_000.0)
+
+    assert event["event"] == "risk_change"
+    assert event["previous_risk_level"] is None
+    assert event["risk_level"] == RiskLevel.NORMAL.value
+    assert event["safe_range"] == {"min": 25, "max": 32}
+
+
+def test_only_transitions_are_reported(monitor):
+    events = feed(monitor, [OPTIMAL, 28.5, 29.0, NEAR_MAX, 31.5, 31.2])
+
+    assert events[1:3] == [None, None]
+    assert events[3]["previous_risk_level"] == RiskLevel.NORMAL.value
+    assert events[3]["risk_level"] == RiskLevel.CAUTION.value
+    assert events[4:] == [None, None]
+    assert monitor.risk_level("pond-1") == RiskLevel.CAUTION
+
+
+def test_clearing_needs_the_margin_and_consecutive_readings(monitor):
+    # 29.8 is optimal but within the 0.5°C margin of near_max, so it never clears
+    events = feed(monitor, [NEAR_MAX, 29.8, 29.8, 29.8, 29.8])
+    assert events[1:] == [None] * 4
+
+    # A reading back at the boundary restarts the count of clear readings
+    events = feed(monitor, [29.0, 29.0, NEAR_MAX, 29.0, 29.0], start=2_000_000.0)
+    assert events == [None] * 5
+
+    event = monitor.ingest("pond-1", 29.0, "Tilapia", 3_000_000.0)
+    assert event["previous_risk_level"] == RiskLevel.CAUTION.value
+    assert event["risk_level"] == RiskLevel.NORMAL.value
+
+
+def test_hovering_at_a_boundary_does_not_flap(monitor):
+    events = feed(monitor, [30.1, 29.9, 30.1, 29.9, 30.1, 29.9, 30.1])
+
+    assert [e for e in events[1:] if e is not None] == []
+
+
+def test_escalation_can_require_several_readings(history):
+    monitor = TemperatureStreamMonitor(hysteresis=0.5, escalate_readings=2, clear_readings=1)
+
+    events = feed(monitor, [OPTIMAL, NEAR_MAX, OPTIMAL, NEAR_MAX, NEAR_MAX])
+
+    assert events[1:4] == [None, None, None]
+    assert events[4]["risk_level"] == RiskLevel.CAUTION.value
+
+
+def test_species_is_remembered_per_pond(monitor):
+    monitor.ingest("pond-1", OPTIMAL, "Tilapia", 1_000_000.0)
+
+    event = monitor.ingest("pond-1", 33.5, timestamp=1_000_060.0)
+
+    assert event["species"] == "Tilapia"
+    assert event["safe_range"] == {"min": 25, "max": 32}
+
+
+def test_ponds_are_bounded(history):
+    monitor = TemperatureStreamMonitor(max_ponds=2)
+
+    for pond_id in ("a", "b", "c"):
+        monitor.ingest(pond_id, OPTIMAL, "Tilapia", 1_000_000.0)
+
+    assert monitor.risk_level("a") is None
+    assert monitor.risk_level("c") == RiskLevel.NORMAL
+
+
+@pytest.mark.parametrize("message", [
+    [],
+    {"temperature": 28.0},
+    {"pond_id": "", "temperature": 28.0},
+    {"pond_id": "p", "temperature": "28"},
+    {"pond_id": "p", "temperature": True},
+    {"pond_id": "p", "temperature": 75.0},
+    {"pond_id": "p", "temperature": 28.0, "species": 3},
+    {"pond_id": "p", "temperature": 28.0, "timestamp": True},
+    {"pond_id": "p", "temperature": 28.0, "timestamp": math.nan},
+    {"pond_id": "p", "temperature": 28.0, "timestamp": math.inf},
+    {"pond_id": "p", "temperature": 28.0, "timestamp": [1]},
+])
+def test_malformed_messages_are_rejected(monitor, message):
+    with pytest.raises(ValueError):
+        monitor.ingest_message(message)
+
+
+def test_valid_message_is_ingested(monitor):
+    event = monitor.ingest_message(
+        {"pond_id": "p", "temperature": 28, "species": "Tilapia", "timestamp": "2026-01-01T00:00:00Z"}
+    )
+
+    assert event["risk_level"] == RiskLevel.NORMAL.value
+    assert event["temperature"] == 28.0
+
+
+@pytest.fixture
+def stream_client(client, history, monitor, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "temperature_stream_monitor", monitor)
+    return client
+
+
+def test_ndjson_stream_reports_changes_errors_and_a_summary(stream_client):
+    lines = [
+        {"pond_id": "p", "temperature": OPTIMAL, "species": "Tilapia", "timestamp": 1_000_000},
+        {"pond_id": "p", "temperature": 28.5, "timestamp": 1_000_060},
+        "not json",
+        [{"pond_id": "p", "temperature": NEAR_MAX, "timestamp": 1_000_120}, {"pond_id": "p"}],
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+
+    response = stream_client.post(
+        "/temperature/stream", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["risk_change", "error", "risk_change", "error", "summary"]
+    assert events[1]["line"] == 3
+    assert events[3]["line"] == 4
+    summary = events[-1]
+    assert (summary["readings"], summary["risk_changes"], summary["errors"]) == (4, 2, 2)
+
+
+def test_websocket_stream_sends_only_transitions(stream_client):
+    with stream_client.websocket_connect("/temperature/stream") as ws:
+        ws.send_text(json.dumps({"pond_id": "p", "temperature": OPTIMAL, "species": "Tilapia", "timestamp": 1}))
+        assert ws.receive_json()["risk_level"] == RiskLevel.NORMAL.value
+
+        ws.send_text(json.dumps({"pond_id": "p", "temperature": 28.5, "timestamp": 61}))
+        ws.send_text("{")
+        assert ws.receive_json() == {"event": "error", "detail": "Message is not valid JSON"}
+
+        ws.send_text(json.dumps([{"pond_id": "p", "temperature": NEAR_MAX, "timestamp": 121}]))
+        event = ws.receive_json()
+        assert event["previous_risk_level"] == RiskLevel.NORMAL.value
+        assert event["risk_level"] == RiskLevel.CAUTION.value
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from temperature_history import TemperatureHistoryStore
+from thermal_stress import STRESS_WINDOWS, ThermalStressAccumulator
+
+HOUR = 3600
+# Bucket-aligned start, so window edges fall on whole hours
+T0 = HOUR * 500000
+
+
+def accumulate(readings, bucket_seconds=HOUR, max_gap_seconds=HOUR):
+    stress = ThermalStressAccumulator(bucket_seconds, max_gap_seconds)
+    for t, temperature in readings:
+        stress.add(temperature, t, 20.0, 30.0)
+    return stress
+
+
+def brute_force(readings, bucket_seconds, max_gap_seconds):
+    """Degree-hours per window recomputed from every interval"""
+    buckets = {}
+    for (t0, v0), (t1, _) in zip(readings, readings[1:]):
+        hours = min(t1 - t0, max_gap_seconds) / HOUR
+        bucket = buckets.setdefault(int(t1 // bucket_seconds), [0.0, 0.0])
+        bucket[0] += max(0.0, v0 - 30.0) * hours
+        bucket[1] += max(0.0, 20.0 - v0) * hours
+    last = int(readings[-1][0] // bucket_seconds)
+    result = {"above": {}, "below": {}}
+    for name, hours in STRESS_WINDOWS.items():
+        n = max(1, round(hours * HOUR / bucket_seconds))
+        kept = [b for key, b in buckets.items() if last - n < key <= last]
+        result["above"][name] = round(sum(b[0] for b in kept), 2)
+        result["below"][name] = round(sum(b[1] for b in kept), 2)
+    return result
+
+
+def test_hours_above_and_below_the_range_accumulate():
+    stress = accumulate([(T0 + i * HOUR, 32.0) for i in range(4)])
+    assert stress.degree_hours()["above"] == {"24h": 6.0, "72h": 6.0, "7d": 6.0}
+    assert stress.degree_hours()["below"] == {"24h": 0.0, "72h": 0.0, "7d": 0.0}
+
+    stress = accumulate([(T0, 17.0), (T0 + HOUR / 2, 25.0)])
+    assert stress.degree_hours()["below"]["24h"] == 1.5
+
+
+def test_interval_is_credited_with_the_earlier_reading():
+    stress = accumulate([(T0, 25.0), (T0 + HOUR, 40.0)])
+
+    assert stress.degree_hours()["above"]["24h"] == 0.0
+
+
+def test_long_gaps_are_capped():
+    stress = accumulate([(T0, 31.0), (T0 + 5 * HOUR, 31.0)])
+
+    assert stress.degree_hours()["above"]["24h"] == 1.0
+
+
+def test_old_buckets_leave_shorter_windows_first():
+    readings = [(T0, 32.0), (T0 + HOUR, 25.0)]
+    readings += [(T0 + h * HOUR, 25.0) for h in range(2, 30)]
+
+    degree_hours = accumulate(readings).degree_hours()["above"]
+
+    assert degree_hours == {"24h": 0.0, "72h": 2.0, "7d": 2.0}
+
+
+def test_idle_longer_than_every_window_resets():
+    stress = accumulate([(T0, 32.0), (T0 + HOUR, 25.0), (T0 + 200 * HOUR, 25.0)])
+
+    assert stress.degree_hours()["above"] == {"24h": 0.0, "72h": 0.0, "7d": 0.0}
+
+
+@pytest.mark.parametrize("bucket_seconds", [HOUR, 15 * 60, 6 * HOUR])
+def test_sliding_windows_match_recomputation(bucket_seconds):
+    rng = random.Random(bucket_seconds)
+    readings = []
+    t = float(T0)
+    for _ in range(3000):
+        # Mostly regular readings with the occasional outage
+        t += rng.choice([300, 600, 900, 1800]) if rng.random() > 0.01 else rng.uniform(HOUR, 100 * HOUR)
+        readings.append((t, rng.uniform(14.0, 36.0)))
+
+    stress = ThermalStressAccumulator(bucket_seconds, HOUR)
+    for i, (timestamp, temperature) in enumerate(readings):
+        stress.add(temperature, timestamp, 20.0, 30.0)
+        if i % 97 == 0 or i == len(readings) - 1:
+            expected = brute_force(readings[:i + 1], bucket_seconds, HOUR)
+            for side in ("above", "below"):
+                for name in STRESS_WINDOWS:
+                    assert stress.degree_hours()[side][name] == pytest.approx(expected[side][name], abs=0.02)
+
+
+def test_urgency_follows_the_worst_daily_average():
+    assert accumulate([(T0, 25.0), (T0 + HOUR, 25.0)]).urgency() == 0
+
+    # 10 degree-hours in the last day: 5 points at 0.5 per degree-hour
+    stress = accumulate([(T0 + i * HOUR, 32.0) for i in range(6)])
+    assert stress.urgency() == 5
+
+    # Capped
+    stress = accumulate([(T0 + i * HOUR, 40.0) for i in range(20)])
+    assert stress.urgency() == 20
+
+
+def test_history_tracks_stress_only_with_a_safe_range():
+    store = TemperatureHistoryStore(store=None)
+
+    store.record("plain", 35.0, T0)
+    store.record("plain", 35.0, T0 + HOUR)
+    store.record("pond", 35.0, T0, (20.0, 30.0))
+    store.record("pond", 35.0, T0 + HOUR, (20.0, 30.0))
+    # Out-of-order readings are ignored by the history and never reach the accumulator
+    store.record("pond", 50.0, T0 + HOUR / 2, (20.0, 30.0))
+
+    assert store.get("plain").stats()["degree_hours"] is None
+    assert store.get("pond").stats()["degree_hours"]["above"]["24h"] == 5.0
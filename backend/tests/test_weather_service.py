@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import pytest
+
+import metrics
+import weather_service
+from weather_service import LocationService, WeatherHttpClient, WeatherService
+
+CURRENT = {
+    "timezone": "Asia/Kolkata",
+    "current": {
+        "time": "2026-05-01T12:00", "temperature_2m": 33.5, "weather_code": 2,
+        "wind_speed_10m": 11.0, "relative_humidity_2m": 70,
+    },
+}
+DAILY = {
+    "daily": {
+        "time": ["2026-05-01", "2026-05-02"],
+        "temperature_2m_min": [27.0, 26.5],
+        "temperature_2m_max": [35.0, 34.0],
+        "temperature_2m_mean": [31.0, 30.2],
+        "weather_code": [0, 61],
+        "precipitation_sum": [0.0, 4.2],
+    },
+}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Pooled client answering from a mock transport; records each request"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.params.get("daily"):
+            return httpx.Response(200, json=DAILY)
+        return httpx.Response(200, json=CURRENT)
+
+    shared = WeatherHttpClient(http2=False)
+    shared._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(weather_service, "weather_http_client", shared)
+    return shared, requests
+
+
+def test_client_is_created_once_and_reopened_after_close():
+    async def main():
+        shared = WeatherHttpClient(max_connections=0, max_keepalive=-1, http2=False)
+        first = shared.client()
+        assert shared.client() is first
+        assert shared.max_connections == 1 and shared.max_keepalive == 0
+
+        await shared.aclose()
+        assert first.is_closed
+        second = shared.client()
+        assert second is not first and not second.is_closed
+        await shared.aclose()
+        # Closing twice is harmless
+        await shared.aclose()
+
+    asyncio.run(main())
+
+
+def test_http2_needs_the_h2_package(monkeypatch):
+    monkeypatch.setattr(weather_service, "_http2_available", lambda: False)
+    assert WeatherHttpClient(http2=True).http2 is False
+
+    monkeypatch.setattr(weather_service, "_http2_available", lambda: True)
+    assert WeatherHttpClient(http2=True).http2 is True
+    assert WeatherHttpClient(http2=False).http2 is False
+
+
+def test_lookups_share_the_pooled_client(api):
+    shared, requests = api
+    client = shared.client()
+
+    async def main():
+        return (
+            await WeatherService.get_current_weather(16.54, 81.52, "Bhimavaram"),
+            await WeatherService.get_forecast(16.54, 81.52, days=40),
+        )
+
+    current, forecast = asyncio.run(main())
+
+    assert shared.client() is client and not client.is_closed
+    assert len(requests) == 2
+    assert current["temperature"] == 33.5
+    assert current["weather_description"] == "Partly cloudy"
+    assert current["timezone"] == "Asia/Kolkata"
+    assert requests[1].url.params["forecast_days"] == "16"
+    assert [day["temp_max"] for day in forecast] == [35.0, 34.0]
+    assert forecast[1]["weather_description"] == "Slight rain"
+
+
+def test_failed_requests_return_none(monkeypatch):
+    def handler(request):
+        if "fail" in request.url.host:
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(503)
+
+    shared = WeatherHttpClient(http2=False)
+    shared._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(weather_service, "weather_http_client", shared)
+
+    async def main():
+        results = [await WeatherService.get_current_weather(0, 0), await WeatherService.get_forecast(0, 0)]
+        monkeypatch.setitem(weather_service.WEATHER_API_PROVIDERS["open_meteo"], "url", "https://fail.test")
+        results.append(await WeatherService.get_current_weather(0, 0))
+        return results
+
+    assert asyncio.run(main()) == [None, None, None]
+
+
+def test_health_check_is_timed_like_other_calls(api, monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", metrics.MetricsRegistry())
+    histogram = metrics.Histogram("test_upstream_seconds", "Upstream", ("service", "call", "outcome"))
+    monkeypatch.setattr(metrics, "UPSTREAM_LATENCY", histogram)
+
+    assert asyncio.run(weather_service.verify_api_health()) == {"open_meteo": True}
+
+    text = metrics.REGISTRY.render()
+    assert 'test_upstream_seconds_count{service="open_meteo",call="health",outcome="200"} 1' in text
+
+
+def test_coordinates_resolve_without_a_request(api):
+    _, requests = api
+
+    place = asyncio.run(LocationService.resolve_location("16.5, 81.5"))
+
+    assert place == (16.5, 81.5, "Lat 16.50, Lon 81.50")
+    assert requests == []
+
+
+def test_location_check_endpoint(client, api):
+    shared, requests = api
+
+    response = client.post("/weather/location-check", json={"location": "16.54,81.52", "species": "Tilapia"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["current_weather"]["temperature"] == 33.5
+    assert body["risk_assessment"]["risk_level"] == "caution"
+    assert [day["temp_mean"] for day in body["forecast_3day"]] == [31.0, 30.2]
+    assert len(requests) == 2
+    assert not shared.client().is_closed
@@ -0,0 +1,116 @@
+"""
+Thermal Stress Accumulation
+Tracks cumulative time a pond spends outside its species' safe range, as
+degree-hours above the maximum and below the minimum, over sliding 24h, 72h
+and 7d windows. Degree-hours are summed into fixed time buckets held in a
+ring; each window keeps a running total and drops whole buckets as they age
+out, so a reading costs amortized O(1) regardless of window length or history.
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Bucket width; windows slide in steps of one bucket
+TEMPERATURE_STRESS_BUCKET_MINUTES = float(os.getenv("TEMPERATURE_STRESS_BUCKET_MINUTES", "60"))
+# Gaps between readings longer than this are only credited up to this long
+TEMPERATURE_STRESS_MAX_GAP_MINUTES = float(os.getenv("TEMPERATURE_STRESS_MAX_GAP_MINUTES", "60"))
+# Urgency added per degree-hour of daily stress, and its cap
+TEMPERATURE_STRESS_URGENCY_PER_DEGREE_HOUR = float(os.getenv("TEMPERATURE_STRESS_URGENCY_PER_DEGREE_HOUR", "0.5"))
+TEMPERATURE_STRESS_MAX_URGENCY = float(os.getenv("TEMPERATURE_STRESS_MAX_URGENCY", "20"))
+
+# Window name -> length in hours
+STRESS_WINDOWS = {"24h": 24, "72h": 72, "7d": 168}
+
+
+class ThermalStressAccumulator:
+    """
+    Degree-hours above / below a safe range over sliding windows for one pond.
+
+    The interval between two readings is credited with the excess of the
+    earlier reading (left Riemann sum) and booked in the bucket of the later one.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = TEMPERATURE_STRESS_BUCKET_MINUTES * 60,
+        max_gap_seconds: float = TEMPERATURE_STRESS_MAX_GAP_MINUTES * 60
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.max_gap_seconds = max_gap_seconds
+        self._window_buckets = [
+            max(1, round(hours * 3600 / bucket_seconds)) for hours in STRESS_WINDOWS.values()
+        ]
+        size = max(self._window_buckets)
+        # Per bucket: degree-hours above and below; ids detect slots left over from older laps
+        self._above = np.zeros(size, dtype=np.float64)
+        self._below = np.zeros(size, dtype=np.float64)
+        self._bucket_ids = np.full(size, -1, dtype=np.int64)
+        # Per window: running totals and the oldest bucket still included
+        self._sum_above = [0.0] * len(self._window_buckets)
+        self._sum_below = [0.0] * len(self._window_buckets)
+        self._tails: Optional[list] = None
+        self._last: Optional[Tuple[float, float, float]] = None  # (time, excess above, excess below)
+
+    def _advance(self, bucket: int) -> None:
+        """Slide every window so it ends at `bucket`"""
+        if self._tails is None:
+            self._tails = [bucket - n + 1 for n in self._window_buckets]
+            return
+        size = len(self._bucket_ids)
+        for i, n in enumerate(self._window_buckets):
+            first = bucket - n + 1
+            tail = self._tails[i]
+            if first - tail >= n:
+                # Idle longer than the window: nothing old survives
+                self._sum_above[i] = self._sum_below[i] = 0.0
+                tail = first
+            while tail < first:
+                slot = tail % size
+                if self._bucket_ids[slot] == tail:
+                    self._sum_above[i] -= float(self._above[slot])
+                    self._sum_below[i] -= float(self._below[slot])
+                tail += 1
+            self._tails[i] = tail
+
+    def add(self, temperature: float, timestamp: float, min_safe: float, max_safe: float) -> None:
+        """Account for a reading; readings must arrive in time order"""
+        excess_above = max(0.0, temperature - max_safe)
+        excess_below = max(0.0, min_safe - temperature)
+        previous, self._last = self._last, (timestamp, excess_above, excess_below)
+
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        if previous is None:
+            return
+        hours = min(max(0.0, timestamp - previous[0]), self.max_gap_seconds) / 3600
+        above, below = previous[1] * hours, previous[2] * hours
+        if not above and not below:
+            return
+
+        slot = bucket % len(self._bucket_ids)
+        if self._bucket_ids[slot] != bucket:
+            # Previous occupant is older than the longest window and already evicted
+            self._bucket_ids[slot] = bucket
+            self._above[slot] = self._below[slot] = 0.0
+        self._above[slot] += above
+        self._below[slot] += below
+        for i in range(len(self._window_buckets)):
+            self._sum_above[i] += above
+            self._sum_below[i] += below
+
+    def degree_hours(self) -> Dict[str, Dict[str, float]]:
+        """Degree-hours above and below the safe range per window, ending at the latest reading"""
+        names = list(STRESS_WINDOWS)
+        return {
+            "above": {name: round(max(0.0, total), 2) for name, total in zip(names, self._sum_above)},
+            "below": {name: round(max(0.0, total), 2) for name, total in zip(names, self._sum_below)},
+        }
+
+    def urgency(self) -> int:
+        """Urgency points from the worst average daily stress across windows"""
+        worst = 0.0
+        for hours, above, below in zip(STRESS_WINDOWS.values(), self._sum_above, self._sum_below):
+            worst = max(worst, (above + below) * 24 / hours)
+        return round(min(TEMPERATURE_STRESS_MAX_URGENCY, worst * TEMPERATURE_STRESS_URGENCY_PER_DEGREE_HOUR))
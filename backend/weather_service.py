@@ -2,6 +2,11 @@
 Weather Data Integration
 Fetches weather data from free APIs and manages location-based queries.
 Supports multiple free weather services for reliable fallback.
+All calls share one pooled HTTP client (HTTP/2 when the h2 package is
+installed) that lives for the whole application, so back-to-back lookups
+reuse connections instead of paying a TCP+TLS handshake each time.
+Place names are resolved from the offline gazetteer and the geocoding cache
+(see geocoding) before the geocoding API is called.
 """
 
 import httpx
@@ -10,12 +15,26 @@ from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 import os
 
+from geocoding import gazetteer, geocode_cache, normalize_place_name
+from metrics import GEOCODE_LOOKUPS, upstream_timer
+
 logger = logging.getLogger(__name__)
 
+# Endpoints can be overridden (e.g. to point benchmarks at local mock servers)
+OPEN_METEO_FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+
+WEATHER_HTTP_MAX_CONNECTIONS = int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", "20"))
+# Idle connections kept open per pool, and for how long
+WEATHER_HTTP_MAX_KEEPALIVE = int(os.getenv("WEATHER_HTTP_MAX_KEEPALIVE", "10"))
+WEATHER_HTTP_KEEPALIVE_SECONDS = float(os.getenv("WEATHER_HTTP_KEEPALIVE_SECONDS", "120"))
+# Multiplex requests over one connection per host when the h2 package is installed
+WEATHER_HTTP2 = os.getenv("WEATHER_HTTP2", "true").lower() == "true"
+
 # Free weather APIs (no authentication required for basic usage)
 WEATHER_API_PROVIDERS = {
     "open_meteo": {
-        "url": "https://api.open-meteo.com/v1/forecast",
+        "url": OPEN_METEO_FORECAST_URL,
         "description": "Open-Meteo (no API key needed, 10,000 free requests/day)",
         "priority": 1
     },
@@ -32,6 +51,59 @@ WEATHER_API_PROVIDERS = {
 }
 
 
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class WeatherHttpClient:
+    """
+    Application-lifetime pooled client for the weather and geocoding APIs.
+
+    Created at startup (or on first use, so it binds to the serving event
+    loop) and kept alive until aclose() at shutdown. Timeouts are passed per
+    request, since geocoding and forecasts use different ones.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = WEATHER_HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = WEATHER_HTTP_MAX_KEEPALIVE,
+        keepalive_seconds: float = WEATHER_HTTP_KEEPALIVE_SECONDS,
+        http2: bool = WEATHER_HTTP2
+    ):
+        self.max_connections = max(1, max_connections)
+        self.max_keepalive = max(0, max_keepalive)
+        self.keepalive_seconds = keepalive_seconds
+        self.http2 = http2 and _http2_available()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+            )
+        return self._client
+
+    def start(self) -> None:
+        self.client()
+        logger.info(f"Weather HTTP client ready ({'HTTP/2' if self.http2 else 'HTTP/1.1'})")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
 class LocationService:
     """Handles location querying and geocoding"""
 
@@ -59,32 +131,56 @@ class LocationService:
                     except ValueError:
                         pass
             
+            # Offline gazetteer first, then earlier answers from the geocoding API
+            place = gazetteer.lookup(location_input)
+            if place is not None:
+                GEOCODE_LOOKUPS.inc(source="gazetteer")
+                return place
+            key = normalize_place_name(location_input)
+            found, place = geocode_cache.get(key)
+            if found:
+                GEOCODE_LOOKUPS.inc(source="cache")
+                return place
+            
             # Use Open-Meteo's geocoding API (free, no key needed)
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            client = weather_http_client.client()
+            with upstream_timer("open_meteo", "geocode") as call:
                 response = await client.get(
-                    "https://geocoding-api.open-meteo.com/v1/search",
+                    OPEN_METEO_GEOCODING_URL,
                     params={
                         "name": location_input,
                         "count": 1,
                         "language": "en",
                         "format": "json"
-                    }
+                    },
+                    timeout=5.0
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("results"):
-                        result = data["results"][0]
-                        lat = result.get("latitude")
-                        lon = result.get("longitude")
-                        name = result.get("name", location_input)
-                        country = result.get("country", "")
-                        display_name = f"{name}, {country}" if country else name
-                        return (lat, lon, display_name)
+                call["outcome"] = str(response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                place = None
+                if data.get("results"):
+                    result = data["results"][0]
+                    lat = result.get("latitude")
+                    lon = result.get("longitude")
+                    name = result.get("name", location_input)
+                    country = result.get("country", "")
+                    display_name = f"{name}, {country}" if country else name
+                    place = (lat, lon, display_name)
+                GEOCODE_LOOKUPS.inc(source="api")
+                geocode_cache.put(key, place)
+                await geocode_cache.save_if_due()
+                return place
         except Exception as e:
             logger.error(f"Error resolving location '{location_input}': {e}")
         
-        return None
+        # Geocoding API unavailable: an expired answer is better than none
+        found, place = geocode_cache.get(normalize_place_name(location_input), allow_stale=True)
+        if found:
+            logger.info(f"Geocoding API unavailable; using cached location for '{location_input}'")
+        GEOCODE_LOOKUPS.inc(source="stale" if found else "failed")
+        return place
 
     @staticmethod
     def format_location(lat: float, lon: float) -> str:
@@ -113,7 +209,8 @@ class WeatherService:
             Dict with current weather data or None if failed
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            client = weather_http_client.client()
+            with upstream_timer("open_meteo", "current_weather") as call:
                 response = await client.get(
                     WEATHER_API_PROVIDERS["open_meteo"]["url"],
                     params={
@@ -122,27 +219,29 @@ class WeatherService:
                         "current": "temperature_2m,weather_code,wind_speed_10m,relative_humidity_2m",
                         "timezone": "auto",
                         "temperature_unit": "celsius"
-                    }
+                    },
+                    timeout=10.0
                 )
+                call["outcome"] = str(response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                current = data.get("current", {})
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    current = data.get("current", {})
-                    
-                    return {
-                        "location": location_name,
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "temperature": current.get("temperature_2m"),
-                        "weather_code": current.get("weather_code"),
-                        "weather_description": WeatherService.decode_weather_code(
-                            current.get("weather_code", 0)
-                        ),
-                        "humidity": current.get("relative_humidity_2m"),
-                        "wind_speed": current.get("wind_speed_10m"),
-                        "timestamp": current.get("time"),
-                        "timezone": data.get("timezone")
-                    }
+                return {
+                    "location": location_name,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "temperature": current.get("temperature_2m"),
+                    "weather_code": current.get("weather_code"),
+                    "weather_description": WeatherService.decode_weather_code(
+                        current.get("weather_code", 0)
+                    ),
+                    "humidity": current.get("relative_humidity_2m"),
+                    "wind_speed": current.get("wind_speed_10m"),
+                    "timestamp": current.get("time"),
+                    "timezone": data.get("timezone")
+                }
         except Exception as e:
             logger.error(f"Error fetching weather for ({latitude}, {longitude}): {e}")
         
@@ -168,7 +267,8 @@ class WeatherService:
         try:
             days = min(max(days, 1), 16)  # Clamp to valid range
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            client = weather_http_client.client()
+            with upstream_timer("open_meteo", "forecast") as call:
                 response = await client.get(
                     WEATHER_API_PROVIDERS["open_meteo"]["url"],
                     params={
@@ -178,28 +278,30 @@ class WeatherService:
                         "timezone": "auto",
                         "forecast_days": days,
                         "temperature_unit": "celsius"
-                    }
+                    },
+                    timeout=10.0
                 )
+                call["outcome"] = str(response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                daily = data.get("daily", {})
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    daily = data.get("daily", {})
-                    
-                    forecast = []
-                    for i in range(len(daily.get("time", []))):
-                        forecast.append({
-                            "date": daily["time"][i],
-                            "temp_min": daily["temperature_2m_min"][i],
-                            "temp_max": daily["temperature_2m_max"][i],
-                            "temp_mean": daily["temperature_2m_mean"][i],
-                            "weather_code": daily["weather_code"][i],
-                            "weather_description": WeatherService.decode_weather_code(
-                                daily["weather_code"][i]
-                            ),
-                            "precipitation": daily["precipitation_sum"][i]
-                        })
-                    
-                    return forecast
+                forecast = []
+                for i in range(len(daily.get("time", []))):
+                    forecast.append({
+                        "date": daily["time"][i],
+                        "temp_min": daily["temperature_2m_min"][i],
+                        "temp_max": daily["temperature_2m_max"][i],
+                        "temp_mean": daily["temperature_2m_mean"][i],
+                        "weather_code": daily["weather_code"][i],
+                        "weather_description": WeatherService.decode_weather_code(
+                            daily["weather_code"][i]
+                        ),
+                        "precipitation": daily["precipitation_sum"][i]
+                    })
+                
+                return forecast
         except Exception as e:
             logger.error(f"Error fetching forecast for ({latitude}, {longitude}): {e}")
         
@@ -252,7 +354,8 @@ class WeatherService:
         try:
             # For production, integrate with climate databases like NOAA or Copernicus
             # This is a simplified placeholder
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            client = weather_http_client.client()
+            with upstream_timer("open_meteo", "historical") as call:
                 response = await client.get(
                     WEATHER_API_PROVIDERS["open_meteo"]["url"],
                     params={
@@ -263,23 +366,25 @@ class WeatherService:
                         "end_date": "2024-12-31",
                         "timezone": "auto",
                         "temperature_unit": "celsius"
-                    }
+                    },
+                    timeout=10.0
                 )
+                call["outcome"] = str(response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                daily = data.get("daily", {})
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    daily = data.get("daily", {})
+                if daily.get("temperature_2m_max"):
+                    max_temps = [t for t in daily["temperature_2m_max"] if t is not None]
+                    min_temps = [t for t in daily["temperature_2m_min"] if t is not None]
                     
-                    if daily.get("temperature_2m_max"):
-                        max_temps = [t for t in daily["temperature_2m_max"] if t is not None]
-                        min_temps = [t for t in daily["temperature_2m_min"] if t is not None]
-                        
-                        return {
-                            "typical_max": max(max_temps) if max_temps else None,
-                            "typical_min": min(min_temps) if min_temps else None,
-                            "avg_max": sum(max_temps) / len(max_temps) if max_temps else None,
-                            "avg_min": sum(min_temps) / len(min_temps) if min_temps else None
-                        }
+                    return {
+                        "typical_max": max(max_temps) if max_temps else None,
+                        "typical_min": min(min_temps) if min_temps else None,
+                        "avg_max": sum(max_temps) / len(max_temps) if max_temps else None,
+                        "avg_min": sum(min_temps) / len(min_temps) if min_temps else None
+                    }
         except Exception as e:
             logger.error(f"Error fetching historical data for ({latitude}, {longitude}): {e}")
         
@@ -291,14 +396,21 @@ async def verify_api_health() -> Dict[str, bool]:
     """Verify weather API availability"""
     health = {}
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        client = weather_http_client.client()
+        with upstream_timer("open_meteo", "health") as call:
             response = await client.get(
                 WEATHER_API_PROVIDERS["open_meteo"]["url"],
-                params={"latitude": 0, "longitude": 0, "current": "temperature_2m"}
+                params={"latitude": 0, "longitude": 0, "current": "temperature_2m"},
+                timeout=5.0
             )
-            health["open_meteo"] = response.status_code == 200
+            call["outcome"] = str(response.status_code)
+        health["open_meteo"] = response.status_code == 200
     except Exception as e:
         logger.error(f"Weather API health check failed: {e}")
         health["open_meteo"] = False
     
     return health
+
+
+# Shared by all requests in this process
+weather_http_client = WeatherHttpClient()